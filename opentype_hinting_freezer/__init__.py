@@ -1,3 +1,15 @@
-from .hintingfreezer import freezehinting
+from typing import Any
+
+from .hintingfreezer import FontHintFreezer, freeze_bytes, freezehinting
+from .pool import FreezerPool
 
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str) -> Any:
+    # The batch runner is imported on first use, like the CLI subcommands.
+    if name == "freezebatch":
+        from .batch import freezebatch
+
+        return freezebatch
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
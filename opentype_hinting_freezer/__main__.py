@@ -1,16 +1,59 @@
 #!/usr/bin/env python3
+import importlib
+import logging
+import sys
+from typing import IO, Any, Callable, Dict, List, Tuple
+
 import fire
 
-from .hintingfreezer import freezehinting
+from .hintingfreezer import STDIO_PATH, freezehinting
+
+# Subcommands and the module and function behind each. They are imported
+# only when used, so that a plain freeze does not load the service code.
+SUBCOMMANDS: Dict[str, Tuple[str, str]] = {
+    "batch": ("batch", "freezebatch"),
+    # One warm process for many jobs: JSON lines in, JSON lines out.
+    "--batch": ("batch", "freezejsonlines"),
+    "serve": ("server", "freezeserve"),
+    "shard": ("shard", "freezeshard"),
+    "merge": ("shard", "freezemerge"),
+}
+
+
+def subcommand(name: str) -> Callable[..., Any]:
+    """Imports and returns the function of a subcommand."""
+    module_name, function_name = SUBCOMMANDS[name]
+    module = importlib.import_module(f".{module_name}", __package__)
+    return getattr(module, function_name)
 
 
 def custom_display(lines: List[str], out: IO[Any]) -> None:
     print(*lines, file=out)
 
 
+def stdio_args(args: List[str]) -> List[str]:
+    """Names bare "-" arguments, which fire would read as its separator."""
+    named: List[str] = []
+    for arg in args:
+        if arg != STDIO_PATH:
+            named.append(arg)
+        elif named and named[-1] == "--out":
+            named[-1] = f"--out={STDIO_PATH}"
+        else:
+            named.append(f"--fontpath={STDIO_PATH}")
+    return named
+
+
 def cli() -> None:
     fire.core.Display = custom_display
-    fire.Fire(freezehinting)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    args = sys.argv[1:]
+    if args and args[0] in SUBCOMMANDS:
+        fire.Fire(
+            subcommand(args[0]), command=args[1:], name=f"pyfthintfreeze {args[0]}"
+        )
+    else:
+        fire.Fire(freezehinting, command=stdio_args(args))
 
 
 if __name__ == "__main__":
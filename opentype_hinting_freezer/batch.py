@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import IO, Any, Dict, List, NamedTuple, Optional, Set, Tuple, Union
+
+from .cache import FreezeCache, file_digest
+from .hintingfreezer import (
+    STDIO_PATH,
+    FontHintFreezer,
+    _as_list,
+    _cache_key,
+    _open_freezer,
+    freezehinting,
+    output_path_for,
+    read_from_path,
+    units_per_em,
+)
+
+FONT_SUFFIXES = (".ttf", ".otf", ".ttc", ".otc")
+JOURNAL_NAME = ".pyfthintfreeze-journal.jsonl"
+
+
+class FreezeJob(NamedTuple):
+    """One `freezehinting()` call of a batch run."""
+
+    fontpath: str
+    out: str
+    ppm: Optional[int] = None
+    mode: str = "lcd"
+    subfont: int = 0
+    var: Optional[Dict[str, float]] = None
+
+    @property
+    def key(self) -> str:
+        """Identifies the job in the progress journal."""
+        return json.dumps(self._asdict(), sort_keys=True)
+
+
+def _is_glob(source: str) -> bool:
+    return any(c in source for c in "*?[")
+
+
+def _font_paths(source: Union[str, Path]) -> List[Path]:
+    source_str = str(source)
+    if _is_glob(source_str):
+        paths = [Path(p) for p in glob.glob(source_str, recursive=True)]
+    else:
+        paths = list(Path(source).iterdir())
+    # Skip earlier outputs when frozen fonts are written next to the inputs.
+    return sorted(
+        p for p in paths if p.suffix.lower() in FONT_SUFFIXES and ".fhf-" not in p.name
+    )
+
+
+def _manifest_entries(manifest: Path) -> List[Dict[str, Any]]:
+    if manifest.suffix.lower() == ".csv":
+        with open(manifest, newline="", encoding="utf-8") as f:
+            entries: List[Dict[str, Any]] = []
+            for row in csv.DictReader(f):
+                entry: Dict[str, Any] = {
+                    k: v for k, v in row.items() if v not in ("", None)
+                }
+                for int_key in ("ppm", "subfont"):
+                    if int_key in entry:
+                        entry[int_key] = int(entry[int_key])
+                if "var" in entry:
+                    entry["var"] = json.loads(entry["var"])
+                entries.append(entry)
+            return entries
+    data = read_from_path(manifest).decode("utf-8")
+    if manifest.suffix.lower() == ".jsonl":
+        return [json.loads(line) for line in data.splitlines() if line.strip()]
+    return json.loads(data)
+
+
+def load_jobs(
+    source: Union[str, Path],
+    out_dir: Optional[Union[str, Path]] = None,
+    ppm: Any = None,
+    mode: Any = "lcd",
+    subfont: int = 0,
+    var: Optional[Dict[str, float]] = None,
+) -> List[FreezeJob]:
+    """Expands a directory, a glob pattern or a manifest into freeze jobs.
+
+    A manifest is a `.json` list, a `.jsonl` file or a `.csv` table whose
+    entries/columns are `fontpath` (or `font`), `out`, `ppm`, `mode`,
+    `subfont` and `var`. Missing values fall back to the arguments given
+    here. Relative font paths are resolved against the manifest directory.
+    Lists of PPMs or modes expand to one job per combination; the `out`
+    of such an entry is the directory of its automatically named outputs.
+    """
+    source_path = Path(source)
+    if source_path.is_file():
+        base = source_path.parent
+        entries = _manifest_entries(source_path)
+    else:
+        base = Path()
+        entries = [{"fontpath": str(p)} for p in _font_paths(source)]
+
+    jobs: List[FreezeJob] = []
+    for entry in entries:
+        fontpath = base / entry.get("fontpath", entry.get("font", ""))
+        ppms = _as_list(entry.get("ppm", ppm))
+        modes = _as_list(entry.get("mode", mode))
+        out = entry.get("out")
+        # As in freezehinting(), the `out` of several outputs is a directory.
+        batch = len(ppms) * len(modes) > 1
+        entry_out_dir = base / out if out is not None else out_dir
+        for job_ppm in ppms:
+            for job_mode in modes:
+                job_subfont = entry.get("subfont", subfont)
+                if out is not None and not batch:
+                    job_out = base / out
+                else:
+                    # freezehinting() names PPM-less outputs after the UPM.
+                    name_ppm = job_ppm or units_per_em(fontpath, job_subfont)
+                    job_out = output_path_for(
+                        fontpath, name_ppm, job_mode, out_dir=entry_out_dir
+                    )
+                jobs.append(
+                    FreezeJob(
+                        fontpath=str(fontpath),
+                        out=str(job_out),
+                        ppm=job_ppm,
+                        mode=job_mode,
+                        subfont=job_subfont,
+                        var=entry.get("var", var),
+                    )
+                )
+    return jobs
+
+
+def read_journal(journal: Union[str, Path]) -> Set[str]:
+    """Returns the keys of jobs recorded as done in a progress journal."""
+    done: Set[str] = set()
+    if not Path(journal).exists():
+        return done
+    for line in read_from_path(journal).decode("utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # A run killed mid-write leaves a truncated last line.
+            continue
+        if record.get("status") == "done":
+            done.add(record["key"])
+    return done
+
+
+def _group_key(job: FreezeJob) -> str:
+    """Jobs with the same key share one parsed font."""
+    return json.dumps([job.fontpath, job.subfont, job.var], sort_keys=True)
+
+
+def _run_font_jobs(
+    jobs: List[FreezeJob], cache: Optional[str] = None
+) -> List[Optional[BaseException]]:
+    """Runs the jobs of one font, subfont and location over one `FontHintFreezer`.
+
+    The font is parsed and opened in FreeType once; each job only
+    re-targets the face to its size and mode, as in a `freezehinting()`
+    call with several PPMs and modes. Returns the error of each job, or
+    None.
+    """
+    freeze_cache = FreezeCache(cache) if cache else None
+    font_digest = ""
+    fhf: Optional[FontHintFreezer] = None
+    errors: List[Optional[BaseException]] = []
+    for job in jobs:
+        try:
+            Path(job.out).parent.mkdir(parents=True, exist_ok=True)
+            cache_key = ""
+            if freeze_cache is not None:
+                font_digest = font_digest or file_digest(job.fontpath)
+                cache_key = _cache_key(
+                    freeze_cache, font_digest, job.ppm, job.mode, job.subfont, job.var
+                )
+                if freeze_cache.fetch(cache_key, job.out):
+                    errors.append(None)
+                    continue
+            if fhf is None:
+                fhf = _open_freezer(
+                    job.fontpath, [job.out for job in jobs], font_number=job.subfont
+                )
+                if job.var and "fvar" in fhf.source_tables:
+                    fhf.instantiate(job.var)
+            fhf.set_size(job.ppm, job.mode)
+            fhf.freeze_hints()
+            fhf.save(job.out)
+            if freeze_cache is not None:
+                freeze_cache.store(cache_key, job.out)
+        except Exception as e:
+            # The next job starts from a freshly parsed font.
+            fhf = None
+            errors.append(e)
+        else:
+            errors.append(None)
+    return errors
+
+
+def _run_groups(
+    groups: List[List[FreezeJob]], workers: int = 0, cache: Optional[str] = None
+) -> Iterator[Tuple[FreezeJob, Optional[BaseException]]]:
+    """Runs each group with `_run_font_jobs`, over a pool with several workers.
+
+    Yields every job with its error, or None, as its group finishes.
+    """
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    if workers == 1 or len(groups) <= 1:
+        for group in groups:
+            yield from zip(group, _run_font_jobs(group, cache))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_run_font_jobs, group, cache): group for group in groups
+        }
+        for future in as_completed(futures):
+            group = futures[future]
+            error = future.exception()
+            yield from zip(group, [error] * len(group) if error else future.result())
+
+
+def run_jobs(
+    jobs: Iterable[FreezeJob],
+    journal: Union[str, Path],
+    workers: int = 0,
+    cache: Optional[str] = None,
+) -> Dict[str, int]:
+    """Runs freeze jobs over a process pool, recording progress in `journal`.
+
+    Jobs already recorded as done whose output still exists are skipped,
+    so an interrupted run can be restarted with the same arguments.
+    Failed jobs are recorded but do not stop the run; they are retried
+    on the next run. The jobs of each font run in one worker over one
+    parsed font. With `cache`, jobs share a `FreezeCache` directory.
+    """
+    done = read_journal(journal)
+    pending: List[FreezeJob] = []
+    summary = {"done": 0, "skipped": 0, "failed": 0}
+    for job in jobs:
+        if job.key in done and Path(job.out).exists():
+            summary["skipped"] += 1
+        else:
+            pending.append(job)
+
+    Path(journal).parent.mkdir(parents=True, exist_ok=True)
+    with open(journal, "a", encoding="utf-8") as journal_file:
+
+        def record(job: FreezeJob, error: Optional[BaseException]) -> None:
+            entry: Dict[str, Any] = {"key": job.key, "out": job.out}
+            if error is None:
+                entry["status"] = "done"
+                summary["done"] += 1
+            else:
+                entry["status"] = "error"
+                entry["error"] = f"{type(error).__name__}: {error}"
+                summary["failed"] += 1
+            journal_file.write(json.dumps(entry) + "\n")
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+        # Jobs of one font share a parsed font and FreeType face.
+        groups: Dict[str, List[FreezeJob]] = {}
+        for job in pending:
+            groups.setdefault(_group_key(job), []).append(job)
+        for job, error in _run_groups(list(groups.values()), workers, cache):
+            record(job, error)
+    return summary
+
+
+def freezebatch(
+    source,
+    out_dir=None,
+    ppm=None,
+    mode="lcd",
+    subfont=0,
+    var=None,
+    workers=0,
+    journal=None,
+    cache=None,
+):
+    """
+    Batch OpenType font hinting freezer \n
+    Freezes many fonts in one process pool, resuming interrupted runs
+
+    Example:
+    pyfthintfreeze batch 'fonts/*.ttf' --ppm=[11,12] --mode=mono --out_dir=frozen
+    pyfthintfreeze batch jobs.csv --workers=8
+
+    :param source: directory, glob pattern, or .json/.jsonl/.csv manifest
+        of jobs with fontpath, out, ppm, mode, subfont and var
+    :param out_dir: directory for automatically named outputs
+    :param ppm: default pixel-per-em, or a list of them
+    :param mode: default hinting mode, or a list of them
+    :param subfont: default subfont index in a TTC file
+    :param var: default variable font location as a dict
+    :param workers: number of worker processes, 0 for one per CPU
+    :param journal: progress journal path, defaults to
+        .pyfthintfreeze-journal.jsonl in out_dir (or the current directory)
+    :param cache: directory of a frozen-output cache shared by all workers
+    """
+    jobs = load_jobs(
+        source, out_dir=out_dir, ppm=ppm, mode=mode, subfont=subfont, var=var
+    )
+    if journal is None:
+        journal = Path(out_dir or ".") / JOURNAL_NAME
+    return run_jobs(jobs, journal, workers=workers, cache=cache)
+
+
+def freeze_json_lines(lines: Iterable[str], output: IO[str]) -> int:
+    """Runs one `freezehinting()` job per JSON line in this process.
+
+    Each line is an object of `freezehinting()` arguments, plus an optional
+    "id" that is echoed back. One result line is written and flushed per
+    job, in input order: `{"line", "id", "ok", "seconds"}` and, on failure,
+    "error". A failed job does not stop the run. Returns the number of
+    failed jobs.
+    """
+    failed = 0
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        start = time.perf_counter()
+        result: Dict[str, Any] = {"line": line_number}
+        try:
+            job = json.loads(line)
+            if not isinstance(job, dict):
+                raise ValueError("A job must be a JSON object")
+            if "id" in job:
+                result["id"] = job.pop("id")
+            if STDIO_PATH in (str(job.get("fontpath")), str(job.get("out"))):
+                # stdin and stdout carry the jobs and results.
+                raise ValueError(
+                    f"{STDIO_PATH!r} paths are not available in --batch mode"
+                )
+            freezehinting(**job)
+        except Exception as e:
+            failed += 1
+            result["ok"] = False
+            result["error"] = f"{type(e).__name__}: {e}"
+        else:
+            result["ok"] = True
+        result["seconds"] = round(time.perf_counter() - start, 4)
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+    return failed
+
+
+def freezejsonlines():
+    """
+    JSON-lines OpenType font hinting freezer \n
+    Runs one freeze job per JSON line from stdin in one warm process
+
+    Example:
+    echo '{"fontpath": "a.ttf", "ppm": 12, "mode": "mono"}' | pyfthintfreeze --batch
+
+    Each line holds the arguments of a plain freeze. One result line per
+    job is written to stdout; the exit status is 1 if any job failed.
+    """
+    if freeze_json_lines(sys.stdin, sys.stdout):
+        sys.exit(1)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Content-addressed on-disk cache of frozen fonts.
+
+Entries are keyed by a hash of the input font bytes, the freeze options
+and the FreeType/freetype-py/fontTools versions, so a hit can be copied to
+the output without parsing the font. Entries are written to a temporary
+file and renamed into place, and eviction tolerates entries vanishing
+underneath it, so several processes can share one cache directory.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import fontTools
+import freetype
+
+ENTRY_SUFFIX = ".font"
+DEFAULT_CACHE_SIZE_MB = 1024
+
+
+def file_digest(path: Union[str, Path]) -> str:
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _distribution_version(name: str) -> Optional[str]:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:  # pragma: no cover - source checkout
+        return None
+
+
+def _tool_versions() -> Dict[str, Any]:
+    return {
+        "freetype": list(freetype.version()),
+        "freetype-py": _distribution_version("freetype-py"),
+        "fontTools": fontTools.version,
+        "freezer": _distribution_version("opentype-hinting-freezer"),
+    }
+
+
+class FreezeCache:
+    """A directory of frozen fonts with a size cap and LRU eviction.
+
+    Recency is the entry's modification time, refreshed on every hit, so
+    it does not depend on the filesystem recording access times.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_bytes: int = DEFAULT_CACHE_SIZE_MB * 1024 * 1024,
+    ) -> None:
+        if max_bytes <= 0:
+            raise ValueError(f"Cache size must be positive, got {max_bytes}")
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._versions = _tool_versions()
+
+    def key(self, font_digest: str, **options: Any) -> str:
+        """Returns the entry key for a font digest and freeze options."""
+        payload = json.dumps(
+            {"font": font_digest, "options": options, "versions": self._versions},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}{ENTRY_SUFFIX}"
+
+    def fetch(self, key: str, dest: Union[str, Path]) -> bool:
+        """Copies the entry for `key` to `dest`; returns False on a miss."""
+        entry = self._entry_path(key)
+        try:
+            os.utime(entry)
+            shutil.copyfile(entry, dest)
+        except FileNotFoundError:
+            # Missing, or evicted by another process between the two calls.
+            return False
+        return True
+
+    def store(self, key: str, src: Union[str, Path]) -> None:
+        """Adds `src` as the entry for `key`, then evicts down to the cap."""
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp, open(src, "rb") as f:
+                shutil.copyfileobj(f, tmp)
+            os.replace(tmp_name, self._entry_path(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries: List[Tuple[float, int, Path]] = []
+        for path in self.directory.glob(f"*{ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self) -> int:
+        """Returns the total size of all entries in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Removes least recently used entries until the cache fits.
+
+        Returns the number of entries removed.
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        entries = sorted(self._entries(), key=lambda entry: entry[0])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            else:
+                removed += 1
+            total -= size
+        return removed
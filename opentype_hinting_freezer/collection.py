@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Freezing every subfont of a TrueType/OpenType collection in one run.
+
+Faces of a collection usually share their outline tables: a CJK TTC may
+hold several families over one glyf. Subfonts are grouped by the contents
+of every table that FreeType reads to load a hinted glyph, so each group
+is frozen once, through its first subfont. The other subfonts of a group
+get the same frozen tables, and `TTCollection.save(shareTables=True)`
+writes identical tables once, so the tables shared in the source stay
+shared in the output.
+"""
+
+import hashlib
+import io
+import mmap
+from collections.abc import Collection, Sequence
+from typing import Any, Dict, List, Tuple, Union
+
+from fontTools.ttLib import TTCollection, TTFont
+from fontTools.ttLib.sfnt import readTTCHeader
+from fontTools.ttLib.tables.DefaultTable import DefaultTable
+
+# Tables that decide the hinted outlines and metrics FreeType loads.
+GLYPH_DATA_TABLES = (
+    "glyf",
+    "loca",
+    "CFF ",
+    "CFF2",
+    "fpgm",
+    "prep",
+    "cvt ",
+    "maxp",
+    "hmtx",
+    "hhea",
+    "gvar",
+    "fvar",
+    "avar",
+    "cvar",
+    "HVAR",
+)
+
+# head fields the freeze recalculates from the frozen outlines.
+HEAD_BOUNDS = ("xMin", "yMin", "xMax", "yMax", "indexToLocFormat")
+
+
+def _stream(font_data: Union[bytes, mmap.mmap]) -> Any:
+    return font_data if isinstance(font_data, mmap.mmap) else io.BytesIO(font_data)
+
+
+def subfont_count(font_data: Union[bytes, mmap.mmap]) -> int:
+    """Returns the number of subfonts, or raises ValueError if not a collection."""
+    stream = _stream(font_data)
+    stream.seek(0)
+    if stream.read(4) != b"ttcf":
+        raise ValueError("Not a font collection (TTC/OTC)")
+    stream.seek(0)
+    return readTTCHeader(stream).numFonts
+
+
+def subfont_groups(font_data: Union[bytes, mmap.mmap]) -> List[List[int]]:
+    """Groups the subfonts whose glyphs freeze to the same tables.
+
+    Subfonts are in the same group when all their `GLYPH_DATA_TABLES`
+    and the head fields FreeType scales with are identical. A table
+    shared through one offset is hashed once. Groups and their members
+    are in subfont order.
+    """
+    stream = _stream(font_data)
+    digests: Dict[Tuple[int, int], str] = {}
+    groups: Dict[Tuple[Any, ...], List[int]] = {}
+    for number in range(subfont_count(font_data)):
+        font = TTFont(stream, fontNumber=number, lazy=True)
+        key: List[Any] = []
+        for tag in GLYPH_DATA_TABLES:
+            if tag not in font.reader:
+                continue
+            entry = font.reader.tables[tag]
+            location = (entry.offset, entry.length)
+            if location not in digests:
+                digests[location] = hashlib.sha256(font.reader[tag]).hexdigest()
+            key.append((tag, digests[location]))
+        head = font["head"]
+        key.append((head.unitsPerEm, head.flags))
+        groups.setdefault(tuple(key), []).append(number)
+    return list(groups.values())
+
+
+def build_collection(
+    font_data: Union[bytes, mmap.mmap],
+    groups: Sequence[Sequence[int]],
+    frozen_fonts: Sequence[bytes],
+    frozen_tags: Collection[str],
+) -> TTCollection:
+    """Assembles the frozen collection from the frozen first subfont of each group.
+
+    `frozen_fonts[i]` is the frozen font of `groups[i][0]`. Other members
+    take its `frozen_tags` tables verbatim, lose those it does not have,
+    and keep their own other tables; their head only gets the frozen
+    bounds.
+    """
+    stream = _stream(font_data)
+    fonts: Dict[int, TTFont] = {}
+    for group, frozen_data in zip(groups, frozen_fonts):
+        frozen = TTFont(io.BytesIO(frozen_data), lazy=True)
+        fonts[group[0]] = frozen
+        frozen_head = frozen["head"]
+        for number in group[1:]:
+            font = TTFont(stream, fontNumber=number, lazy=True)
+            for tag in frozen.reader.tables:
+                if tag in frozen_tags and tag != "head":
+                    table = DefaultTable(tag)
+                    table.data = frozen.reader[tag]
+                    font[tag] = table
+            for tag in frozen_tags:
+                if tag in font and tag not in frozen.reader:
+                    del font[tag]
+            head = font["head"]
+            for field in HEAD_BOUNDS:
+                setattr(head, field, getattr(frozen_head, field))
+            head.flags = (head.flags & ~0x2) | (frozen_head.flags & 0x2)
+            fonts[number] = font
+    collection = TTCollection()
+    collection.fonts = [fonts[number] for number in sorted(fonts)]
+    for font in collection.fonts:
+        # The frozen bounds are final; the glyf/CFF tables are raw bytes.
+        font.recalcBBoxes = False
+    return collection
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Stripping the TrueType hinting of a frozen font and writing its device metrics.
+
+Freezing writes every glyph without instructions, but the output keeps
+the font programs, the CVT and a gasp table made for the original
+hinting. `strip_hinting()` removes them. A glyf font with neither fpgm
+nor prep and no glyph instructions is autohinted by FreeType (see
+`unhinted.autohinted_by_freetype`), which would move the frozen points
+again, so prep is replaced rather than removed: with only the dropout
+control setup commonly used for unhinted fonts, FreeType keeps running
+its TrueType interpreter, which leaves the outlines alone.
+
+`add_device_metrics()` then writes hdmx, LTSH and VDMX for the frozen
+PPM. The values are those of the frozen font itself: its advances and
+extremes scaled to the PPM with FreeType's arithmetic, as a renderer
+loading the glyphs would get them.
+"""
+
+import logging
+from typing import Tuple
+
+from fontTools.ttLib import TTFont, newTable
+from fontTools.ttLib.tables import ttProgram
+
+from .unhinted import div_fix, mul_fix, pix_round
+
+log = logging.getLogger(__name__)
+
+# Tables that only serve the original instructions.
+HINTING_TABLES = ("fpgm", "cvt ", "cvar")
+DEVICE_METRICS_TABLES = ("hdmx", "LTSH", "VDMX")
+# Tables `strip_hinting()` and `add_device_metrics()` remove, replace or add.
+DEHINTED_TABLES = frozenset(
+    HINTING_TABLES + DEVICE_METRICS_TABLES + ("prep", "gasp", "maxp")
+)
+
+# PUSHW[ ] 511, SCANCTRL[ ], PUSHB[ ] 4, SCANTYPE[ ]: dropout control at
+# every size, smart dropout control including stubs.
+UNHINTED_PREP = b"\xb8\x01\xff\x85\xb0\x04\x8d"
+
+GASP_GRIDFIT = 0x0001
+GASP_DOGRAY = 0x0002
+GASP_SYMMETRIC_GRIDFIT = 0x0004
+GASP_SYMMETRIC_SMOOTHING = 0x0008
+
+# hdmx widths and VDMX sizes are stored in bytes.
+MAX_DEVICE_PPM = 255
+
+
+def strip_hinting(font: TTFont, render_mode: str) -> None:
+    """Removes the hinting tables of a frozen glyf font and resets its maxp limits.
+
+    fpgm, cvt and cvar are removed and prep is replaced with
+    `UNHINTED_PREP`. gasp is replaced with one range: grid-fitting only
+    (which runs the dropout control) for fonts frozen in mono mode, and
+    grid-fitting with smoothing otherwise.
+    """
+    for tag in HINTING_TABLES:
+        if tag in font:
+            del font[tag]
+    prep = newTable("prep")
+    prep.program = ttProgram.Program()
+    prep.program.fromBytecode(UNHINTED_PREP)
+    font["prep"] = prep
+
+    gasp = newTable("gasp")
+    gasp.version = 1
+    flags = GASP_GRIDFIT | GASP_SYMMETRIC_GRIDFIT
+    if render_mode != "mono":
+        flags |= GASP_DOGRAY | GASP_SYMMETRIC_SMOOTHING
+    gasp.gaspRange = {0xFFFF: flags}
+    font["gasp"] = gasp
+
+    maxp = font["maxp"]
+    maxp.maxZones = 1
+    maxp.maxTwilightPoints = 0
+    maxp.maxStorage = 0
+    maxp.maxFunctionDefs = 0
+    maxp.maxInstructionDefs = 0
+    maxp.maxStackElements = 1
+    maxp.maxSizeOfInstructions = 0
+
+
+def add_device_metrics(font: TTFont, ppm: int) -> None:
+    """Writes the hdmx, LTSH and VDMX tables of a frozen glyf font at `ppm`.
+
+    Frozen glyphs have no instructions, so every advance scales linearly
+    (LTSH thresholds of 1). hdmx and VDMX hold one record for `ppm`, from
+    the frozen advances and the font bounding box; they are left out for
+    PPMs, or hdmx for widths, that do not fit their byte fields. Call it
+    after the glyphs are frozen.
+    """
+    for tag in DEVICE_METRICS_TABLES:
+        if tag in font:
+            del font[tag]
+    glyph_order = font.getGlyphOrder()
+    ltsh = newTable("LTSH")
+    ltsh.yPels = {glyph_name: 1 for glyph_name in glyph_order}
+    font["LTSH"] = ltsh
+    if ppm > MAX_DEVICE_PPM:
+        log.info("No hdmx and VDMX records above %d ppm", MAX_DEVICE_PPM)
+        return
+
+    scale = div_fix(ppm * 64, font["head"].unitsPerEm)
+    hmtx = font["hmtx"]
+    widths = {
+        glyph_name: pix_round(mul_fix(hmtx[glyph_name][0], scale)) >> 6
+        for glyph_name in glyph_order
+    }
+    if max(widths.values(), default=0) <= 0xFF:
+        hdmx = newTable("hdmx")
+        hdmx.hdmx = {ppm: widths}
+        font["hdmx"] = hdmx
+    else:
+        log.info("No hdmx: advances at %d ppm do not fit in a byte", ppm)
+
+    y_min, y_max = _y_bounds(font)
+    vdmx = newTable("VDMX")
+    vdmx.version = 1
+    # One ratio range for all aspect ratios, covering all glyphs.
+    vdmx.ratRanges = [
+        {"bCharSet": 0, "xRatio": 0, "yStartRatio": 0, "yEndRatio": 0, "groupIndex": 0}
+    ]
+    vdmx.groups = [
+        {ppm: ((mul_fix(y_max, scale) + 63) >> 6, mul_fix(y_min, scale) >> 6)}
+    ]
+    vdmx.numRatios = len(vdmx.ratRanges)
+    vdmx.numRecs = len(vdmx.groups)
+    font["VDMX"] = vdmx
+
+
+def _y_bounds(font: TTFont) -> Tuple[int, int]:
+    """Returns the lowest and highest y of the frozen glyphs."""
+    if not font.recalcBBoxes:
+        # A streamed glyf table has set the final bounds in head already.
+        head = font["head"]
+        return head.yMin, head.yMax
+    glyf = font["glyf"]
+    bounds = []
+    for glyph_name in font.getGlyphOrder():
+        glyph = glyf[glyph_name]
+        if glyph.numberOfContours:
+            glyph.recalcBounds(glyf)
+            bounds.append((glyph.yMin, glyph.yMax))
+    if not bounds:
+        return 0, 0
+    return min(y_min for y_min, _ in bounds), max(y_max for _, y_max in bounds)
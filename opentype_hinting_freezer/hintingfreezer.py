@@ -1,14 +1,92 @@
 #!/usr/bin/env python3
+import ctypes
 import io
+import logging
+import mmap
+import os
+import sys
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import repeat
 from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    KeysView,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 from fontTools.pens.pointPen import PointToSegmentPen
 from fontTools.pens.t2CharStringPen import T2CharStringPen
 from fontTools.pens.ttGlyphPen import TTGlyphPointPen
 from fontTools.ttLib import TTFont
-from freetype import *
+from fontTools.ttLib.tables import ttProgram
+from fontTools.ttLib.tables._g_l_y_f import (
+    ROUND_XY_TO_GRID,
+    Glyph,
+    GlyphComponent,
+    GlyphCoordinates,
+)
+from freetype import (
+    FT_LOAD_RENDER,
+    FT_LOAD_TARGET_LCD,
+    FT_LOAD_TARGET_LCD_V,
+    FT_LOAD_TARGET_LIGHT,
+    FT_LOAD_TARGET_MONO,
+    Face,
+    FT_Fixed,
+    FT_Set_Var_Design_Coordinates,
+    Matrix,
+    Vector,
+)
 
-renderModeFlags = {
+from .cache import DEFAULT_CACHE_SIZE_MB, FreezeCache, file_digest
+from .collection import build_collection, subfont_groups
+from .dehint import DEHINTED_TABLES, add_device_metrics, strip_hinting
+from .incremental import (
+    manifest_path_for,
+    read_manifest,
+    source_digests,
+    unchanged_glyphs,
+    write_manifest,
+)
+from .outline import FT_CURVE_TAG_ON, curve_type, read_outline, segment_types
+from .profiling import DEFAULT_TOP_GLYPHS, FreezeProfiler
+from .streaming import GlyfWriter
+from .unhinted import fast_path_applies, is_unhinted, same_outline, scale_glyph
+
+# Font path and output path that stand for stdin and stdout.
+STDIO_PATH = "-"
+
+# Report written by `--profile` without an explicit path.
+PROFILE_FILENAME = "pyfthintfreeze-profile.json"
+
+# Font units a preserved composite may deviate from its hinted outline.
+COMPOSITE_TOLERANCE = 1
+
+log = logging.getLogger(__name__)
+
+# Tables a freeze rewrites or that fontTools recalculates from them on save.
+# All other tables are written back from the original font's bytes.
+FROZEN_TABLES = frozenset(
+    {"glyf", "loca", "hmtx", "hhea", "head", "maxp", "CFF ", "CFF2"}
+)
+
+RENDER_MODE_FLAGS = {
     "lcd": FT_LOAD_TARGET_LCD,
     "mono": FT_LOAD_TARGET_MONO,
     "lcdv": FT_LOAD_TARGET_LCD_V,
@@ -18,136 +96,873 @@ renderModeFlags = {
 
 class FontHintFreezer:
     ttFont: TTFont  # Actual type from fontTools
-    ftFace: Face    # Actual type from freetype
-    glyphSet: Mapping[str, Any] # From ttFont.getGlyphSet()
+    ftFace: Face  # Actual type from freetype
+    glyphSet: Mapping[str, Any]  # From ttFont.getGlyphSet()
     glyphNames: KeysView[str]
     glyphName: str
     width: int
     lsb: int
     upm: int
     ppm: int
+    render_mode: str
     rescale_metrics: float
     rescale_glyphs: int
     ft_flag: int  # FreeType load flag (integer)
+    render: bool
     ftGlyph: Any  # freetype.GlyphSlot object
 
     def __init__(
         self,
-        font_data: bytes,
+        font_data: Union[bytes, mmap.mmap],
         font_number: int = 0,
         ppm: Optional[int] = None,
         render_mode: str = "lcd",
+        render: bool = False,
+        keep_composites: bool = False,
+        stream: bool = False,
+        fast_path: bool = True,
+        verify_fast_path: bool = False,
     ) -> None:
-        stream = io.BytesIO(font_data)
-        self.ttFont = TTFont(stream, fontNumber=font_number, lazy=False)
-        stream = io.BytesIO(font_data)
-        self.ftFace = Face(stream, index=font_number)
-        # getGlyphSet returns a _TTGlyphSet, which is a Mapping.
-        self.glyphSet = self.ttFont.getGlyphSet()
-        self.glyphNames = self.glyphSet.keys()
+        if stream and keep_composites:
+            raise ValueError("stream cannot be combined with keep_composites")
+        self.font_data = font_data
+        self.font_path: Optional[Path] = None
+        # Hinting runs in FT_Load_Glyph; rendering the bitmap only matters
+        # for callers that read it, the outline is the same either way.
+        self.render = render
+        self.keep_composites = keep_composites
+        # Compile glyf glyphs as they are frozen (see streaming.GlyfWriter).
+        self.stream = stream
+        # Compute glyphs without instructions instead of loading them (see
+        # unhinted); with verify_fast_path, load them too and compare.
+        self.fast_path = fast_path
+        self.verify_fast_path = verify_fast_path
+        self.fast_path_mismatches: List[str] = []
+        self._unhinted: Optional[Set[str]] = None
+        self._source_font: Optional[TTFont] = None
+        self.font_number = font_number
+        self.var_location: Optional[Dict[str, float]] = None
+        # Records per-glyph load and conversion times when set.
+        self.profiler: Optional[FreezeProfiler] = None
+        self.ftFace = Face(_MemoryStream(font_data), index=font_number)
+        self.upm = self.ftFace.units_per_EM
         self.glyphName = ""
         self.width = 0
         self.lsb = 0
-        self.upm = self.ftFace.units_per_EM
-        self.ppm = ppm or self.upm # ppm can't be 0
+        self._load_source()
+        self.source_tables: Set[str] = set(self.ttFont.keys())
+        # FreeType loads glyphs by their ID in the source font, which
+        # subsetting renumbers on the fontTools side.
+        self.source_glyph_ids: Dict[str, int] = {
+            name: glyph_id for glyph_id, name in enumerate(self.ttFont.getGlyphOrder())
+        }
+        self.set_size(ppm, render_mode)
+
+    def _load_source(self) -> None:
+        # Both parsers share one buffer: FreeType reads it in place and
+        # fontTools decompiles tables only when the freezer touches them.
+        # Untouched tables are written back from the original bytes. (With
+        # lazy=None instead of True, TTFont would copy the whole buffer.)
+        self.ttFont = self._open_tt_font()
+        self.changed_tables: Set[str] = set(FROZEN_TABLES)
+        # getGlyphSet returns a _TTGlyphSet, which is a Mapping.
+        self.glyphSet = self.ttFont.getGlyphSet()
+        self.glyphNames = self.glyphSet.keys()
+        self.subset_glyphs: Optional[List[str]] = None
+        self.dehinted = False
+        # The source components are recorded before any freeze overwrites
+        # glyf, so composites can be re-checked at every size.
+        self.source_composites: Dict[str, List[GlyphComponent]] = {}
+        if self.keep_composites and "glyf" in self.ttFont:
+            glyf = self.ttFont["glyf"]
+            for glyph_name in glyf:
+                # glyf.glyphs holds the raw glyphs; only composites are expanded.
+                if glyf.glyphs[glyph_name].isComposite():
+                    self.source_composites[glyph_name] = list(
+                        glyf[glyph_name].components
+                    )
+
+    def _open_tt_font(self) -> TTFont:
+        font_data = self.font_data
+        stream: Any = (
+            font_data if isinstance(font_data, mmap.mmap) else io.BytesIO(font_data)
+        )
+        return TTFont(stream, fontNumber=self.font_number, lazy=True)
+
+    @classmethod
+    def from_path(cls, path: Union[str, Path], **kwargs: Any) -> "FontHintFreezer":
+        """Creates a freezer over a memory-mapped font file.
+
+        Takes the same keyword arguments as the constructor. The file must
+        not be overwritten while the freezer is in use.
+        """
+        fhf = cls(map_from_path(path), **kwargs)
+        fhf.font_path = Path(path)
+        return fhf
+
+    def reset(self) -> None:
+        """Restores the freezer to the source font, keeping the FreeType face.
+
+        Undoes `instantiate()`, `subset()`, `set_var_location()` and any
+        frozen outlines by re-reading the fontTools side lazily from the
+        source buffer, so a long-lived freezer can serve another request
+        without being rebuilt. The size and render mode are kept.
+        """
+        if self.var_location is not None:
+            # No coordinates select the default instance.
+            FT_Set_Var_Design_Coordinates(self.ftFace._FT_Face, 0, None)
+            self.var_location = None
+        self._load_source()
+
+    def set_size(self, ppm: Optional[int] = None, render_mode: str = "lcd") -> None:
+        """Re-targets the loaded font to another PPM size and render mode.
+
+        Only the FreeType char size, transform and load flag are changed,
+        so one parsed font can be frozen at several sizes in turn.
+        """
+        if ppm is not None and ppm <= 0:
+            raise ValueError(f"ppm must be a positive integer, got {ppm}")
+        if render_mode not in RENDER_MODE_FLAGS:
+            raise ValueError(
+                f"Unknown render mode {render_mode!r}, "
+                f"expected one of: {', '.join(RENDER_MODE_FLAGS)}"
+            )
+        self.ppm = ppm or self.upm
+        self.render_mode = render_mode
         self.rescale_metrics = float(self.upm) / float(self.ppm) / 64.0
         self.rescale_glyphs = int(float(self.upm) / float(self.ppm) / 64.0 * 0x10000)
         self.ftFace.set_char_size(self.ppm * 64, 0, 72, 0)
         self.ftFace.set_transform(
             Matrix(self.rescale_glyphs, 0, 0, self.rescale_glyphs), Vector(0, 0)
         )
-        self.ft_flag = RENDER_MODE_FLAGS.get(render_mode, FT_LOAD_TARGET_LCD)
+        self.ft_flag = RENDER_MODE_FLAGS[render_mode]
 
     def set_var_location(self, var_location: Dict[str, float]) -> None:
         if "fvar" not in self.ttFont:
             return
+        self.var_location = var_location
         coordinates_values: List[float] = [
             var_location.get(axis.axisTag, axis.defaultValue)
             for axis in self.ttFont["fvar"].axes
         ]
-        ft_coordinates_values: List[int] = [round(v * 0x10000) for v in coordinates_values]
+        ft_coordinates_values: List[int] = [
+            round(v * 0x10000) for v in coordinates_values
+        ]
         c_coordinates = (FT_Fixed * len(ft_coordinates_values))(*ft_coordinates_values)
         FT_Set_Var_Design_Coordinates(
             self.ftFace._FT_Face, len(ft_coordinates_values), c_coordinates
         )
 
+    def subset(
+        self,
+        unicodes: Any = (),
+        glyphs: Any = (),
+        text: str = "",
+        options: Any = None,
+    ) -> None:
+        """Restricts the font to the requested glyphs and their closure.
+
+        `unicodes` and `glyphs` take lists or pyftsubset-style strings
+        ("U+0041-005A,0061", "a,b,c"). The fontTools subsetter adds the
+        glyphs reachable through components and GSUB, prunes every other
+        table accordingly and renumbers the glyphs; FreeType keeps loading
+        the source glyph IDs. Call it before `freeze_hints()` so that only
+        the surviving glyphs are hinted. `options` is a
+        `fontTools.subset.Options`; if None, pyftsubset's defaults with
+        the `.notdef` outline kept, since every glyph is redrawn from the
+        source outlines anyway.
+        """
+        from fontTools import subset
+
+        if isinstance(unicodes, str):
+            unicodes = subset.parse_unicodes(unicodes)
+        if isinstance(glyphs, str):
+            glyphs = subset.parse_glyphs(glyphs)
+        if options is None:
+            options = subset.Options(notdef_outline=True)
+        subsetter = subset.Subsetter(options=options)
+        subsetter.populate(
+            glyphs=list(glyphs), unicodes=list(unicodes), text=text or ""
+        )
+        subsetter.subset(self.ttFont)
+        # The subsetter decompiles and rewrites every table it keeps.
+        self.changed_tables.update(self.ttFont.tables)
+        self.glyphSet = self.ttFont.getGlyphSet()
+        self.glyphNames = self.glyphSet.keys()
+        self.subset_glyphs = list(self.glyphNames)
+        self.source_composites = {
+            name: components
+            for name, components in self.source_composites.items()
+            if name in self.glyphSet
+        }
+
+    def instantiate(
+        self, var_location: Dict[str, float], update_names: bool = False
+    ) -> None:
+        """Turns the loaded variable font into a static instance.
+
+        The fontTools side is re-read from the source buffer and
+        instantiated at the location with the varLib instancer, so no
+        gvar, HVAR or other variation tables remain; the FreeType face is
+        only moved to the same design coordinates. Axes missing from
+        `var_location` are pinned at their defaults. With `update_names`,
+        the name table is updated from STAT, as for a named instance.
+        Call it before `subset()` and `freeze_hints()`; it discards them.
+        """
+        from fontTools.varLib import instancer
+
+        font = self._open_tt_font()
+        if "fvar" not in font:
+            raise ValueError("Cannot instantiate a font without an fvar table")
+        location = {
+            axis.axisTag: var_location.get(axis.axisTag, axis.defaultValue)
+            for axis in font["fvar"].axes
+        }
+        self.ttFont = font
+        self.set_var_location(location)
+        instancer.instantiateVariableFont(
+            font,
+            location,
+            inplace=True,
+            updateFontNames=update_names and "STAT" in font,
+        )
+        # The instancer rewrites every table that holds variation data.
+        self.changed_tables = set(FROZEN_TABLES) | set(font.tables)
+        self.glyphSet = font.getGlyphSet()
+        self.glyphNames = self.glyphSet.keys()
+        self.subset_glyphs = None
+
     def prep_glyph(self) -> None:
-        glyph_id: int = self.ttFont.getGlyphID(self.glyphName)
-        self.ftFace.load_glyph(glyph_id, FT_LOAD_RENDER | self.ft_flag)
+        glyph_id: int = self.source_glyph_ids[self.glyphName]
+        load_flags: int = self.ft_flag | (FT_LOAD_RENDER if self.render else 0)
+        self.ftFace.load_glyph(glyph_id, load_flags)
         self.ftGlyph = self.ftFace.glyph
         self.lsb = int(self.ftGlyph.metrics.horiBearingX * self.rescale_metrics)
         self.width = int(self.ftGlyph.metrics.horiAdvance * self.rescale_metrics)
 
+    def frozen_glyph(self) -> "FrozenGlyph":
+        """Returns the outline and metrics of the glyph loaded by `prep_glyph`."""
+        points, tags, contours = read_outline(self.ftGlyph)
+        return FrozenGlyph(points, tags, contours, self.width, self.lsb)
+
     def draw_glyph_to_point_pen(self, pen: Any) -> None:  # pen is a PointPen
-        # ftGlyph is GlyphSlot, outline is Outline
-        contours: Iterator[int] = (i + 1 for i in self.ftGlyph.outline.contours)
-        points: List[Tuple[int, int]] = self.ftGlyph.outline.points # points are tuples of int
-        flags: List[int] = self.ftGlyph.outline.tags # tags are list of int (bytes really)
-        # The commented print line:
-        # print(
-        #    self.glyphName,
-        #    self.ftFace.glyph.get_glyph().get_cbox(freetype.FT_GLYPH_BBOX_PIXELS),
-        # )
-        curve_type: str = "curve" if any(t & 0x02 for t in flags) else "qcurve"
-        from_index: int = 0
-        for to_index in contours:
-            c_points: List[Tuple[int, int]] = points[from_index:to_index]
-            c_flags: List[int] = flags[from_index:to_index]
-            pen.beginPath()
-            for i_idx, (pt_x, pt_y) in enumerate(c_points): # Iterate properly
-                point_coord: Tuple[int, int] = (pt_x, pt_y)
-                segment_type: Optional[str] = None
-                if not c_flags[i_idx] & 0x01: # current point is off-curve
-                    segment_type = None
-                elif c_flags[i_idx -1] & 0x01: # previous point was on-curve
-                    segment_type = "line"
-                else: # previous point was off-curve, current is on-curve
-                    segment_type = curve_type
-                pen.addPoint(point_coord, segmentType=segment_type)
-            pen.endPath()
-            from_index = to_index
+        # ftGlyph is GlyphSlot
+        draw_outline_to_point_pen(*read_outline(self.ftGlyph), pen)
 
     def draw_glyph_to_pen(self, pen: Any) -> None:  # pen is a SegmentPen
         # PointToSegmentPen expects a SegmentPen
         self.draw_glyph_to_point_pen(PointToSegmentPen(pen))
 
-    def draw_glyph_to_tt_glyph(self) -> None:
-        self.prep_glyph()
-        # TTGlyphPointPen expects a glyphSet
-        pen = TTGlyphPointPen(glyphSet=self.glyphSet, handleOverflowingTransforms=True)
-        self.draw_glyph_to_point_pen(pen)
-        self.ttFont["glyf"][self.glyphName] = pen.glyph() # type: ignore[index]
-        self.ttFont["hmtx"][self.glyphName] = (self.width, self.lsb) # type: ignore[index]
-
-    def draw_glyph_to_ps_glyph(self) -> None:
-        cff = self.ttFont["CFF "].cff # type: ignore[index]
-        top_dict: Any = cff.topDictIndex[0]
-        self.prep_glyph()
-        # print(self.glyphName, self.lsb, self.width) # Removed debug print
-        # T2CharStringPen expects width and glyphSet
+    def tt_glyph(self, frozen: "FrozenGlyph") -> Glyph:
+        """Returns a frozen outline as a simple glyf `Glyph`."""
+        glyph: Optional[Glyph] = build_tt_glyph(frozen)
+        if glyph is None:
+            # TTGlyphPointPen expects a glyphSet
+            pen = TTGlyphPointPen(
+                glyphSet=self.glyphSet, handleOverflowingTransforms=True
+            )
+            draw_outline_to_point_pen(frozen.points, frozen.tags, frozen.contours, pen)
+            glyph = pen.glyph()
+        return glyph
+
+    def draw_glyph_to_tt_glyph(self, frozen: Optional["FrozenGlyph"] = None) -> None:
+        if frozen is None:
+            self.prep_glyph()
+            frozen = self.frozen_glyph()
+        self.ttFont["glyf"][self.glyphName] = self.tt_glyph(frozen)  # type: ignore[index]
+        self.ttFont["hmtx"][self.glyphName] = (frozen.width, frozen.lsb)  # type: ignore[index]
+
+    def draw_glyph_to_ps_glyph(self, frozen: Optional["FrozenGlyph"] = None) -> None:
+        cff_tag = "CFF2" if "CFF2" in self.ttFont else "CFF "  # type: ignore[operator]
+        cff = self.ttFont[cff_tag].cff  # type: ignore[index]
+        char_strings: Any = cff.topDictIndex[0].CharStrings
+        if frozen is None:
+            self.prep_glyph()
+            frozen = self.frozen_glyph()
+        is_cff2: bool = cff_tag == "CFF2"
+        # T2CharStringPen expects width and glyphSet;
+        # CFF2 has no widths in charstrings, only in hmtx.
         pen = T2CharStringPen(
-            width=self.width, glyphSet=self.glyphSet, roundTolerance=0.5, CFF2=False
-        )
-        self.draw_glyph_to_pen(pen)
-        top_dict.CharStrings.charStringsIndex.items.append(None)
-        i: int = len(top_dict.CharStrings.charStringsIndex) - 1
-        top_dict.CharStrings.charStringsIndex[i] = pen.getCharString(
-            private=top_dict.Private
-        )
-        top_dict.CharStrings.charStrings[self.glyphName] = i
-        self.ttFont["hmtx"][self.glyphName] = (self.width, self.lsb) # type: ignore[index]
-
-    def freeze_hints(self) -> None:
-        if "glyf" in self.ttFont: # type: ignore[operator]
-            for glyph_name_loopvar in self.glyphNames:
-                self.glyphName = glyph_name_loopvar
-                self.draw_glyph_to_tt_glyph()
-        elif "CFF " in self.ttFont: # type: ignore[operator]
-            cff = self.ttFont["CFF "].cff # type: ignore[index]
+            width=None if is_cff2 else frozen.width,
+            glyphSet=self.glyphSet,
+            roundTolerance=0.5,
+            CFF2=is_cff2,
+        )
+        draw_outline_to_point_pen(
+            frozen.points, frozen.tags, frozen.contours, PointToSegmentPen(pen)
+        )
+        # Replace the charstring in place, reusing its (FD) private dict,
+        # so the original outlines do not stay in the CharStrings INDEX.
+        source: Any = char_strings[self.glyphName]
+        char_strings[self.glyphName] = pen.getCharString(
+            private=source.private, globalSubrs=source.globalSubrs
+        )
+        self.ttFont["hmtx"][self.glyphName] = (frozen.width, frozen.lsb)  # type: ignore[index]
+
+    def source_font(self) -> TTFont:
+        """Returns a lazy reader of the source font, untouched by freezing."""
+        if self._source_font is None:
+            self._source_font = self._open_tt_font()
+        return self._source_font
+
+    def unhinted_glyphs(self) -> Set[str]:
+        """Returns the glyphs the fast path can compute at the current size and mode.
+
+        Empty when the fast path is off or does not apply (see
+        `unhinted.fast_path_applies`), e.g. at a variation location.
+        """
+        source = self.source_font()
+        if (
+            not self.fast_path
+            or self.var_location is not None
+            or not fast_path_applies(source, self.ppm, self.render_mode)
+        ):
+            return set()
+        if self._unhinted is None:
+            glyf = source["glyf"]
+            hmtx = source["hmtx"]
+            self._unhinted = {
+                glyph_name
+                for glyph_name in source.getGlyphOrder()
+                if is_unhinted(glyf.glyphs[glyph_name], hmtx[glyph_name][1])
+            }
+        return self._unhinted
+
+    def unhinted_frozen_glyph(self, glyph_name: str) -> "FrozenGlyph":
+        """Computes the frozen outline of a glyph in `unhinted_glyphs()`."""
+        source = self.source_font()
+        glyph: Any = source["glyf"].glyphs[glyph_name]  # type: ignore[index]
+        if hasattr(glyph, "data"):
+            # A copy, so the source glyph stays compact.
+            glyph = Glyph(glyph.data)
+            glyph.expand(None)
+        return FrozenGlyph(
+            *scale_glyph(
+                glyph,
+                source["hmtx"][glyph_name][0],  # type: ignore[index]
+                self.ppm,
+                self.upm,
+                self.rescale_glyphs,
+                self.rescale_metrics,
+            )
+        )
+
+    def iter_frozen_glyphs(
+        self, jobs: int = 1, glyph_names: Optional[List[str]] = None
+    ) -> Iterator[Tuple[str, "FrozenGlyph"]]:
+        """Yields `(glyph name, FrozenGlyph)` pairs in glyph order.
+
+        Glyphs without instructions are computed without FreeType (see
+        `unhinted_glyphs()`). With `jobs > 1`, the other glyphs are split
+        into chunks that are loaded by worker processes, each with its own
+        FreeType face at the same size, mode and variation location.
+        `glyph_names` restricts the glyphs to load; it defaults to all of
+        them. With `verify_fast_path`, computed glyphs are loaded too;
+        those that differ are logged, recorded in `fast_path_mismatches`
+        and replaced with FreeType's outline.
+        """
+        if glyph_names is None:
+            glyph_names = list(self.glyphNames)
+        unhinted = self.unhinted_glyphs()
+        if not unhinted:
+            yield from self._load_frozen_glyphs(jobs, glyph_names)
+            return
+        self.fast_path_mismatches = []
+        to_load = glyph_names
+        if not self.verify_fast_path:
+            to_load = [name for name in glyph_names if name not in unhinted]
+        loaded = self._load_frozen_glyphs(jobs, to_load)
+        computed = 0
+        for glyph_name in glyph_names:
+            if glyph_name not in unhinted:
+                yield next(loaded)
+                continue
+            frozen = self.unhinted_frozen_glyph(glyph_name)
+            computed += 1
+            if self.verify_fast_path:
+                _, expected = next(loaded)
+                if not same_outline(frozen, expected):
+                    log.warning("Fast path differs from FreeType for %s", glyph_name)
+                    self.fast_path_mismatches.append(glyph_name)
+                    frozen = expected
+            self.glyphName = glyph_name
+            yield glyph_name, frozen
+        if self.verify_fast_path:
+            log.info(
+                "Fast path verified: %d of %d computed glyphs match FreeType",
+                computed - len(self.fast_path_mismatches),
+                computed,
+            )
+
+    def _load_frozen_glyphs(
+        self, jobs: int, glyph_names: List[str]
+    ) -> Iterator[Tuple[str, "FrozenGlyph"]]:
+        profiler = self.profiler
+        if jobs <= 1:
+            for glyph_name in glyph_names:
+                self.glyphName = glyph_name
+                if profiler is None:
+                    self.prep_glyph()
+                    yield glyph_name, self.frozen_glyph()
+                    continue
+                start = time.perf_counter()
+                self.prep_glyph()
+                loaded = time.perf_counter()
+                frozen = self.frozen_glyph()
+                profiler.record_load(
+                    glyph_name, loaded - start, time.perf_counter() - loaded
+                )
+                yield glyph_name, frozen
+            return
+
+        chunk_size = max(1, -(-len(glyph_names) // (jobs * 4)))
+        chunks: List[List[str]] = [
+            glyph_names[i : i + chunk_size]
+            for i in range(0, len(glyph_names), chunk_size)
+        ]
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(
+                self.font_path or self.font_data,
+                self.font_number,
+                self.ppm,
+                self.render_mode,
+                self.render,
+                self.var_location,
+            ),
+        ) as executor:
+            # executor.map returns chunks in submission order,
+            # so the output is identical to a serial run.
+            results = executor.map(_freeze_chunk, chunks, repeat(profiler is not None))
+            for chunk, (frozen_glyphs, timings) in zip(chunks, results):
+                for glyph_name, frozen in zip(chunk, frozen_glyphs):
+                    self.glyphName = glyph_name
+                    yield glyph_name, frozen
+                if profiler is not None:
+                    for glyph_name, (load, read) in zip(chunk, timings):
+                        profiler.record_load(glyph_name, load, read)
+
+    def freeze_hints(
+        self,
+        jobs: int = 1,
+        previous: Optional[TTFont] = None,
+        unchanged: Collection[str] = (),
+    ) -> None:
+        """Replaces every outline and advance with its hinted version.
+
+        With a `previous` frozen output of the same font and settings,
+        the glyf glyphs and metrics of the `unchanged` glyphs are copied
+        from it instead of being loaded through FreeType (TrueType only,
+        see `incremental.unchanged_glyphs`).
+        """
+        if "glyf" in self.ttFont:  # type: ignore[operator]
+            reused: Set[str] = set()
+            if previous is not None:
+                reused = {name for name in unchanged if name in self.glyphSet}
+            if self.stream:
+                glyph_order = self.ttFont.getGlyphOrder()
+                self._stream_tt_glyphs(
+                    self.iter_frozen_glyphs(
+                        jobs, [name for name in glyph_order if name not in reused]
+                    ),
+                    previous,
+                    reused,
+                )
+                return
+            self._freeze_tt_glyphs(jobs, previous, reused)
+        elif "CFF " in self.ttFont or "CFF2" in self.ttFont:  # type: ignore[operator]
+            self.write_frozen_glyphs(self.iter_frozen_glyphs(jobs))
+
+    def _freeze_tt_glyphs(
+        self, jobs: int, previous: Optional[TTFont], reused: Set[str]
+    ) -> None:
+        """Freezes the glyf glyphs in memory, rebuilding the kept composites."""
+        composites = {
+            name: components
+            for name, components in self.source_composites.items()
+            if name not in reused
+        }
+        needed = set(composites)
+        for components in composites.values():
+            needed.update(c.glyphName for c in components)
+        for glyph_name in reused:
+            self.ttFont["glyf"][glyph_name] = previous["glyf"][glyph_name]  # type: ignore[index]
+            self.ttFont["hmtx"][glyph_name] = previous["hmtx"][glyph_name]  # type: ignore[index]
+        # Components of a re-frozen composite are loaded again even if
+        # unchanged, because the composite check needs their outlines.
+        to_freeze = [
+            name for name in self.glyphNames if name not in reused or name in needed
+        ]
+        frozen_glyphs: Dict[str, FrozenGlyph] = {}
+        for glyph_name, frozen in self.iter_frozen_glyphs(jobs, to_freeze):
+            self._convert(self.draw_glyph_to_tt_glyph, glyph_name, frozen)
+            if glyph_name in needed:
+                frozen_glyphs[glyph_name] = frozen
+        for glyph_name, components in composites.items():
+            composite = build_composite_glyph(
+                frozen_glyphs[glyph_name], components, frozen_glyphs
+            )
+            if composite is not None:
+                self.ttFont["glyf"][glyph_name] = composite  # type: ignore[index]
+
+    def dehint(self) -> None:
+        """Strips the hinting tables and writes the device metrics of the frozen font.
+
+        Call it after `freeze_hints()`; see `dehint.strip_hinting` and
+        `dehint.add_device_metrics`. The frozen glyphs already have no
+        instructions. Does nothing for CFF fonts, whose frozen charstrings
+        have no hints.
+        """
+        if "glyf" not in self.ttFont:  # type: ignore[operator]
+            return
+        strip_hinting(self.ttFont, self.render_mode)
+        add_device_metrics(self.ttFont, self.ppm)
+        self.changed_tables.update(DEHINTED_TABLES)
+        self.dehinted = True
+
+    def write_frozen_glyphs(
+        self, frozen_glyphs: Iterable[Tuple[str, "FrozenGlyph"]]
+    ) -> None:
+        """Writes glyphs frozen elsewhere, e.g. read back from shard files.
+
+        `frozen_glyphs` yields `(glyph name, FrozenGlyph)` pairs in glyph
+        order, covering every glyph. Nothing is loaded through FreeType;
+        composites are written flattened.
+        """
+        if "glyf" in self.ttFont:  # type: ignore[operator]
+            if self.stream:
+                self._stream_tt_glyphs(iter(frozen_glyphs), None, set())
+                return
+            draw = self.draw_glyph_to_tt_glyph
+        elif "CFF " in self.ttFont or "CFF2" in self.ttFont:  # type: ignore[operator]
+            cff_tag = "CFF2" if "CFF2" in self.ttFont else "CFF "  # type: ignore[operator]
+            cff = self.ttFont[cff_tag].cff  # type: ignore[index]
             cff.desubroutinize()
-            for glyph_name_loopvar in self.glyphNames:
-                self.glyphName = glyph_name_loopvar
-                self.draw_glyph_to_ps_glyph()
+            draw = self.draw_glyph_to_ps_glyph
+        else:
+            return
+        for glyph_name, frozen in frozen_glyphs:
+            self.glyphName = glyph_name
+            self._convert(draw, glyph_name, frozen)
+
+    def _stream_tt_glyphs(
+        self,
+        frozen_glyphs: Iterator[Tuple[str, "FrozenGlyph"]],
+        previous: Optional[TTFont],
+        reused: Set[str],
+    ) -> None:
+        # Frozen and reused glyphs are interleaved in glyph order, so each
+        # is compiled and dropped before the next one is built.
+        writer = GlyfWriter(self.ttFont)
+        glyph_order = self.ttFont.getGlyphOrder()
+
+        def write(frozen: FrozenGlyph) -> None:
+            self.ttFont["hmtx"][glyph_name] = (frozen.width, frozen.lsb)  # type: ignore[index]
+            writer.add(glyph_name, self.tt_glyph(frozen))
+
+        for glyph_name in glyph_order:
+            if glyph_name in reused:
+                assert previous is not None
+                # A copy of the raw glyph, so the previous font stays compact.
+                source: Any = previous["glyf"].glyphs[glyph_name]  # type: ignore[index]
+                data = getattr(source, "data", None)
+                glyph = Glyph(
+                    data if data is not None else source.compile(previous["glyf"])
+                )  # type: ignore[index]
+                self.ttFont["hmtx"][glyph_name] = previous["hmtx"][glyph_name]  # type: ignore[index]
+                writer.add(glyph_name, glyph)
+                continue
+            _, frozen = next(frozen_glyphs)
+            self._convert(write, glyph_name, frozen)
+        writer.finish()
+
+    def _convert(self, draw: Any, glyph_name: str, frozen: "FrozenGlyph") -> None:
+        if self.profiler is None:
+            draw(frozen)
+            return
+        start = time.perf_counter()
+        draw(frozen)
+        self.profiler.record_convert(
+            glyph_name,
+            time.perf_counter() - start,
+            len(frozen.points),
+            len(frozen.contours),
+        )
+
+    def freeze(
+        self,
+        ppm: Optional[int] = None,
+        render_mode: str = "lcd",
+        var: Optional[Dict[str, float]] = None,
+        jobs: int = 1,
+        subroutinize: bool = False,
+        unicodes: Any = (),
+        glyphs: Any = (),
+        text: str = "",
+        dehint: bool = False,
+    ) -> None:
+        """Freezes the source font at one size, mode and location.
+
+        Starts from the source font, calling `reset()` if an earlier
+        freeze instantiated, subsetted or dehinted it, then applies `var`
+        (static instance) and the subset, and freezes all glyphs.
+        """
+        if (
+            self.var_location is not None
+            or self.subset_glyphs is not None
+            or self.dehinted
+        ):
+            self.reset()
+        if var and "fvar" in self.source_tables:
+            self.instantiate(var)
+        if unicodes or glyphs or text:
+            self.subset(unicodes=unicodes or (), glyphs=glyphs or (), text=text or "")
+        self.set_size(ppm, render_mode)
+        self.freeze_hints(jobs=jobs)
+        if subroutinize:
+            self.subroutinize_cff()
+        if dehint:
+            self.dehint()
+
+    def to_bytes(self) -> bytes:
+        """Returns the frozen font as it would be saved."""
+        stream = io.BytesIO()
+        self.save(stream)
+        return stream.getvalue()
+
+    def save(self, path: Union[str, Path, BinaryIO]) -> None:
+        """Saves the frozen font to a path or a binary file object.
+
+        Only the tables the freeze changed are compiled. Tables outside
+        `changed_tables` that were decompiled only to be read (e.g. `post`
+        for the glyph order) are released first, so that `TTFont.save()`
+        copies their original bytes verbatim.
+        """
+        reader = self.ttFont.reader
+        for tag in list(self.ttFont.tables):
+            if tag not in self.changed_tables and reader is not None and tag in reader:
+                del self.ttFont.tables[tag]
+        if hasattr(path, "write"):
+            self.ttFont.save(path)
+            return
+        # The lazy TTFont still reads from the source buffer, so the output
+        # is compiled completely before its file is opened.
+        stream = io.BytesIO()
+        self.ttFont.save(stream)
+        with open(path, "wb") as f:
+            f.write(stream.getbuffer())
+
+    def subroutinize_cff(self) -> Tuple[int, int]:
+        """Packs repeated charstring fragments into global and local subrs.
+
+        `freeze_hints()` desubroutinizes CFF/CFF2 outlines; this stage
+        re-subroutinizes the frozen charstrings with the AFDKO `tx` tool
+        bundled in the optional `cffsubr` package. Returns the compiled
+        table size before and after, or `(0, 0)` for TrueType fonts.
+        """
+        cff_tag = "CFF2" if "CFF2" in self.ttFont else "CFF "  # type: ignore[operator]
+        if cff_tag not in self.ttFont:  # type: ignore[operator]
+            return 0, 0
+        try:
+            import cffsubr
+        except ImportError as e:
+            raise ImportError(
+                "CFF subroutinization requires the cffsubr package: "
+                "pip install opentype-hinting-freezer[subroutinize]"
+            ) from e
+        size_before = len(self.ttFont[cff_tag].compile(self.ttFont))  # type: ignore[index]
+        cffsubr.subroutinize(self.ttFont, keep_glyph_names=True)
+        size_after = len(self.ttFont[cff_tag].compile(self.ttFont))  # type: ignore[index]
+        return size_before, size_after
+
+
+class FrozenGlyph(NamedTuple):
+    """Hinted outline and metrics of one glyph, as loaded by FreeType.
+
+    `points`, `tags` and `contours` are NumPy arrays when NumPy is
+    installed and lists otherwise (see `outline.read_outline`).
+    """
+
+    points: Any
+    tags: Any
+    contours: Any
+    width: int
+    lsb: int
+
+
+def draw_outline_to_point_pen(points: Any, flags: Any, contours: Any, pen: Any) -> None:
+    """Draws a FreeType outline (points, tags, contour ends) to a PointPen."""
+    seg_types: List[Optional[str]] = segment_types(flags, contours)
+    coords: List[Any] = points.tolist() if hasattr(points, "tolist") else points
+    from_index: int = 0
+    for contour_end in contours:
+        to_index: int = int(contour_end) + 1
+        pen.beginPath()
+        for i_idx in range(from_index, to_index):
+            pt_x, pt_y = coords[i_idx]
+            pen.addPoint((pt_x, pt_y), segmentType=seg_types[i_idx])
+        pen.endPath()
+        from_index = to_index
+
+
+def build_tt_glyph(frozen: FrozenGlyph) -> Optional[Glyph]:
+    """Builds a simple glyf `Glyph` directly from a quadratic outline.
+
+    Produces the same glyph as drawing the outline to a `TTGlyphPointPen`,
+    without the per-point pen calls. Returns None for outlines the pen
+    has to handle (cubic curves or empty contours).
+    """
+    tags = frozen.tags
+    contours = frozen.contours
+    if curve_type(tags) != "qcurve":
+        return None
+    end_pts: List[int] = (
+        contours.tolist() if hasattr(contours, "tolist") else list(contours)
+    )
+    if any(end <= prev for prev, end in zip([-1, *end_pts], end_pts)):
+        return None
+
+    glyph = Glyph()
+    points = frozen.points
+    glyph.coordinates = GlyphCoordinates(
+        points.tolist() if hasattr(points, "tolist") else points
+    )
+    glyph.endPtsOfContours = end_pts
+    if hasattr(tags, "tobytes"):
+        glyph.flags = array("B", (tags & FT_CURVE_TAG_ON).astype("B").tobytes())
+    else:
+        glyph.flags = array("B", (t & FT_CURVE_TAG_ON for t in tags))
+    glyph.numberOfContours = len(end_pts)
+    glyph.program = ttProgram.Program()
+    glyph.program.fromBytecode(b"")
+    return glyph
+
+
+def build_composite_glyph(
+    frozen: FrozenGlyph,
+    components: List[GlyphComponent],
+    frozen_glyphs: Mapping[str, FrozenGlyph],
+) -> Optional[Glyph]:
+    """Rebuilds a composite glyph from its frozen components, if possible.
+
+    The frozen composite outline must be the concatenation of its
+    components' frozen outlines, each shifted by one constant offset, which
+    becomes the new component offset. Points may deviate from that offset
+    by `COMPOSITE_TOLERANCE` font units, the rounding noise of scaling the
+    hinted outline back to font units. Returns None when hinting changed
+    the combination (or for scaled and point-matched components), in which
+    case the flattened outline is kept.
+    """
+    points = _point_list(frozen.points)
+    on_curve = [t & FT_CURVE_TAG_ON for t in _int_list(frozen.tags)]
+    end_pts = _int_list(frozen.contours)
+    new_components: List[GlyphComponent] = []
+    start: int = 0
+    for component in components:
+        component_frozen = frozen_glyphs.get(component.glyphName)
+        if (
+            component_frozen is None
+            or hasattr(component, "transform")
+            or not hasattr(component, "x")
+        ):
+            return None
+        c_points = _point_list(component_frozen.points)
+        end = start + len(c_points)
+        c_on_curve = [t & FT_CURVE_TAG_ON for t in _int_list(component_frozen.tags)]
+        if on_curve[start:end] != c_on_curve:
+            return None
+        if c_points:
+            deltas = [
+                (x - c_x, y - c_y)
+                for (x, y), (c_x, c_y) in zip(points[start:end], c_points)
+            ]
+            (dx, dy), _ = Counter(deltas).most_common(1)[0]
+            if any(
+                abs(x - dx) > COMPOSITE_TOLERANCE or abs(y - dy) > COMPOSITE_TOLERANCE
+                for x, y in deltas
+            ):
+                return None
+        else:
+            dx, dy = component.x, component.y
+        new_component = GlyphComponent()
+        new_component.glyphName = component.glyphName
+        new_component.x, new_component.y = dx, dy
+        # Offsets are already grid-fitted, and rounding them again would
+        # move the component away from the frozen position at other sizes.
+        new_component.flags = component.flags & ~ROUND_XY_TO_GRID
+        new_components.append(new_component)
+        start = end
+    if start != len(points):
+        return None
+    expected_end_pts: List[int] = []
+    offset: int = 0
+    for component in components:
+        component_frozen = frozen_glyphs[component.glyphName]
+        expected_end_pts.extend(
+            offset + e for e in _int_list(component_frozen.contours)
+        )
+        offset += len(component_frozen.points)
+    if end_pts != expected_end_pts:
+        return None
+
+    glyph = Glyph()
+    glyph.numberOfContours = -1
+    glyph.components = new_components
+    return glyph
+
+
+def _point_list(points: Any) -> List[Tuple[int, int]]:
+    return [
+        (x, y) for x, y in (points.tolist() if hasattr(points, "tolist") else points)
+    ]
+
+
+def _int_list(values: Any) -> List[int]:
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+_worker_freezer: Optional[FontHintFreezer] = None
+
+
+def _init_worker(
+    font_source: Union[bytes, Path],
+    font_number: int,
+    ppm: int,
+    render_mode: str,
+    render: bool,
+    var_location: Optional[Dict[str, float]],
+) -> None:
+    global _worker_freezer
+    options: Dict[str, Any] = dict(
+        font_number=font_number, ppm=ppm, render_mode=render_mode, render=render
+    )
+    # Workers map the font file themselves rather than receive its bytes.
+    if isinstance(font_source, Path):
+        _worker_freezer = FontHintFreezer.from_path(font_source, **options)
+    else:
+        _worker_freezer = FontHintFreezer(font_source, **options)
+    if var_location:
+        _worker_freezer.set_var_location(var_location)
+
+
+def _freeze_chunk(
+    glyph_names: List[str], timed: bool = False
+) -> Tuple[List[FrozenGlyph], List[Tuple[float, float]]]:
+    """Loads a chunk of glyphs; with `timed`, also their load and read times."""
+    fhf = _worker_freezer
+    assert fhf is not None
+    frozen_glyphs: List[FrozenGlyph] = []
+    timings: List[Tuple[float, float]] = []
+    for glyph_name in glyph_names:
+        fhf.glyphName = glyph_name
+        start = time.perf_counter() if timed else 0.0
+        fhf.prep_glyph()
+        loaded = time.perf_counter() if timed else 0.0
+        frozen_glyphs.append(fhf.frozen_glyph())
+        if timed:
+            timings.append((loaded - start, time.perf_counter() - loaded))
+    return frozen_glyphs, timings
 
 
 def read_from_path(path: Union[str, Path]) -> bytes:
@@ -156,7 +971,539 @@ def read_from_path(path: Union[str, Path]) -> bytes:
     return fontData
 
 
-def freezehinting(fontpath, out=None, ppm=None, subfont=0, var=None, mode="lcd"):
+def map_from_path(path: Union[str, Path]) -> mmap.mmap:
+    """Memory-maps a file (copy-on-write, so ctypes can share the buffer)."""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+
+class _MemoryStream:
+    """Hands a buffer to `freetype.Face`, which calls `read()` once.
+
+    FreeType then creates a memory face over the buffer itself instead of
+    over a copy; for memory maps, the ctypes array shares the mapping.
+    """
+
+    def __init__(self, font_data: Union[bytes, mmap.mmap]) -> None:
+        self.font_data = font_data
+
+    def read(self) -> Any:
+        if isinstance(self.font_data, mmap.mmap):
+            return (ctypes.c_ubyte * len(self.font_data)).from_buffer(self.font_data)
+        return self.font_data
+
+
+def output_path_for(
+    fontpath: Union[str, Path],
+    ppm: int,
+    mode: str,
+    out_dir: Optional[Union[str, Path]] = None,
+    instance: Optional[str] = None,
+) -> Path:
+    """Returns the automatic output path, e.g. `font.fhf-12-mono.ttf`.
+
+    Instances of a variable font add their name, e.g.
+    `font.fhf-12-mono-SemiBold.ttf`.
+    """
+    font_path_obj = Path(fontpath)
+    suffix = ""
+    if instance:
+        suffix = "-" + "".join(c for c in instance if c.isalnum() or c in "-_.")
+    output_path = Path(
+        f"{font_path_obj.stem}.fhf-{ppm}-{mode}{suffix}{font_path_obj.suffix}"
+    )
+    if out_dir is not None:
+        output_path = Path(out_dir) / output_path
+    return output_path
+
+
+def freeze_bytes(
+    font_data: Union[bytes, BinaryIO],
+    ppm: Optional[int] = None,
+    mode: str = "lcd",
+    subfont: int = 0,
+    var: Optional[Dict[str, float]] = None,
+    jobs: int = 1,
+    render: bool = False,
+    keep_composites: bool = False,
+    subroutinize: bool = False,
+    unicodes: Any = (),
+    glyphs: Any = (),
+    text: str = "",
+    stream: bool = False,
+    fast_path: bool = True,
+    verify_fast_path: bool = False,
+    dehint: bool = False,
+) -> bytes:
+    """Freezes a font held in memory and returns the frozen font's bytes.
+
+    `font_data` is the font file's contents or a binary file object to
+    read them from. The options are those of `freezehinting()` for a
+    single PPM and mode; nothing touches the filesystem. To serve many
+    requests for the same fonts, keep the freezers warm with a
+    `pool.FreezerPool` instead.
+    """
+    if not isinstance(font_data, (bytes, bytearray)):
+        font_data = font_data.read()
+    fhf = FontHintFreezer(
+        bytes(font_data),
+        font_number=subfont,
+        render=render,
+        keep_composites=keep_composites,
+        stream=stream,
+        fast_path=fast_path,
+        verify_fast_path=verify_fast_path,
+    )
+    fhf.freeze(
+        ppm,
+        mode,
+        var=var,
+        jobs=jobs,
+        subroutinize=subroutinize,
+        unicodes=unicodes,
+        glyphs=glyphs,
+        text=text,
+        dehint=dehint,
+    )
+    return fhf.to_bytes()
+
+
+def named_instances(
+    fontpath: Union[str, Path], subfont: int = 0
+) -> List[Tuple[str, Dict[str, float]]]:
+    """Returns the `(subfamily name, location)` of every fvar instance."""
+    with TTFont(fontpath, fontNumber=subfont, lazy=True) as font:
+        if "fvar" not in font:
+            return []
+        name_table = font["name"]
+        return [
+            (
+                name_table.getDebugName(instance.subfamilyNameID)
+                or instance_name(instance.coordinates),
+                dict(instance.coordinates),
+            )
+            for instance in font["fvar"].instances
+        ]
+
+
+def instance_name(var_location: Mapping[str, float]) -> str:
+    """Names a location for output files, e.g. `wght700-wdth75`."""
+    return "-".join(f"{tag.strip()}{value:g}" for tag, value in var_location.items())
+
+
+def units_per_em(fontpath: Union[str, Path], subfont: int = 0) -> int:
+    """Reads unitsPerEm without decompiling anything but the head table."""
+    with TTFont(fontpath, fontNumber=subfont, lazy=True) as font:
+        return font["head"].unitsPerEm
+
+
+def _freeze_stdio(fontpath: Any, out: Any, options: Dict[str, Any]) -> None:
+    """Freezes a font read from stdin and/or written to stdout (`-`).
+
+    Both ends are a single stream, so this supports one PPM and mode and
+    the options of `freeze_bytes()`; the file-based options are rejected.
+    """
+    file_options = ("cache", "incremental", "instances", "profile", "collection")
+    unsupported = [name for name in file_options if options.pop(name)]
+    for name in ("ppm", "mode"):
+        if isinstance(options[name], (list, tuple)):
+            if len(options[name]) != 1:
+                unsupported.append(name + " list")
+            options[name] = options[name][0]
+    if unsupported:
+        raise ValueError(
+            f"{', '.join(unsupported)} cannot be used with "
+            f"{STDIO_PATH!r} input or output"
+        )
+    if str(fontpath) == STDIO_PATH:
+        font_data = sys.stdin.buffer.read()
+    else:
+        font_data = read_from_path(fontpath)
+    frozen = freeze_bytes(font_data, **options)
+    if out is None or str(out) == STDIO_PATH:
+        sys.stdout.buffer.write(frozen)
+        sys.stdout.buffer.flush()
+    else:
+        with open(out, "wb") as f:
+            f.write(frozen)
+
+
+def freeze_collection(
+    fontpath: Union[str, Path],
+    outputs: Sequence[Tuple[Union[str, Path], Optional[int], str]],
+    jobs: int = 1,
+    render: bool = False,
+    keep_composites: bool = False,
+    subroutinize: bool = False,
+    stream: bool = False,
+    fast_path: bool = True,
+    verify_fast_path: bool = False,
+    dehint: bool = False,
+) -> List[List[int]]:
+    """Freezes every subfont of a TTC/OTC into one collection per output.
+
+    `outputs` lists `(path, ppm, mode)` triples. Subfonts sharing their
+    glyph data (see `collection.subfont_groups`) are frozen once; each
+    group's freezer is reused for every output. Returns the groups.
+    """
+    font_data: Union[bytes, mmap.mmap]
+    if any(
+        Path(path).exists() and os.path.samefile(path, fontpath)
+        for path, _, _ in outputs
+    ):
+        # Saving would truncate a memory-mapped input under the freezers.
+        font_data = read_from_path(fontpath)
+    else:
+        font_data = map_from_path(fontpath)
+    groups = subfont_groups(font_data)
+    log.info(
+        "Freezing %d distinct glyph sets for %d subfonts",
+        len(groups),
+        sum(map(len, groups)),
+    )
+    frozen: List[List[bytes]] = [[] for _ in outputs]
+    for group in groups:
+        fhf = FontHintFreezer(
+            font_data,
+            font_number=group[0],
+            render=render,
+            keep_composites=keep_composites,
+            stream=stream,
+            fast_path=fast_path,
+            verify_fast_path=verify_fast_path,
+        )
+        if isinstance(font_data, mmap.mmap):
+            # Workers map the file themselves; a memory map cannot be pickled.
+            fhf.font_path = Path(fontpath)
+        for index, (_, size, render_mode) in enumerate(outputs):
+            fhf.set_size(size, render_mode)
+            fhf.freeze_hints(jobs=jobs)
+            if subroutinize:
+                fhf.subroutinize_cff()
+            if dehint:
+                fhf.dehint()
+            frozen[index].append(fhf.to_bytes())
+    frozen_tags = FROZEN_TABLES | DEHINTED_TABLES if dehint else FROZEN_TABLES
+    for (path, _, _), frozen_fonts in zip(outputs, frozen):
+        collection = build_collection(font_data, groups, frozen_fonts, frozen_tags)
+        # Compiled completely before the file is opened, as in save().
+        buffer = io.BytesIO()
+        collection.save(buffer, shareTables=True)
+        with open(path, "wb") as f:
+            f.write(buffer.getbuffer())
+    return groups
+
+
+def _as_list(value: Any) -> List[Any]:
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _cache_key(
+    freeze_cache: FreezeCache,
+    font_digest: str,
+    ppm: Optional[int],
+    mode: str,
+    subfont: int = 0,
+    var: Optional[Mapping[str, float]] = None,
+    update_names: bool = False,
+    render: bool = False,
+    keep_composites: bool = False,
+    subroutinize: bool = False,
+    unicodes: Any = None,
+    glyphs: Any = None,
+    text: Any = None,
+    dehint: bool = False,
+    fast_path: bool = True,
+    verify_fast_path: bool = False,
+) -> str:
+    """Returns the cache key of one `freezehinting()` output."""
+    return freeze_cache.key(
+        font_digest,
+        ppm=ppm,
+        mode=mode,
+        subfont=subfont,
+        # 700 and 700.0 are the same location.
+        var={tag: float(value) for tag, value in var.items()} if var else None,
+        update_names=update_names,
+        render=render,
+        keep_composites=keep_composites,
+        subroutinize=subroutinize,
+        unicodes=unicodes,
+        glyphs=glyphs,
+        text=text,
+        dehint=dehint,
+        fast_path=fast_path,
+        verify_fast_path=verify_fast_path,
+    )
+
+
+class _Output(NamedTuple):
+    """One output of a `freezehinting()` call, see `_plan_outputs`."""
+
+    path: Path
+    ppm: Optional[int]
+    mode: str
+    location_index: int
+    instance: Optional[str]
+    location: Optional[Dict[str, float]]
+
+
+def _reject_options(context: str, **options: Any) -> None:
+    """Raises ValueError naming the `options` that are set."""
+    unsupported = [name for name, value in options.items() if value]
+    if unsupported:
+        raise ValueError(f"{', '.join(unsupported)} cannot be used with {context}")
+
+
+def _instance_locations(
+    fontpath: Union[str, Path],
+    subfont: int,
+    var: Optional[Dict[str, float]],
+    instances: Any,
+) -> List[Tuple[Optional[str], Optional[Dict[str, float]]]]:
+    """Returns the `(instance name, location)` pairs of a `freezehinting()` call."""
+    if instances is True:
+        locations = list(named_instances(fontpath, subfont))
+        if not locations:
+            raise ValueError(f"{fontpath} has no named instances")
+        return locations
+    if instances:
+        return [(instance_name(loc), loc) for loc in instances]
+    return [(None, var or None)]
+
+
+def _plan_outputs(
+    fontpath: Union[str, Path],
+    out: Any,
+    subfont: int,
+    ppms: List[Optional[int]],
+    modes: List[str],
+    locations: List[Tuple[Optional[str], Optional[Dict[str, float]]]],
+) -> List[_Output]:
+    """Returns the outputs of every location, PPM and mode, in freezing order.
+
+    A single output is written to `out` if given. Several are named by
+    `output_path_for`, in the `out` directory if given, which is created.
+    """
+    batch = len(ppms) * len(modes) * len(locations) > 1
+    if batch and out:
+        Path(out).mkdir(parents=True, exist_ok=True)
+    upm: Optional[int] = None
+    outputs = []
+    for index, (instance, location) in enumerate(locations):
+        for size in ppms:
+            for render_mode in modes:
+                if out and not batch:
+                    path = Path(out)
+                else:
+                    # FontHintFreezer defaults ppm to upm if None.
+                    # We need a value for the filename.
+                    if size is None and upm is None:
+                        upm = units_per_em(fontpath, subfont)
+                    path = output_path_for(
+                        fontpath,
+                        size if size is not None else upm,
+                        render_mode,
+                        out_dir=out,
+                        instance=instance,
+                    )
+                outputs.append(
+                    _Output(path, size, render_mode, index, instance, location)
+                )
+    return outputs
+
+
+def _open_freezer(
+    fontpath: Union[str, Path],
+    out_paths: Iterable[Union[str, Path]],
+    **options: Any,
+) -> FontHintFreezer:
+    """Opens `fontpath`, memory-mapped unless it is one of the `out_paths`."""
+    if any(
+        Path(path).exists() and os.path.samefile(path, fontpath) for path in out_paths
+    ):
+        # Saving would truncate a memory-mapped input under the freezer.
+        return FontHintFreezer(read_from_path(fontpath), **options)
+    return FontHintFreezer.from_path(fontpath, **options)
+
+
+def _prepare_freezer(
+    fhf: FontHintFreezer,
+    location: Optional[Dict[str, float]],
+    update_names: bool = False,
+    unicodes: Any = None,
+    glyphs: Any = None,
+    text: Any = None,
+) -> None:
+    """Instantiates and subsets a freshly opened or reset freezer."""
+    # Check the source: after the first instance, ttFont is static.
+    if location and "fvar" in fhf.source_tables:
+        fhf.instantiate(location, update_names=update_names)
+    if unicodes or glyphs or text:
+        fhf.subset(unicodes=unicodes or (), glyphs=glyphs or (), text=text or "")
+
+
+def _phase(profiler: Optional[FreezeProfiler], name: str) -> Any:
+    """Returns `profiler.phase(name)`, or a no-op context without a profiler."""
+    return profiler.phase(name) if profiler is not None else nullcontext()
+
+
+def _freeze_one_output(
+    fhf: FontHintFreezer,
+    output: _Output,
+    jobs: int = 1,
+    digests: Optional[Dict[str, Dict[str, str]]] = None,
+    subroutinize: bool = False,
+    dehint: bool = False,
+) -> None:
+    """Freezes a prepared freezer at the PPM and mode of `output` and saves it.
+
+    With the source `digests`, the glyphs unchanged since the manifest of
+    an earlier freeze to the same path are copied from that output (see
+    `incremental.unchanged_glyphs`) and the manifest is rewritten.
+    """
+    fhf.set_size(output.ppm, output.mode)
+    previous: Optional[TTFont] = None
+    unchanged: Set[str] = set()
+    manifest_path = manifest_path_for(output.path)
+    if digests is not None:
+        unchanged = unchanged_glyphs(
+            read_manifest(manifest_path), fhf, digests, output.path, dehint
+        )
+        if unchanged:
+            # Read into memory: the output is overwritten below.
+            previous = TTFont(io.BytesIO(read_from_path(output.path)), lazy=True)
+        log.info(
+            "Reusing %d of %d frozen glyphs from %s",
+            len(unchanged),
+            len(fhf.glyphNames),
+            output.path,
+        )
+    with _phase(fhf.profiler, "freeze"):
+        fhf.freeze_hints(jobs=jobs, previous=previous, unchanged=unchanged)
+    if subroutinize:
+        with _phase(fhf.profiler, "subroutinize"):
+            size_before, size_after = fhf.subroutinize_cff()
+        log.info(
+            "Subroutinized CFF: %d -> %d bytes (%d saved)",
+            size_before,
+            size_after,
+            size_before - size_after,
+        )
+    if dehint:
+        with _phase(fhf.profiler, "dehint"):
+            fhf.dehint()
+    with _phase(fhf.profiler, "save"):
+        fhf.save(output.path)
+    if digests is not None:
+        write_manifest(manifest_path, fhf, digests, output.path, dehint)
+
+
+def _freeze_outputs(
+    fontpath: Union[str, Path],
+    outputs: List[_Output],
+    freezer_options: Dict[str, Any],
+    prepare_options: Dict[str, Any],
+    freeze_options: Dict[str, Any],
+    freeze_cache: Optional[FreezeCache] = None,
+    cache_options: Optional[Dict[str, Any]] = None,
+    incremental: bool = False,
+    profiler: Optional[FreezeProfiler] = None,
+) -> None:
+    """Freezes the planned `outputs` of `freezehinting()` over one freezer.
+
+    The freezer is opened with `freezer_options` at the first output that
+    is not a cache hit and prepared with `prepare_options` for each
+    location; `freeze_options` go to `_freeze_one_output`.
+    """
+    font_digest = file_digest(fontpath) if freeze_cache is not None else ""
+    fhf: Optional[FontHintFreezer] = None
+    digests: Optional[Dict[str, Dict[str, str]]] = None
+
+    # The font is parsed once; every size and mode only re-targets the face
+    # and overwrites all glyf/CFF and hmtx entries from the original outlines.
+    # Each variable font instance re-reads the fontTools side lazily.
+    prepared: Optional[int] = None
+    for output in outputs:
+        cache_key = ""
+        if freeze_cache is not None:
+            cache_key = _cache_key(
+                freeze_cache,
+                font_digest,
+                output.ppm,
+                output.mode,
+                var=output.location,
+                **(cache_options or {}),
+            )
+            if freeze_cache.fetch(cache_key, output.path):
+                log.info("Cache hit: %s", output.path)
+                continue
+
+        if profiler is not None:
+            profiler.begin_output(
+                output=str(output.path),
+                ppm=output.ppm,
+                mode=output.mode,
+                instance=output.instance,
+            )
+        if fhf is None:
+            with _phase(profiler, "open"):
+                fhf = _open_freezer(
+                    fontpath, [output.path for output in outputs], **freezer_options
+                )
+            fhf.profiler = profiler
+        if prepared != output.location_index:
+            with _phase(profiler, "prepare"):
+                _prepare_freezer(fhf, output.location, **prepare_options)
+            prepared = output.location_index
+        if incremental and digests is None:
+            digests = source_digests(fhf)
+        _freeze_one_output(fhf, output, digests=digests, **freeze_options)
+        if freeze_cache is not None:
+            freeze_cache.store(cache_key, output.path)
+
+
+def _write_profile(
+    profiler: FreezeProfiler, profile: Any, out: Any, batch: bool = False
+) -> None:
+    """Writes the report to `profile`, or next to the outputs if it is True."""
+    if profile is True:
+        profile_dir = Path(out) if batch and out else Path.cwd()
+        profile_path = profile_dir / PROFILE_FILENAME
+    else:
+        profile_path = Path(profile)
+    profiler.write(profile_path)
+    log.info("Profile written to %s", profile_path)
+
+
+def freezehinting(
+    fontpath,
+    out=None,
+    ppm=None,
+    subfont=0,
+    var=None,
+    mode="lcd",
+    jobs=1,
+    render=False,
+    keep_composites=False,
+    subroutinize=False,
+    cache=None,
+    cache_size=DEFAULT_CACHE_SIZE_MB,
+    incremental=False,
+    unicodes=None,
+    glyphs=None,
+    text=None,
+    instances=None,
+    profile=None,
+    profile_top=DEFAULT_TOP_GLYPHS,
+    stream=False,
+    collection=False,
+    fast_path=True,
+    verify_fast_path=False,
+    dehint=False,
+):
     """
     OpenType font hinting freezer \n
     A tool that applies the hinting of an OT font
@@ -166,35 +1513,160 @@ def freezehinting(fontpath, out=None, ppm=None, subfont=0, var=None, mode="lcd")
 
     Example:
     pyfthintfreeze font.ttf --ppm=14 --mode="mono"
+    pyfthintfreeze font.ttf --ppm=[10,11,12] --mode=[mono,lcd] --out=outdir
 
     :param fontpath: path to an OTF or TTF or TTC file
-    :param out: output path, automatic if absent
-    :param ppm: pixel-per-em for applying the hinting
+    :param out: output path, automatic if absent; with several PPMs or modes,
+        a directory for the automatically named outputs
+    :param ppm: pixel-per-em for applying the hinting, or a list of them
     :param subfont: subfont index in a TTC file
-    :param var: NOT IMPLEMENTED variable font location as a dict
-    :param mode: hinting mode: "lcd" (default), "lcdv", "mono", "light"
+    :param var: variable font location as a dict; the output is a static
+        instance at that location
+    :param mode: hinting mode: "lcd" (default), "lcdv", "mono", "light",
+        or a list of them
+    :param jobs: number of worker processes that load glyphs in parallel,
+        0 for one per CPU; the output is identical to a serial run
+    :param render: also rasterize each glyph while loading it (slower,
+        the hinted outlines are the same)
+    :param keep_composites: keep composite glyphs as component references
+        when hinting only moved whole components (TrueType only)
+    :param subroutinize: re-subroutinize frozen CFF/CFF2 charstrings
+        (needs the cffsubr package) and report the bytes saved
+    :param cache: directory of a cache of frozen outputs, keyed by the font
+        contents, the options and the FreeType/fontTools versions; hits are
+        copied without opening the font
+    :param cache_size: cache size cap in MiB, least recently used outputs
+        are evicted beyond it
+    :param unicodes: only freeze and keep these codepoints, as a list or a
+        string like "U+0041-005A,0061", plus the glyphs they reach
+    :param glyphs: only freeze and keep these glyph names (list or "a,b")
+    :param text: only freeze and keep the glyphs of this sample text
+    :param instances: freeze every named instance of a variable font
+        (True) or a list of locations, each to a static font named after
+        the instance; the FreeType face is reused for all of them
+    :param incremental: keep a per-glyph manifest next to each output and,
+        when re-freezing to the same output, reload through FreeType only
+        the glyphs whose source changed (TrueType only)
+    :param profile: write a JSON report of the wall time and peak memory of
+        every phase and the load/convert time of every glyph to this path,
+        or to pyfthintfreeze-profile.json next to the outputs (True)
+    :param profile_top: number of slowest glyphs listed in the profile
+    :param stream: compile each frozen glyph as soon as it is built instead
+        of keeping all glyph objects until saving, which keeps peak memory
+        roughly flat in the glyph count (TrueType, not with keep_composites)
+    :param collection: freeze every subfont of a TTC/OTC into one
+        collection instead of extracting `subfont`; subfonts that share
+        their glyph data are frozen once and their tables stay shared
+    :param fast_path: compute TrueType glyphs without instructions from
+        their scaled glyf coordinates instead of loading them through
+        FreeType, where that gives FreeType's result (see `unhinted`)
+    :param verify_fast_path: also load the computed glyphs through
+        FreeType, log any difference and keep FreeType's outline
+    :param dehint: strip the fpgm, cvt and gasp tables made for the
+        original instructions, keep only a dropout-control prep and write
+        hdmx, LTSH and VDMX for the frozen PPM (TrueType only)
+
+    A `fontpath` of "-" reads the font from stdin and an `out` of "-"
+    writes it to stdout (the default for stdin input), for one PPM and mode.
     """
-    fhf = FontHintFreezer(
-        read_from_path(fontpath),
-        font_number=subfont,
-        ppm=ppm,
-        render_mode=mode,
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if STDIO_PATH in (str(fontpath), str(out)):
+        return _freeze_stdio(
+            fontpath,
+            out,
+            dict(
+                ppm=ppm,
+                mode=mode,
+                subfont=subfont,
+                var=var,
+                jobs=jobs,
+                render=render,
+                keep_composites=keep_composites,
+                subroutinize=subroutinize,
+                unicodes=unicodes or (),
+                glyphs=glyphs or (),
+                text=text or "",
+                stream=stream,
+                fast_path=fast_path,
+                verify_fast_path=verify_fast_path,
+                dehint=dehint,
+                cache=cache,
+                incremental=incremental,
+                instances=instances,
+                profile=profile,
+                collection=collection,
+            ),
+        )
+    ppms = _as_list(ppm)
+    modes = _as_list(mode)
+    options: Dict[str, Any] = dict(
+        render=render,
+        keep_composites=keep_composites,
+        stream=stream,
+        fast_path=fast_path,
+        verify_fast_path=verify_fast_path,
     )
-
-    if var and "fvar" in fhf.ttFont: # type: ignore[operator]
-        fhf.set_var_location(var)
-
-    fhf.freeze_hints()
-
-    output_path: Path
-    if out:
-        output_path = Path(out)
-    else:
-        # Ensure ppm is not None for path generation if it was None for FontHintFreezer
-        # FontHintFreezer defaults ppm to upm if None. We need a value for the filename.
-        ppm_for_filename = ppm if ppm is not None else fhf.ppm
-        font_path_obj = Path(fontpath)
-        output_path = Path(
-            f"{font_path_obj.stem}.fhf-{ppm_for_filename}-{mode}{font_path_obj.suffix}"
-        )
-    fhf.ttFont.save(output_path)
+    if collection:
+        _reject_options(
+            "collection",
+            var=var,
+            cache=cache,
+            incremental=incremental,
+            unicodes=unicodes,
+            glyphs=glyphs,
+            text=text,
+            instances=instances,
+            profile=profile,
+        )
+        outputs = _plan_outputs(fontpath, out, subfont, ppms, modes, [(None, None)])
+        freeze_collection(
+            fontpath,
+            [(output.path, output.ppm, output.mode) for output in outputs],
+            jobs=jobs,
+            subroutinize=subroutinize,
+            dehint=dehint,
+            **options,
+        )
+        return
+    outputs = _plan_outputs(
+        fontpath,
+        out,
+        subfont,
+        ppms,
+        modes,
+        _instance_locations(fontpath, subfont, var, instances),
+    )
+    profiler = FreezeProfiler(top=profile_top) if profile else None
+    freeze_cache: Optional[FreezeCache] = None
+    if cache:
+        freeze_cache = FreezeCache(cache, max_bytes=int(cache_size * 1024 * 1024))
+    _freeze_outputs(
+        fontpath,
+        outputs,
+        freezer_options=dict(
+            font_number=subfont, ppm=ppms[0], render_mode=modes[0], **options
+        ),
+        prepare_options=dict(
+            update_names=instances is True, unicodes=unicodes, glyphs=glyphs, text=text
+        ),
+        freeze_options=dict(jobs=jobs, subroutinize=subroutinize, dehint=dehint),
+        freeze_cache=freeze_cache,
+        cache_options=dict(
+            subfont=subfont,
+            update_names=instances is True,
+            render=render,
+            keep_composites=keep_composites,
+            subroutinize=subroutinize,
+            unicodes=unicodes,
+            glyphs=glyphs,
+            text=text,
+            dehint=dehint,
+            fast_path=fast_path,
+            verify_fast_path=verify_fast_path,
+        ),
+        incremental=incremental,
+        profiler=profiler,
+    )
+    if profiler is not None:
+        _write_profile(profiler, profile, out, batch=len(outputs) > 1)
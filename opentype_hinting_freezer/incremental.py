@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Per-glyph manifests for incremental re-freezing.
+
+A manifest stored next to a frozen output records the freeze settings,
+hashes of the font-level hinting tables and of the head fields used for
+scaling, a hash of every glyph's source data (outline, instructions,
+metrics and, for composites, components) and a hash of the output
+itself. When the font is frozen again to the same output, glyphs whose
+hashes did not change are copied from the previous output instead of
+being loaded through FreeType. A change to any font-level table, head
+field or setting invalidates every glyph.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Union
+
+from fontTools.ttLib.tables._g_l_y_f import (
+    OVERLAP_COMPOUND,
+    ROUND_XY_TO_GRID,
+    SCALED_COMPONENT_OFFSET,
+    UNSCALED_COMPONENT_OFFSET,
+    USE_MY_METRICS,
+    Glyph,
+)
+
+from .cache import _tool_versions, file_digest
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .hintingfreezer import FontHintFreezer
+
+MANIFEST_FORMAT = 1
+MANIFEST_SUFFIX = ".manifest.json"
+
+# Tables whose programs, limits or size ranges apply to every glyph.
+FONT_LEVEL_TABLES = ("fpgm", "prep", "cvt ", "maxp", "gasp")
+# head flags FreeType scales every glyph with, hashed with unitsPerEm:
+# bit 3 rounds the scaled PPM and bit 4 lets instructions change advance
+# widths. The rest of head changes on every save.
+FONT_LEVEL_HEAD_FLAGS = 0x18
+# Component flags that change the composite; the others only describe
+# how the component record is packed.
+COMPONENT_FLAGS = (
+    ROUND_XY_TO_GRID
+    | USE_MY_METRICS
+    | OVERLAP_COMPOUND
+    | SCALED_COMPONENT_OFFSET
+    | UNSCALED_COMPONENT_OFFSET
+)
+# Tables that additionally apply to every glyph at a variation location.
+VARIATION_TABLES = ("fvar", "avar", "cvar")
+
+
+def manifest_path_for(output_path: Union[str, Path]) -> Path:
+    """Returns the manifest path of an output: the output path + `MANIFEST_SUFFIX`."""
+    return Path(f"{output_path}{MANIFEST_SUFFIX}")
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _glyph_source(glyph: Glyph) -> bytes:
+    """Returns the outline or components, bounding box and instructions of a glyph.
+
+    Unlike the raw glyf data, this does not depend on how the points and
+    components were packed. FreeType places the phantom points from the
+    stored xMin, so the bounding box is kept.
+    """
+    if glyph.numberOfContours == 0:
+        return b""
+    parts: List[Any] = [glyph.xMin, glyph.yMin, glyph.xMax, glyph.yMax]
+    if glyph.isComposite():
+        parts += [
+            (
+                component.glyphName,
+                getattr(component, "x", None),
+                getattr(component, "y", None),
+                getattr(component, "firstPt", None),
+                getattr(component, "secondPt", None),
+                getattr(component, "transform", None),
+                component.flags & COMPONENT_FLAGS,
+            )
+            for component in glyph.components
+        ]
+    else:
+        parts += [list(glyph.coordinates), list(glyph.flags), glyph.endPtsOfContours]
+    program = glyph.program.getBytecode() if hasattr(glyph, "program") else b""
+    return repr(parts).encode("utf-8") + bytes(program)
+
+
+def source_digests(fhf: "FontHintFreezer") -> Dict[str, Dict[str, str]]:
+    """Returns `{"font": {tag: hash}, "glyphs": {name: hash}}` for the source font.
+
+    Glyph hashes are empty for fonts without a glyf table; their outputs
+    are always frozen in full.
+    """
+    # The source font sees the original glyphs even after freeze_hints()
+    # replaced them in fhf.ttFont.
+    source = fhf.source_font()
+    reader = source.reader
+    tags = FONT_LEVEL_TABLES + (VARIATION_TABLES if fhf.var_location else ())
+    font_hashes = {tag: _sha256(reader[tag]) for tag in tags if tag in reader}
+    head = source["head"]
+    font_hashes["head"] = _sha256(
+        repr([head.unitsPerEm, head.flags & FONT_LEVEL_HEAD_FLAGS]).encode("ascii")
+    )
+    glyph_hashes: Dict[str, str] = {}
+    if "glyf" not in reader:
+        return {"font": font_hashes, "glyphs": glyph_hashes}
+
+    glyf = source["glyf"]
+    hmtx = source["hmtx"]
+    gvar = source["gvar"] if fhf.var_location and "gvar" in reader else None
+
+    def glyph_hash(glyph_name: str) -> str:
+        if glyph_name in glyph_hashes:
+            return glyph_hashes[glyph_name]
+        glyph = glyf.glyphs[glyph_name]
+        if hasattr(glyph, "data"):
+            # A copy, so the source glyph stays compact.
+            glyph = Glyph(glyph.data)
+            glyph.expand(glyf)
+        digest = hashlib.sha256(_glyph_source(glyph))
+        digest.update(repr(hmtx[glyph_name]).encode("ascii"))
+        if gvar is not None:
+            digest.update(repr(gvar.variations.get(glyph_name)).encode("utf-8"))
+        # Composites are hinted from their components' outlines.
+        for component_name in glyph.getComponentNames(glyf):
+            digest.update(glyph_hash(component_name).encode("ascii"))
+        glyph_hashes[glyph_name] = digest.hexdigest()
+        return glyph_hashes[glyph_name]
+
+    for glyph_name in source.getGlyphOrder():
+        glyph_hash(glyph_name)
+    return {"font": font_hashes, "glyphs": glyph_hashes}
+
+
+def freeze_settings(fhf: "FontHintFreezer", dehint: bool = False) -> Dict[str, Any]:
+    """Returns the settings that, when changed, invalidate a whole manifest."""
+    return {
+        "ppm": fhf.ppm,
+        "mode": fhf.render_mode,
+        "render": fhf.render,
+        "keep_composites": fhf.keep_composites,
+        "subfont": fhf.font_number,
+        "var": fhf.var_location,
+        "subset": fhf.subset_glyphs,
+        "dehint": dehint,
+        "versions": _tool_versions(),
+    }
+
+
+def read_manifest(path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """Returns a manifest, or None if it is missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("format") != MANIFEST_FORMAT:
+        return None
+    return manifest
+
+
+def write_manifest(
+    path: Union[str, Path],
+    fhf: "FontHintFreezer",
+    digests: Dict[str, Dict[str, str]],
+    output_path: Union[str, Path],
+    dehint: bool = False,
+) -> None:
+    """Writes the manifest of a freshly saved output, atomically."""
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "settings": freeze_settings(fhf, dehint),
+        "font": digests["font"],
+        "glyphs": digests["glyphs"],
+        "output": file_digest(output_path),
+    }
+    directory = Path(path).parent
+    fd, tmp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, sort_keys=True)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def unchanged_glyphs(
+    manifest: Optional[Dict[str, Any]],
+    fhf: "FontHintFreezer",
+    digests: Dict[str, Dict[str, str]],
+    output_path: Union[str, Path],
+    dehint: bool = False,
+) -> Set[str]:
+    """Returns the glyphs whose frozen outlines can be taken from `output_path`.
+
+    Everything is re-frozen when there is no manifest, when the output
+    was modified or replaced since the manifest was written, or when the
+    settings or any font-level table changed.
+    """
+    if (
+        manifest is None
+        or not Path(output_path).exists()
+        or manifest["output"] != file_digest(output_path)
+        or manifest["settings"] != json.loads(json.dumps(freeze_settings(fhf, dehint)))
+        or manifest["font"] != digests["font"]
+    ):
+        return set()
+    previous = manifest["glyphs"]
+    return {
+        glyph_name
+        for glyph_name, digest in digests["glyphs"].items()
+        if previous.get(glyph_name) == digest
+    }
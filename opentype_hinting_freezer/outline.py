@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Extraction of hinted FreeType outlines.
+
+With NumPy installed, outlines are copied straight from the `FT_Outline`
+ctypes buffers into arrays and the on/off-curve classification is
+computed for the whole glyph at once. Without NumPy, the freetype-py
+list properties and a per-point loop are used; both give the same result.
+"""
+
+import ctypes
+from collections.abc import Sequence
+from typing import Any, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+HAVE_NUMPY = np is not None
+
+FT_CURVE_TAG_ON = 0x01
+FT_CURVE_TAG_CUBIC = 0x02
+
+
+def read_outline(glyph_slot: Any) -> Tuple[Any, Any, Any]:
+    """Returns `(points, tags, contours)` of the outline in a glyph slot.
+
+    The result is a copy, so it stays valid after the next `load_glyph`.
+    With NumPy, points is an `(n, 2)` array and tags/contours are 1-D
+    arrays; otherwise they are the lists built by freetype-py.
+    """
+    if not HAVE_NUMPY:
+        outline = glyph_slot.outline
+        return outline.points, outline.tags, outline.contours
+
+    ft_outline = glyph_slot._FT_GlyphSlot.contents.outline
+    n_points: int = ft_outline.n_points
+    n_contours: int = ft_outline.n_contours
+    if n_points == 0:
+        return (
+            np.zeros((0, 2), dtype=np.int64),
+            np.zeros(0, dtype=np.uint8),
+            np.zeros(0, dtype=np.int16),
+        )
+    # FT_Vector is two FT_Pos (C long) fields, so the buffer is n * 2 longs.
+    coords = ctypes.cast(ft_outline.points, ctypes.POINTER(ctypes.c_long))
+    points = np.ctypeslib.as_array(coords, shape=(n_points * 2,)).reshape(n_points, 2)
+    tags = np.ctypeslib.as_array(ft_outline.tags, shape=(n_points,))
+    contours = np.ctypeslib.as_array(ft_outline.contours, shape=(n_contours,))
+    return points.astype(np.int64), tags.copy(), contours.copy()
+
+
+def curve_type(tags: Sequence[int]) -> str:
+    """Returns "curve" for outlines with cubic off-curve points, else "qcurve"."""
+    if HAVE_NUMPY and isinstance(tags, np.ndarray):
+        return "curve" if (tags & FT_CURVE_TAG_CUBIC).any() else "qcurve"
+    return "curve" if any(t & FT_CURVE_TAG_CUBIC for t in tags) else "qcurve"
+
+
+def segment_types(tags: Sequence[int], contours: Sequence[int]) -> List[Optional[str]]:
+    """Returns the PointPen segment type of every point of an outline.
+
+    Off-curve points get None, on-curve points after an on-curve point
+    get "line", and on-curve points after an off-curve point get the
+    outline's curve type. The first point of a contour follows its last.
+    """
+    seg_curve = curve_type(tags)
+    if HAVE_NUMPY and isinstance(tags, np.ndarray):
+        return _segment_types_numpy(tags, contours, seg_curve)
+    types: List[Optional[str]] = []
+    from_index: int = 0
+    for contour_end in contours:
+        to_index: int = contour_end + 1
+        c_flags = tags[from_index:to_index]
+        for i_idx, flag in enumerate(c_flags):
+            if not flag & FT_CURVE_TAG_ON:  # current point is off-curve
+                types.append(None)
+            elif c_flags[i_idx - 1] & FT_CURVE_TAG_ON:  # previous point was on-curve
+                types.append("line")
+            else:  # previous point was off-curve, current is on-curve
+                types.append(seg_curve)
+        from_index = to_index
+    return types
+
+
+def _segment_types_numpy(
+    tags: Any, contours: Any, seg_curve: str
+) -> List[Optional[str]]:
+    n_points = len(tags)
+    if n_points == 0 or len(contours) == 0:
+        return []
+    ends = np.asarray(contours, dtype=np.intp)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    on = (tags & FT_CURVE_TAG_ON).astype(bool)
+    prev = np.arange(n_points, dtype=np.intp) - 1
+    prev[starts] = ends
+    codes = np.where(on, np.where(on[prev], 1, 2), 0)
+    names: List[Optional[str]] = [None, "line", seg_curve]
+    return [names[code] for code in codes.tolist()]
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Warm `FontHintFreezer` instances for long-running processes."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .hintingfreezer import FontHintFreezer
+
+DEFAULT_MAX_FONTS = 8
+
+
+class FreezerPool:
+    """Keeps parsed fonts and their FreeType faces for recently used fonts.
+
+    Freezers are keyed by the SHA-256 of the font bytes, the subfont and
+    `keep_composites`, and evicted least recently used beyond `max_fonts`.
+    A request for a warm font only resets the freezer and re-targets its
+    face. Requests are serialized by a lock, since a freezer holds one
+    glyph slot; run one pool per worker process for parallelism.
+    """
+
+    def __init__(self, max_fonts: int = DEFAULT_MAX_FONTS) -> None:
+        if max_fonts <= 0:
+            raise ValueError(f"max_fonts must be positive, got {max_fonts}")
+        self.max_fonts = max_fonts
+        self._freezers: OrderedDict[Tuple[str, int, bool], FontHintFreezer] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._freezers)
+
+    def _freezer(
+        self, font_data: bytes, subfont: int, keep_composites: bool
+    ) -> FontHintFreezer:
+        key = (hashlib.sha256(font_data).hexdigest(), subfont, keep_composites)
+        fhf = self._freezers.get(key)
+        if fhf is not None:
+            self._freezers.move_to_end(key)
+            self.hits += 1
+            return fhf
+        self.misses += 1
+        fhf = FontHintFreezer(
+            font_data, font_number=subfont, keep_composites=keep_composites
+        )
+        self._freezers[key] = fhf
+        while len(self._freezers) > self.max_fonts:
+            self._freezers.popitem(last=False)
+        return fhf
+
+    def freeze(
+        self,
+        font_data: bytes,
+        ppm: Optional[int] = None,
+        mode: str = "lcd",
+        subfont: int = 0,
+        var: Optional[Dict[str, float]] = None,
+        render: bool = False,
+        keep_composites: bool = False,
+        subroutinize: bool = False,
+        unicodes: Any = (),
+        glyphs: Any = (),
+        text: str = "",
+        dehint: bool = False,
+    ) -> bytes:
+        """Freezes a font with a warm freezer; same options as `freeze_bytes()`."""
+        with self._lock:
+            fhf = self._freezer(bytes(font_data), subfont, keep_composites)
+            fhf.render = render
+            fhf.freeze(
+                ppm,
+                mode,
+                var=var,
+                subroutinize=subroutinize,
+                unicodes=unicodes,
+                glyphs=glyphs,
+                text=text,
+                dehint=dehint,
+            )
+            return fhf.to_bytes()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of warm fonts, hits and misses."""
+        return {"fonts": len(self._freezers), "hits": self.hits, "misses": self.misses}
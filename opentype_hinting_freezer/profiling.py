@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Per-phase and per-glyph timing of freeze runs.
+
+Phases (parse, instancing/subsetting, freezing, subroutinizing,
+dehinting, saving) record wall time and the growth of the process's peak
+resident set size, which includes FreeType's native allocations. The peak
+only ever rises, so a phase that stays below an earlier phase's peak
+reports no growth however much it allocates; the growth is an upper
+bound on new memory use, not the phase's own footprint. Within the
+freeze phase,
+every glyph records its FreeType load time (hinting bytecode included),
+its outline read time and its conversion time to glyf/CFF.
+"""
+
+import json
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+DEFAULT_TOP_GLYPHS = 20
+PEAK_RSS_NOTE = (
+    "peak_rss_growth_bytes is how much a phase raised the process-wide peak RSS "
+    "(ru_maxrss). The peak never falls, so a phase that allocates less than an "
+    "earlier peak reports 0; it is not the memory the phase itself used."
+)
+
+
+def peak_rss() -> Optional[int]:
+    """Returns the peak resident set size of this process in bytes."""
+    if resource is None:  # pragma: no cover
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class FreezeProfiler:
+    """Collects phase and glyph timings for one or more frozen outputs."""
+
+    def __init__(self, top: int = DEFAULT_TOP_GLYPHS) -> None:
+        self.top = top
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.outputs: List[Dict[str, Any]] = []
+        self._glyphs: Dict[str, Dict[str, Any]] = {}
+        self._current: Optional[Dict[str, Any]] = None
+
+    def begin_output(self, **info: Any) -> None:
+        """Starts recording an output; later phases and glyphs belong to it."""
+        self._finish_output()
+        self._current = {**info, "phases": {}}
+        self._glyphs = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Times a phase and records how much it raised the process's peak RSS."""
+        rss_before = peak_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            rss_after = peak_rss()
+            phases = (
+                self._current["phases"] if self._current is not None else self.phases
+            )
+            entry = phases.setdefault(
+                name, {"seconds": 0.0, "calls": 0, "peak_rss_growth_bytes": 0}
+            )
+            entry["seconds"] += seconds
+            entry["calls"] += 1
+            if rss_before is not None and rss_after is not None:
+                entry["peak_rss_growth_bytes"] += rss_after - rss_before
+                entry["peak_rss_bytes"] = rss_after
+
+    def record_load(self, glyph_name: str, load: float, read: float) -> None:
+        """Records the FreeType load and outline read times of a glyph."""
+        glyph = self._glyphs.setdefault(glyph_name, {"name": glyph_name})
+        glyph["load"] = glyph.get("load", 0.0) + load
+        glyph["read"] = glyph.get("read", 0.0) + read
+
+    def record_convert(
+        self, glyph_name: str, convert: float, points: int, contours: int
+    ) -> None:
+        """Records the glyf/CFF conversion time and size of a glyph."""
+        glyph = self._glyphs.setdefault(glyph_name, {"name": glyph_name})
+        glyph["convert"] = glyph.get("convert", 0.0) + convert
+        glyph["points"] = points
+        glyph["contours"] = contours
+
+    def _finish_output(self) -> None:
+        if self._current is None:
+            return
+        glyphs = list(self._glyphs.values())
+
+        def total(glyph: Dict[str, Any]) -> float:
+            return (
+                glyph.get("load", 0.0)
+                + glyph.get("read", 0.0)
+                + glyph.get("convert", 0.0)
+            )
+
+        summary: Dict[str, Any] = {"count": len(glyphs)}
+        for key in ("load", "read", "convert"):
+            summary[f"{key}_seconds"] = sum(g.get(key, 0.0) for g in glyphs)
+        summary["points"] = sum(g.get("points", 0) for g in glyphs)
+        self._current["glyphs"] = summary
+        self._current["slowest_glyphs"] = [
+            {
+                "name": g["name"],
+                "load_ms": round(g.get("load", 0.0) * 1000, 3),
+                "read_ms": round(g.get("read", 0.0) * 1000, 3),
+                "convert_ms": round(g.get("convert", 0.0) * 1000, 3),
+                "points": g.get("points"),
+                "contours": g.get("contours"),
+            }
+            for g in sorted(glyphs, key=total, reverse=True)[: self.top]
+        ]
+        self.outputs.append(self._current)
+        self._current = None
+        self._glyphs = {}
+
+    def report(self) -> Dict[str, Any]:
+        """Returns the report of everything recorded so far."""
+        self._finish_output()
+        return {
+            "phases": self.phases,
+            "outputs": self.outputs,
+            "peak_rss_bytes": peak_rss(),
+            "peak_rss_note": PEAK_RSS_NOTE,
+        }
+
+    def write(self, path: Union[str, Path]) -> None:
+        """Writes the report as JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+            f.write("\n")
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Local HTTP freeze service over warm worker processes.
+
+Each worker process keeps a `FreezerPool` of recently used fonts, so
+repeated requests for a font skip parsing it and creating its FreeType
+face. Requests wait in a bounded queue for a free worker; the service
+answers 503 when the queue is full. If a worker process dies, the
+workers are restarted by the next request.
+
+    POST /freeze?ppm=12&mode=mono   body: font file   -> frozen font
+    GET  /stats                                        -> counters as JSON
+    GET  /health                                       -> "ok", 503 if broken
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import SplitResult, parse_qs, urlsplit
+
+from .pool import DEFAULT_MAX_FONTS, FreezerPool
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8787
+DEFAULT_MAX_QUEUE = 64
+DEFAULT_MAX_BODY_MB = 64
+LATENCY_SAMPLES = 1024
+
+_INT_OPTIONS = ("ppm", "subfont")
+_BOOL_OPTIONS = ("render", "keep_composites", "subroutinize", "dehint")
+_STR_OPTIONS = ("mode", "unicodes", "glyphs", "text")
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+_worker_pool: Optional[FreezerPool] = None
+
+
+def _init_worker(max_fonts: int) -> None:
+    global _worker_pool
+    _worker_pool = FreezerPool(max_fonts=max_fonts)
+
+
+def _freeze_in_worker(font_data: bytes, options: Dict[str, Any]) -> bytes:
+    assert _worker_pool is not None
+    return _worker_pool.freeze(font_data, **options)
+
+
+def parse_options(query: str) -> Dict[str, Any]:
+    """Converts the query string of a freeze request to `freeze_bytes()` options."""
+    options: Dict[str, Any] = {}
+    for name, values in parse_qs(query, keep_blank_values=True).items():
+        value = values[-1]
+        if name in _INT_OPTIONS:
+            options[name] = int(value)
+        elif name in _BOOL_OPTIONS:
+            options[name] = value.lower() in ("", "1", "true", "yes")
+        elif name in _STR_OPTIONS:
+            options[name] = value
+        elif name == "var":
+            options[name] = json.loads(value)
+        else:
+            raise ValueError(f"Unknown option {name!r}")
+    return options
+
+
+class FreezeServer:
+    """Serves freeze requests over a pool of warm worker processes."""
+
+    def __init__(
+        self,
+        workers: int = 0,
+        max_fonts: int = DEFAULT_MAX_FONTS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        max_body: int = DEFAULT_MAX_BODY_MB * 1024 * 1024,
+    ) -> None:
+        self.workers = workers if workers > 0 else os.cpu_count() or 1
+        self.max_fonts = max_fonts
+        self.max_queue = max_queue
+        self.max_body = max_body
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def start(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        path: Optional[str] = None,
+    ) -> asyncio.AbstractServer:
+        """Starts the workers and listens on a TCP port or the Unix socket `path`."""
+        self._start_workers()
+        self._slots = asyncio.Semaphore(self.workers)
+        if path is not None:
+            return await asyncio.start_unix_server(self._handle, path=path)
+        return await asyncio.start_server(self._handle, host=host, port=port)
+
+    def _start_workers(self) -> None:
+        # Forked workers would inherit the client sockets open at the time
+        # and keep those connections from closing; spawned ones start clean.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.max_fonts,),
+        )
+
+    def _restart_workers(self, broken: ProcessPoolExecutor) -> None:
+        """Replaces a broken executor, unless a concurrent request already did."""
+        if self._executor is not broken:
+            return
+        log.warning("A worker process died; restarting the workers")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.restarts += 1
+        self._start_workers()
+
+    def healthy(self) -> bool:
+        """Returns False before `start()` and once a worker process has died."""
+        # The executor marks itself broken as soon as a worker dies, even
+        # between requests; the next freeze() restarts the workers.
+        return self._executor is not None and not getattr(
+            self._executor, "_broken", False
+        )
+
+    def close(self) -> None:
+        """Shuts the worker processes down."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the queue depth, request counters and latency percentiles."""
+        latencies: List[float] = sorted(self.latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 2)
+
+        return {
+            "workers": self.workers,
+            "queued": self.queued,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "latency_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1], 2) if latencies else None,
+            },
+        }
+
+    async def freeze(self, font_data: bytes, options: Dict[str, Any]) -> bytes:
+        """Freezes a font in a worker once one is free; raises `QueueFull` if busy."""
+        assert self._executor is not None and self._slots is not None
+        if self._slots.locked() and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise asyncio.QueueFull(f"{self.queued} requests already queued")
+        start = time.perf_counter()
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        self.active += 1
+        try:
+            data = await self._run_in_worker(font_data, options)
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.active -= 1
+            self._slots.release()
+        self.completed += 1
+        self.latencies.append((time.perf_counter() - start) * 1000)
+        return data
+
+    async def _run_in_worker(
+        self, font_data: bytes, options: Dict[str, Any], retry: bool = True
+    ) -> bytes:
+        executor = self._executor
+        assert executor is not None
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, _freeze_in_worker, font_data, options
+            )
+        except BrokenProcessPool:
+            # A worker died during this request or while idle before it.
+            # Retried once, so a font that kills workers fails the request.
+            self._restart_workers(executor)
+            if not retry:
+                raise
+        return await self._run_in_worker(font_data, options, retry=False)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            status, content_type, body = await self._respond(reader)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode("ascii")
+        )
+        writer.write(body)
+        with contextlib.suppress(ConnectionError):
+            await writer.drain()
+        writer.close()
+
+    async def _respond(self, reader: asyncio.StreamReader) -> Tuple[int, str, bytes]:
+        request = await _read_request_head(reader)
+        if request is None:
+            return 400, "text/plain", b"Malformed request line"
+        method, url, headers = request
+
+        if url.path == "/health":
+            if not self.healthy():
+                return 503, "text/plain", b"Worker processes died"
+            return 200, "text/plain", b"ok"
+        if url.path == "/stats":
+            return 200, "application/json", json.dumps(self.stats()).encode("utf-8")
+        if url.path != "/freeze":
+            return 404, "text/plain", b"Not found"
+        if method != "POST":
+            return 405, "text/plain", b"Use POST with the font file as the body"
+        return await self._respond_freeze(reader, url.query, headers)
+
+    async def _respond_freeze(
+        self, reader: asyncio.StreamReader, query: str, headers: Dict[str, str]
+    ) -> Tuple[int, str, bytes]:
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            length = -1
+        if length < 0:
+            return 400, "text/plain", b"Invalid Content-Length"
+        if length > self.max_body:
+            return 413, "text/plain", b"Font too large"
+        font_data = await reader.readexactly(length)
+        try:
+            options = parse_options(query)
+            frozen = await self.freeze(font_data, options)
+        except (asyncio.QueueFull, BrokenProcessPool) as e:
+            return 503, "text/plain", str(e).encode("utf-8")
+        except (ValueError, TypeError, KeyError) as e:
+            return 400, "text/plain", f"{type(e).__name__}: {e}".encode()
+        except Exception as e:
+            log.exception("Freeze request failed")
+            return 500, "text/plain", f"{type(e).__name__}: {e}".encode()
+        return 200, "font/sfnt", frozen
+
+
+async def _read_request_head(
+    reader: asyncio.StreamReader,
+) -> Optional[Tuple[str, SplitResult, Dict[str, str]]]:
+    """Reads the request line and headers; returns None if the line is malformed."""
+    request_line = (await reader.readline()).decode("latin-1").split()
+    headers: Dict[str, str] = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if len(request_line) != 3:
+        return None
+    method, target, _ = request_line
+    return method, urlsplit(target), headers
+
+
+def freezeserve(
+    host="127.0.0.1",
+    port=DEFAULT_PORT,
+    socket=None,
+    workers=0,
+    max_fonts=DEFAULT_MAX_FONTS,
+    max_queue=DEFAULT_MAX_QUEUE,
+):
+    """
+    OpenType font hinting freeze service \n
+    Serves freeze requests over HTTP from warm worker processes
+
+    Example:
+    pyfthintfreeze serve --port=8787 --workers=4
+    curl --data-binary @a.ttf 'http://localhost:8787/freeze?ppm=12&mode=mono' >b.ttf
+    curl http://127.0.0.1:8787/stats
+
+    :param host: address to listen on
+    :param port: TCP port to listen on
+    :param socket: Unix socket path to listen on instead of host and port
+    :param workers: number of worker processes, 0 for one per CPU
+    :param max_fonts: parsed fonts each worker keeps warm
+    :param max_queue: requests that may wait for a worker before new ones
+        are answered with 503
+    """
+    server = FreezeServer(workers=workers, max_fonts=max_fonts, max_queue=max_queue)
+
+    async def serve() -> None:
+        listener = await server.start(host=host, port=port, path=socket)
+        log.info(
+            "Serving on %s with %d workers",
+            socket or f"http://{host}:{port}",
+            server.workers,
+        )
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
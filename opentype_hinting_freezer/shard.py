@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""Freezing a font in glyph-ID shards and merging them into the font.
+
+`freezeshard()` loads a glyph-ID range through FreeType and writes the
+hinted outlines and metrics to a shard file; `freezemerge()` writes the
+shards of all ranges into the font without loading any glyph again, so
+the FreeType work can be spread over machines by any job runner.
+
+A shard file is the magic `FHFSHARD`, the length (uint32) and JSON of a
+header with the font digest, freeze settings, glyph-ID range and tool
+versions, then a zlib-compressed body of little-endian columns: points,
+contours, advance and LSB per glyph (int32), the point coordinates
+(int32 x/y pairs), the point tags (uint8) and the contour ends (int32).
+"""
+
+import json
+import logging
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .cache import _tool_versions, file_digest
+from .hintingfreezer import FontHintFreezer, FrozenGlyph, output_path_for
+from .outline import HAVE_NUMPY
+
+if HAVE_NUMPY:
+    import numpy as np
+
+SHARD_MAGIC = b"FHFSHARD"
+SHARD_FORMAT = 1
+SHARD_SUFFIX = ".fhfshard"
+
+# Header fields that every shard of one merge must agree on.
+SETTINGS = ("font", "subfont", "ppm", "mode", "var", "render", "glyphs")
+
+log = logging.getLogger(__name__)
+
+
+def _column(typecode: str, values: Iterable[Any]) -> bytes:
+    column = array(typecode, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(
+    typecode: str, data: memoryview, offset: int, count: int
+) -> Tuple[array, int]:
+    column = array(typecode)
+    end = offset + count * column.itemsize
+    column.frombytes(data[offset:end])
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column, end
+
+
+def _flat_coordinates(points: Any) -> List[int]:
+    if hasattr(points, "ravel"):
+        return points.ravel().tolist()
+    return [value for point in points for value in point]
+
+
+def write_shard(
+    path: Union[str, Path], header: Dict[str, Any], frozen_glyphs: Iterable[FrozenGlyph]
+) -> None:
+    """Writes a header and the frozen glyphs of its range to a shard file."""
+    n_points: List[int] = []
+    n_contours: List[int] = []
+    widths: List[int] = []
+    lsbs: List[int] = []
+    coordinates = array("i")
+    tags = array("B")
+    contours = array("i")
+    for frozen in frozen_glyphs:
+        n_points.append(len(frozen.points))
+        n_contours.append(len(frozen.contours))
+        widths.append(frozen.width)
+        lsbs.append(frozen.lsb)
+        coordinates.extend(_flat_coordinates(frozen.points))
+        tags.extend(int(tag) for tag in frozen.tags)
+        contours.extend(int(end) for end in frozen.contours)
+    if len(n_points) != header["stop"] - header["start"]:
+        raise ValueError(
+            f"Shard of glyphs {header['start']}-{header['stop']} "
+            f"got {len(n_points)} glyphs"
+        )
+    body = b"".join(
+        (
+            _column("i", n_points),
+            _column("i", n_contours),
+            _column("i", widths),
+            _column("i", lsbs),
+            _column("i", coordinates),
+            tags.tobytes(),
+            _column("i", contours),
+        )
+    )
+    header_data = json.dumps(header, sort_keys=True).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(SHARD_MAGIC)
+        f.write(struct.pack("<I", len(header_data)))
+        f.write(header_data)
+        f.write(zlib.compress(body))
+
+
+def _read_header(f: Any, path: Union[str, Path]) -> Dict[str, Any]:
+    if f.read(len(SHARD_MAGIC)) != SHARD_MAGIC:
+        raise ValueError(f"{path} is not a shard file")
+    (length,) = struct.unpack("<I", f.read(4))
+    header = json.loads(f.read(length).decode("utf-8"))
+    if header.get("format") != SHARD_FORMAT:
+        raise ValueError(f"{path} has unsupported shard format {header.get('format')}")
+    return header
+
+
+def read_shard_header(path: Union[str, Path]) -> Dict[str, Any]:
+    """Returns the header of a shard file without reading its glyphs."""
+    with open(path, "rb") as f:
+        return _read_header(f, path)
+
+
+def read_shard(path: Union[str, Path]) -> Tuple[Dict[str, Any], List[FrozenGlyph]]:
+    """Returns the header and the frozen glyphs of a shard file.
+
+    The outlines are NumPy arrays when NumPy is installed and lists
+    otherwise, as `outline.read_outline` returns them.
+    """
+    with open(path, "rb") as f:
+        header = _read_header(f, path)
+        data = memoryview(zlib.decompress(f.read()))
+    count = header["stop"] - header["start"]
+    n_points, offset = _read_column("i", data, 0, count)
+    n_contours, offset = _read_column("i", data, offset, count)
+    widths, offset = _read_column("i", data, offset, count)
+    lsbs, offset = _read_column("i", data, offset, count)
+    coordinates, offset = _read_column("i", data, offset, 2 * sum(n_points))
+    tags, offset = _read_column("B", data, offset, sum(n_points))
+    contours, offset = _read_column("i", data, offset, sum(n_contours))
+    if offset != len(data):
+        raise ValueError(f"{path} is truncated or corrupt")
+
+    glyphs: List[FrozenGlyph] = []
+    point_start = contour_start = 0
+    for points, contour_count, width, lsb in zip(n_points, n_contours, widths, lsbs):
+        point_end = point_start + points
+        contour_end = contour_start + contour_count
+        glyph_coordinates = coordinates[2 * point_start : 2 * point_end]
+        glyph_tags = tags[point_start:point_end]
+        glyph_contours = contours[contour_start:contour_end]
+        if HAVE_NUMPY:
+            glyphs.append(
+                FrozenGlyph(
+                    np.array(glyph_coordinates, dtype=np.int64).reshape(points, 2),
+                    np.array(glyph_tags, dtype=np.uint8),
+                    np.array(glyph_contours, dtype=np.int16),
+                    width,
+                    lsb,
+                )
+            )
+        else:
+            glyphs.append(
+                FrozenGlyph(
+                    list(zip(glyph_coordinates[::2], glyph_coordinates[1::2])),
+                    glyph_tags.tolist(),
+                    glyph_contours.tolist(),
+                    width,
+                    lsb,
+                )
+            )
+        point_start, contour_start = point_end, contour_end
+    return header, glyphs
+
+
+def shard_range(
+    num_glyphs: int,
+    start: int = 0,
+    stop: Optional[int] = None,
+    part: Optional[int] = None,
+    parts: Optional[int] = None,
+) -> Tuple[int, int]:
+    """Returns the glyph-ID range of a shard.
+
+    Either `start` and `stop` (default: the last glyph), or part `part` of
+    `parts` near-equal ranges, which suits job arrays.
+    """
+    if parts is not None:
+        if part is None or not 0 <= part < parts:
+            raise ValueError(f"part must be in 0..{parts - 1}, got {part}")
+        return num_glyphs * part // parts, num_glyphs * (part + 1) // parts
+    if stop is None:
+        stop = num_glyphs
+    if not 0 <= start <= stop <= num_glyphs:
+        raise ValueError(f"Invalid glyph range {start}-{stop} for {num_glyphs} glyphs")
+    return start, stop
+
+
+def freezeshard(
+    fontpath,
+    out=None,
+    start=0,
+    stop=None,
+    part=None,
+    parts=None,
+    ppm=None,
+    mode="lcd",
+    subfont=0,
+    var=None,
+    render=False,
+    jobs=1,
+):
+    """
+    Freezes a glyph-ID range of a font to a shard file \n
+    Shards of all ranges are put into the font with `pyfthintfreeze merge`
+
+    Example:
+    pyfthintfreeze shard font.ttf --start=0 --stop=5000 --ppm=14 --mode=mono
+    pyfthintfreeze shard font.ttf --part=$TASK_ID --parts=16 --ppm=14 --out=shards/
+
+    :param fontpath: path to an OTF or TTF or TTC file
+    :param out: shard path, or a directory for the automatically named
+        shard, e.g. `font.fhf-14-mono.0-5000.fhfshard`
+    :param start: first glyph ID of the range
+    :param stop: glyph ID after the range, default: the number of glyphs
+    :param part: index of this shard when splitting into `parts` ranges
+    :param parts: number of near-equal ranges to split the glyphs into
+    :param ppm: pixel-per-em for applying the hinting
+    :param mode: hinting mode: "lcd" (default), "lcdv", "mono" or "light"
+    :param subfont: subfont index in a TTC file
+    :param var: variable font location as a dict
+    :param render: also rasterize each glyph while loading it
+    :param jobs: number of worker processes, 0 for one per CPU
+    """
+    fhf = FontHintFreezer.from_path(
+        fontpath, font_number=subfont, ppm=ppm, render_mode=mode, render=render
+    )
+    if var:
+        fhf.set_var_location(var)
+    glyph_order = fhf.ttFont.getGlyphOrder()
+    start, stop = shard_range(len(glyph_order), start, stop, part, parts)
+    header = {
+        "format": SHARD_FORMAT,
+        "font": file_digest(fontpath),
+        "subfont": subfont,
+        "ppm": fhf.ppm,
+        "mode": mode,
+        "var": var or None,
+        "render": render,
+        "glyphs": len(glyph_order),
+        "start": start,
+        "stop": stop,
+        "versions": _tool_versions(),
+    }
+    path = output_path_for(fontpath, fhf.ppm, mode)
+    path = Path(f"{path.stem}.{start}-{stop}{SHARD_SUFFIX}")
+    if out is not None:
+        path = Path(out) / path if Path(out).is_dir() else Path(out)
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    frozen_glyphs = fhf.iter_frozen_glyphs(jobs, glyph_order[start:stop])
+    write_shard(path, header, (frozen for _, frozen in frozen_glyphs))
+    log.info("Froze glyphs %d-%d of %d to %s", start, stop, len(glyph_order), path)
+    return str(path)
+
+
+def _merged_glyphs(
+    shards: List[Tuple[Dict[str, Any], Union[str, Path]]], glyph_order: List[str]
+) -> Iterator[Tuple[str, FrozenGlyph]]:
+    # One shard at a time, so memory holds the font and one shard.
+    for header, path in shards:
+        _, frozen_glyphs = read_shard(path)
+        for glyph_id, frozen in enumerate(frozen_glyphs, header["start"]):
+            yield glyph_order[glyph_id], frozen
+
+
+def _checked_headers(
+    fontpath: Union[str, Path], shards: Sequence[Union[str, Path]]
+) -> List[Tuple[Dict[str, Any], Union[str, Path]]]:
+    """Returns the `(header, path)` of every shard, in glyph order.
+
+    Raises ValueError unless the shards were frozen from `fontpath` with
+    the same settings and cover every glyph exactly once.
+    """
+    if not shards:
+        raise ValueError("No shard files given")
+    headers = [(read_shard_header(path), path) for path in shards]
+    headers.sort(key=lambda entry: entry[0]["start"])
+    first = headers[0][0]
+    digest = file_digest(fontpath)
+    if first["font"] != digest:
+        raise ValueError(f"{headers[0][1]} was not frozen from {fontpath}")
+    position = 0
+    for header, path in headers:
+        different = [key for key in SETTINGS if header[key] != first[key]]
+        if different:
+            raise ValueError(f"{path} has different {', '.join(different)}")
+        if header["start"] != position:
+            raise ValueError(
+                f"Shards do not cover glyphs {position}-{header['start']}"
+                if header["start"] > position
+                else f"{path} overlaps glyphs {header['start']}-{position}"
+            )
+        if header["versions"] != first["versions"]:
+            log.warning("%s was frozen with different tool versions", path)
+        position = header["stop"]
+    if position != first["glyphs"]:
+        raise ValueError(f"Shards do not cover glyphs {position}-{first['glyphs']}")
+    return headers
+
+
+def freezemerge(
+    fontpath, *shards, out=None, subroutinize=False, stream=False, dehint=False
+):
+    """
+    Merges frozen-glyph shards into the frozen font \n
+    Writes the outlines and metrics of `pyfthintfreeze shard` files to the
+    font without loading any glyph through FreeType
+
+    Example:
+    pyfthintfreeze merge font.ttf shards/*.fhfshard --out=font-frozen.ttf
+
+    :param fontpath: the font the shards were frozen from
+    :param shards: shard files covering every glyph ID exactly once
+    :param out: output path, automatic if absent (e.g. `font.fhf-14-mono.ttf`)
+    :param subroutinize: re-subroutinize frozen CFF/CFF2 charstrings
+    :param stream: compile each glyph as soon as it is written (TrueType)
+    :param dehint: strip the hinting tables and write hdmx, LTSH and VDMX
+        for the frozen PPM (TrueType)
+    """
+    headers = _checked_headers(fontpath, shards)
+    first = headers[0][0]
+    fhf = FontHintFreezer.from_path(
+        fontpath,
+        font_number=first["subfont"],
+        ppm=first["ppm"],
+        render_mode=first["mode"],
+        stream=stream,
+    )
+    if first["var"] and "fvar" in fhf.source_tables:
+        fhf.instantiate(first["var"])
+    fhf.write_frozen_glyphs(_merged_glyphs(headers, fhf.ttFont.getGlyphOrder()))
+    if subroutinize:
+        fhf.subroutinize_cff()
+    if dehint:
+        fhf.dehint()
+    path = Path(out) if out else output_path_for(fontpath, first["ppm"], first["mode"])
+    fhf.save(path)
+    log.info("Merged %d shards into %s", len(headers), path)
+    return str(path)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Bounded-memory glyf/loca writing for very large glyph sets.
+
+By default, every frozen glyph is kept in `ttFont["glyf"]` as a `Glyph`
+object until `save()` compiles the table. `GlyfWriter` compiles each
+frozen glyph as soon as it is built, in glyph-ID order, and keeps only
+its bytes. The statistics that fontTools would otherwise recalculate from
+the glyph objects on save (font bounding box, maxp limits, hhea extents)
+are accumulated on the way, so no glyph object outlives its own step.
+"""
+
+import array
+import sys
+from typing import List, Tuple
+
+from fontTools.ttLib import OPTIMIZE_FONT_SPEED, TTFont
+from fontTools.ttLib.tables._g_l_y_f import Glyph
+from fontTools.ttLib.tables.DefaultTable import DefaultTable
+
+# Same sentinel as fontTools' maxp.recalc().
+_INFINITY = 100000
+
+
+class GlyfWriter:
+    """Appends compiled glyphs to a glyf table, then installs glyf and loca.
+
+    Only simple and empty glyphs can be streamed: composites need their
+    components' bounds, which are no longer around.
+    """
+
+    def __init__(self, font: TTFont) -> None:
+        self.font = font
+        self.data = bytearray()
+        self.lengths: List[int] = []
+        self.bounds = [_INFINITY, _INFINITY, -_INFINITY, -_INFINITY]
+        self.max_points = 0
+        self.max_contours = 0
+        self.all_xmin_is_lsb = True
+        self.min_lsb = float("inf")
+        self.min_rsb = float("inf")
+        self.max_extent = -float("inf")
+        self._optimize_size = not font.cfg[OPTIMIZE_FONT_SPEED]
+
+    def add(self, glyph_name: str, glyph: Glyph) -> None:
+        """Compiles the next glyph in glyph order; its hmtx entry must be set."""
+        if glyph.isComposite():
+            raise ValueError(f"Cannot stream composite glyph {glyph_name!r}")
+        # Compiling recalculates the glyph's bounds.
+        data = glyph.compile(None, recalcBBoxes=True, optimizeSize=self._optimize_size)
+        self.data += data
+        self.lengths.append(len(data))
+        if not glyph.numberOfContours:
+            return
+        advance, lsb = self.font["hmtx"][glyph_name]
+        self.bounds = [
+            min(self.bounds[0], glyph.xMin),
+            min(self.bounds[1], glyph.yMin),
+            max(self.bounds[2], glyph.xMax),
+            max(self.bounds[3], glyph.yMax),
+        ]
+        points, contours = glyph.getMaxpValues()
+        self.max_points = max(self.max_points, points)
+        self.max_contours = max(self.max_contours, contours)
+        if lsb != glyph.xMin:
+            self.all_xmin_is_lsb = False
+        width = glyph.xMax - glyph.xMin
+        self.min_lsb = min(self.min_lsb, lsb)
+        self.min_rsb = min(self.min_rsb, advance - lsb - width)
+        self.max_extent = max(self.max_extent, lsb + width)
+
+    def finish(self) -> None:
+        """Installs the compiled glyf and loca tables and the recalculated values.
+
+        Produces the same bytes as compiling the glyph objects with
+        fontTools. Bounding boxes are no longer recalculated on save.
+        """
+        font = self.font
+        if len(self.lengths) != len(font.getGlyphOrder()):
+            raise ValueError(
+                f"Wrote {len(self.lengths)} of {len(font.getGlyphOrder())} glyphs"
+            )
+        data, lengths = _pad_glyphs(self.data, self.lengths)
+        loca_data, loca_format = _compile_loca(lengths)
+        font["head"].indexToLocFormat = loca_format
+
+        glyf = DefaultTable("glyf")
+        # An all-empty glyf table gets one byte, as fontTools writes it.
+        glyf.data = bytes(data) or b"\0"
+        loca = DefaultTable("loca")
+        loca.data = loca_data
+        font["glyf"] = glyf
+        font["loca"] = loca
+        self.data = bytearray()
+
+        head = font["head"]
+        if self.bounds[0] == _INFINITY:
+            head.xMin = head.yMin = head.xMax = head.yMax = 0
+        else:
+            head.xMin, head.yMin, head.xMax, head.yMax = self.bounds
+        if self.all_xmin_is_lsb:
+            head.flags |= 0x2
+        else:
+            head.flags &= ~0x2
+        maxp = font["maxp"]
+        maxp.maxPoints = self.max_points
+        maxp.maxContours = self.max_contours
+        maxp.maxCompositePoints = 0
+        maxp.maxCompositeContours = 0
+        maxp.maxComponentElements = 0
+        maxp.maxComponentDepth = 0
+        hhea = font["hhea"]
+        hhea.advanceWidthMax = max(
+            advance for advance, _ in font["hmtx"].metrics.values()
+        )
+        if self.max_extent == -float("inf"):
+            hhea.minLeftSideBearing = hhea.minRightSideBearing = 0
+            hhea.xMaxExtent = 0
+        else:
+            hhea.minLeftSideBearing = self.min_lsb
+            hhea.minRightSideBearing = self.min_rsb
+            hhea.xMaxExtent = self.max_extent
+        # The values above replace what save() would recompute from the
+        # glyph objects, which are gone.
+        font.recalcBBoxes = False
+
+
+def _pad_glyphs(data: bytearray, lengths: List[int]) -> Tuple[bytearray, List[int]]:
+    """Pads odd-length glyphs if that lets short loca offsets fit.
+
+    fontTools' default glyf padding does the same.
+    """
+    odd = sum(length % 2 for length in lengths)
+    if not odd or len(data) + odd >= 0x20000:
+        return data, lengths
+    padded = bytearray()
+    start = 0
+    for length in lengths:
+        padded += data[start : start + length]
+        if length % 2:
+            padded += b"\0"
+        start += length
+    return padded, [length + length % 2 for length in lengths]
+
+
+def _compile_loca(lengths: List[int]) -> Tuple[bytes, int]:
+    """Returns the loca table data of glyphs of `lengths` and its indexToLocFormat."""
+    locations = array.array("I", [0])
+    for length in lengths:
+        locations.append(locations[-1] + length)
+    loca_data = locations
+    loca_format = 1
+    if locations[-1] < 0x20000 and all(location % 2 == 0 for location in locations):
+        loca_data = array.array("H", (location // 2 for location in locations))
+        loca_format = 0
+    if sys.byteorder != "big":
+        loca_data.byteswap()
+    return loca_data.tobytes(), loca_format
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Freezing TrueType glyphs without instructions, without FreeType.
+
+A simple glyph with an empty glyph program is not moved by the bytecode
+interpreter: FreeType only scales its points to 26.6 pixels, rounds the
+phantom points and floors the left bearing. When the left side bearing
+equals the glyph's xMin, the phantom point that would shift the outline
+is at the origin in every mode, so the hinted outline can be computed
+from the glyf coordinates with FreeType's fixed-point arithmetic. With
+NumPy the points of a glyph are scaled at once.
+
+The fast path does not apply where FreeType does more than that:
+light mode and fonts without any hinting programs, which FreeType
+autohints; PPMs with an hdmx record, whose widths FreeType may use; and
+variation locations, which move the points first.
+"""
+
+import struct
+from typing import Any, List, Tuple
+
+from fontTools.ttLib import TTFont
+from fontTools.ttLib.tables._g_l_y_f import Glyph, flagCubic, flagOnCurve
+
+from .outline import HAVE_NUMPY
+
+if HAVE_NUMPY:
+    import numpy as np
+
+
+def mul_fix(a: int, b: int) -> int:
+    """FreeType's FT_MulFix: `a * b / 0x10000`, rounded half away from zero."""
+    c = (abs(a) * abs(b) + 0x8000) >> 16
+    return -c if (a < 0) != (b < 0) else c
+
+
+def div_fix(a: int, b: int) -> int:
+    """FreeType's FT_DivFix for positive arguments: `a * 0x10000 / b`, rounded."""
+    return ((a << 16) + (b >> 1)) // b
+
+
+def _mul_fix_array(a: Any, b: int) -> Any:
+    c = (np.abs(a) * abs(b) + 0x8000) >> 16
+    return np.where((a < 0) != (b < 0), -c, c)
+
+
+def pix_round(x: int) -> int:
+    """Rounds a 26.6 value to whole pixels."""
+    return (x + 32) & ~63
+
+
+def pix_floor(x: int) -> int:
+    """Floors a 26.6 value to whole pixels."""
+    return x & ~63
+
+
+def autohinted_by_freetype(font: TTFont) -> bool:
+    """Tells if FreeType uses its autohinter for a TrueType font.
+
+    FreeType assumes that a glyf font with neither fpgm nor prep and a
+    zero maxSizeOfInstructions has no hinting and autohints it.
+    """
+    return (
+        "fpgm" not in font
+        and "prep" not in font
+        and getattr(font["maxp"], "maxSizeOfInstructions", 0) == 0
+    )
+
+
+def fast_path_applies(font: TTFont, ppm: int, render_mode: str) -> bool:
+    """Tells if unhinted glyphs of a glyf font can skip FreeType at a size and mode."""
+    if "glyf" not in font or render_mode == "light" or autohinted_by_freetype(font):
+        return False
+    return "hdmx" not in font or ppm not in font["hdmx"].hdmx
+
+
+def is_unhinted(glyph: Glyph, lsb: int) -> bool:
+    """Tells if FreeType only scales a glyph, given its left side bearing.
+
+    True for empty glyphs and simple quadratic glyphs without
+    instructions whose left side bearing is their xMin. Unexpanded
+    glyphs are checked on a copy, so they stay compact.
+    """
+    data = getattr(glyph, "data", None)
+    if data is not None:
+        if not data:
+            return lsb == 0
+        number_of_contours, x_min = struct.unpack(">hh", data[:4])
+        if number_of_contours < 0 or lsb != x_min:
+            return False
+        glyph = Glyph(data)
+        glyph.expand(None)
+    if glyph.numberOfContours == 0:
+        return lsb == 0
+    if glyph.isComposite() or lsb != glyph.xMin:
+        return False
+    if hasattr(glyph, "program") and glyph.program.getBytecode():
+        return False
+    return not any(flag & flagCubic for flag in glyph.flags)
+
+
+def unhinted_glyph_names(font: TTFont) -> List[str]:
+    """Returns the glyphs of a glyf font that FreeType only scales."""
+    glyf = font["glyf"]
+    hmtx = font["hmtx"]
+    return [
+        glyph_name
+        for glyph_name in font.getGlyphOrder()
+        if is_unhinted(glyf.glyphs[glyph_name], hmtx[glyph_name][1])
+    ]
+
+
+def scale_glyph(
+    glyph: Glyph,
+    advance: int,
+    ppm: int,
+    upm: int,
+    rescale_glyphs: int,
+    rescale_metrics: float,
+) -> Tuple[Any, Any, Any, int, int]:
+    """Returns the `(points, tags, contours, width, lsb)` FreeType would load.
+
+    `glyph` must pass `is_unhinted()`; `rescale_glyphs` and
+    `rescale_metrics` are the freezer's factors back to font units. The
+    arrays have the types of `outline.read_outline`.
+    """
+    scale = div_fix(ppm * 64, upm)
+    width = int(pix_round(mul_fix(advance, scale)) * rescale_metrics)
+    if glyph.numberOfContours == 0:
+        if HAVE_NUMPY:
+            return (
+                np.zeros((0, 2), dtype=np.int64),
+                np.zeros(0, dtype=np.uint8),
+                np.zeros(0, dtype=np.int16),
+                width,
+                0,
+            )
+        return [], [], [], width, 0
+    if HAVE_NUMPY:
+        coordinates = np.frombuffer(glyph.coordinates.array, dtype=np.float64)
+        coordinates = coordinates.astype(np.int64).reshape(-1, 2)
+        scaled = _mul_fix_array(coordinates, scale)
+        lsb = int(pix_floor(int(scaled[:, 0].min())) * rescale_metrics)
+        points = _mul_fix_array(scaled, rescale_glyphs)
+        tags = np.frombuffer(bytes(glyph.flags), dtype=np.uint8) & flagOnCurve
+        contours = np.array(glyph.endPtsOfContours, dtype=np.int16)
+        return points, tags, contours, width, lsb
+    scaled_points = [
+        (mul_fix(x, scale), mul_fix(y, scale)) for x, y in glyph.coordinates
+    ]
+    lsb = int(pix_floor(min(x for x, _ in scaled_points)) * rescale_metrics)
+    point_list = [
+        (mul_fix(x, rescale_glyphs), mul_fix(y, rescale_glyphs))
+        for x, y in scaled_points
+    ]
+    tag_list = [flag & flagOnCurve for flag in glyph.flags]
+    return point_list, tag_list, list(glyph.endPtsOfContours), width, lsb
+
+
+def same_outline(a: Any, b: Any) -> bool:
+    """Tells if two FrozenGlyphs have the same points, tags, contours and metrics."""
+
+    def as_list(values: Any) -> List[Any]:
+        values = values.tolist() if hasattr(values, "tolist") else values
+        return [tuple(v) if isinstance(v, (list, tuple)) else v for v in values]
+
+    return (
+        a.width == b.width
+        and a.lsb == b.lsb
+        and as_list(a.points) == as_list(b.points)
+        and as_list(a.tags) == as_list(b.tags)
+        and as_list(a.contours) == as_list(b.contours)
+    )
@@ -3,13 +3,16 @@
 Pytest configuration and fixtures for OpenType Hinting Freezer tests.
 """
 
-import pytest
-from pathlib import Path
-import tempfile
+import io
 import shutil
 import subprocess
 import sys
-from typing import Generator
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Generator
+
+import pytest
+from fontTools.ttLib import TTFont
 
 # Test directories
 TEST_DIR = Path(__file__).parent
@@ -18,6 +21,77 @@ OUTPUT_DIR = TEST_DIR / "output"
 
 # Sample files
 SAMPLE_TTF = DATA_DIR / "minimal.ttf"
+# Throughput depends on the machine, so the baseline is recorded locally
+# with --benchmark-save and not committed.
+BENCHMARK_BASELINE = TEST_DIR / ".benchmark-baseline.json"
+
+
+def font_tables(font: Any, head: bool = False) -> Dict[str, bytes]:
+    """Returns the raw tables of a font path, font bytes or TTFont, by tag.
+
+    head holds a timestamp and the file checksum, so it is left out, or
+    kept with those fields cleared if `head` is True.
+    """
+    if isinstance(font, (bytes, bytearray)):
+        font = TTFont(io.BytesIO(font))
+    elif not isinstance(font, TTFont):
+        font = TTFont(font)
+    tables = {tag: font.reader[tag] for tag in font.reader.tables if tag != "head"}
+    if head:
+        head_data = bytearray(font.reader["head"])
+        head_data[8:12] = bytes(4)  # checkSumAdjustment
+        head_data[28:36] = bytes(8)  # modified
+        tables["head"] = bytes(head_data)
+    return tables
+
+
+def pytest_addoption(parser):
+    """Adds the options of the opt-in throughput benchmarks."""
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark", action="store_true", help="run the throughput benchmarks"
+    )
+    group.addoption(
+        "--benchmark-sizes",
+        default="1000,10000,60000",
+        help="comma-separated glyph counts of the benchmark fonts",
+    )
+    group.addoption(
+        "--benchmark-baseline",
+        default=str(BENCHMARK_BASELINE),
+        help="JSON file of baseline results recorded on this machine",
+    )
+    group.addoption(
+        "--benchmark-threshold",
+        type=float,
+        default=0.25,
+        help="fail when throughput drops or peak RSS grows by more than this fraction",
+    )
+    group.addoption(
+        "--benchmark-save",
+        action="store_true",
+        help="write the results to the baseline file instead of comparing",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skips the benchmarks unless --benchmark is given."""
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrizes `benchmark_size` with the --benchmark-sizes glyph counts."""
+    if "benchmark_size" in metafunc.fixturenames:
+        option = metafunc.config.getoption("--benchmark-sizes")
+        sizes = [int(size) for size in option.split(",")]
+        metafunc.parametrize(
+            "benchmark_size", sizes, ids=[f"{size}g" for size in sizes]
+        )
 
 
 @pytest.fixture(scope="session")
@@ -37,6 +111,36 @@ def sample_ttf_path() -> Path:
     return SAMPLE_TTF
 
 
+@pytest.fixture(scope="session")
+def multi_glyph_ttf_path(tmp_path_factory) -> Path:
+    """Returns the path to a generated TTF with many glyphs and a composite."""
+    from generate_minimal_ttf import create_multi_glyph_ttf
+
+    path = tmp_path_factory.mktemp("fonts") / "multi.ttf"
+    create_multi_glyph_ttf(str(path))
+    return path
+
+
+@pytest.fixture(scope="session")
+def variable_ttf_path(tmp_path_factory) -> Path:
+    """Returns the path to a generated variable TTF with named instances."""
+    from generate_minimal_ttf import create_variable_ttf
+
+    path = tmp_path_factory.mktemp("fonts") / "variable.ttf"
+    create_variable_ttf(str(path))
+    return path
+
+
+@pytest.fixture(scope="session", params=[False, True], ids=["CFF", "CFF2"])
+def cff_otf_path(request, tmp_path_factory) -> Path:
+    """Returns the path to a generated CFF or CFF2 OpenType font."""
+    from generate_minimal_ttf import create_cff_otf
+
+    path = tmp_path_factory.mktemp("fonts") / f"cff-{request.param}.otf"
+    create_cff_otf(str(path), cff2=request.param)
+    return path
+
+
 @pytest.fixture
 def output_dir() -> Generator[Path, None, None]:
     """Creates a temporary output directory for each test."""
@@ -1,6 +1,11 @@
+from array import array
+
 from fontTools.fontBuilder import FontBuilder
-from fontTools.ttLib.tables._g_l_y_f import Glyph
+from fontTools.pens.t2CharStringPen import T2CharStringPen
 from fontTools.pens.ttGlyphPen import TTGlyphPen
+from fontTools.ttLib import newTable
+from fontTools.ttLib.tables import ttProgram
+
 
 def create_minimal_ttf(filepath="tests/data/minimal.ttf"):
     """
@@ -40,13 +45,359 @@ def create_minimal_ttf(filepath="tests/data/minimal.ttf"):
     fb.setupHead(unitsPerEm=1024, created=0, modified=0) # Add created/modified
     fb.setupHorizontalHeader(ascent=800, descent=-200) # Provide some default values
     fb.setupHorizontalMetrics(fb.font["hmtx"]) # Pass the hmtx dict
-    fb.setupOS2(sTypoAscender=800, sTypoDescender=-200, usWinAscent=800, usWinDescent=200, achVendID="TEST") # Add some required OS/2 fields
-    fb.setupPost(isFixedPitch=0, minMemType42=0, maxMemType42=0, minMemType1=0, maxMemType1=0)
+    fb.setupOS2(  # Add some required OS/2 fields
+        sTypoAscender=800,
+        sTypoDescender=-200,
+        usWinAscent=800,
+        usWinDescent=200,
+        achVendID="TEST",
+    )
+    fb.setupPost(
+        isFixedPitch=0, minMemType42=0, maxMemType42=0, minMemType1=0, maxMemType1=0
+    )
     fb.setupMaxp() # Crucial, calculates numGlyphs etc.
 
     fb.save(filepath)
     print(f"Minimal TTF saved to {filepath}")
 
+def create_multi_glyph_ttf(filepath, num_glyphs=64):
+    """
+    Creates a TTF with `num_glyphs` simple glyphs (boxes with a quadratic
+    bowl of varying size) plus one composite glyph whose second component
+    is offset by whole pixels at 16 PPM, for tests that need more than a
+    single glyph.
+    """
+    glyph_names = [".notdef"] + [f"g{i:04d}" for i in range(1, num_glyphs)]
+    glyph_names.append("composite")
+    fb = FontBuilder(1024, isTTF=True)
+    fb.setupGlyphOrder(glyph_names)
+    fb.setupCharacterMap(
+        {0x4E00 + i: name for i, name in enumerate(glyph_names[1:-1])}
+    )
+
+    glyphs = {}
+    metrics = {}
+    for i, name in enumerate(glyph_names[:-1]):
+        pen = TTGlyphPen(None)
+        top = 500 + (i * 7) % 200
+        pen.moveTo((50 + i % 13, 0))
+        pen.lineTo((50 + i % 13, top))
+        pen.lineTo((450, top))
+        pen.lineTo((450, 0))
+        pen.closePath()
+        pen.moveTo((120, 100))
+        pen.qCurveTo((120, 300 + i % 37), (380, 300 - i % 29), (380, 100))
+        pen.closePath()
+        glyphs[name] = pen.glyph()
+        metrics[name] = (500 + i % 11, 50 + i % 13)
+
+    pen = TTGlyphPen(glyphs)
+    pen.addComponent(glyph_names[1], (1, 0, 0, 1, 0, 0))
+    pen.addComponent(glyph_names[2], (1, 0, 0, 1, 256, 640))
+    glyphs["composite"] = pen.glyph()
+    metrics["composite"] = (760, 50)
+
+    fb.setupGlyf(glyphs)
+    fb.setupHorizontalMetrics(metrics)
+    fb.setupHorizontalHeader(ascent=800, descent=-200)
+    fb.setupNameTable({"familyName": "Multi Glyph Test", "styleName": "Regular"})
+    fb.setupHead(unitsPerEm=1024, created=0, modified=0)
+    fb.setupOS2(
+        sTypoAscender=800, sTypoDescender=-200, usWinAscent=800, usWinDescent=200
+    )
+    fb.setupPost()
+    fb.setupMaxp()
+
+    # A (no-op) control value program marks the font as natively hinted, so
+    # FreeType runs its TrueType interpreter instead of the autohinter.
+    prep = newTable("prep")
+    prep.program = ttProgram.Program()
+    prep.program.fromBytecode(b"\xb0\x00\x21")  # PUSHB[0] 0, POP[]
+    fb.font["prep"] = prep
+    fb.save(filepath)
+
+
+def create_cff_otf(filepath, num_glyphs=32, cff2=False):
+    """
+    Creates a CFF (or, with `cff2=True`, CFF2) flavored OpenType font with
+    `num_glyphs` glyphs made of a box and a cubic bowl.
+    """
+    glyph_names = [".notdef"] + [f"g{i:04d}" for i in range(1, num_glyphs)]
+    fb = FontBuilder(1000, isTTF=False)
+    fb.setupGlyphOrder(glyph_names)
+    fb.setupCharacterMap({0x41 + i: name for i, name in enumerate(glyph_names[1:])})
+
+    char_strings = {}
+    metrics = {}
+    for i, name in enumerate(glyph_names):
+        width = 500 + i % 11
+        pen = T2CharStringPen(None if cff2 else width, None, CFF2=cff2)
+        top = 500 + (i * 7) % 200
+        pen.moveTo((50 + i % 13, 0))
+        pen.lineTo((450, 0))
+        pen.lineTo((450, top))
+        pen.lineTo((50 + i % 13, top))
+        pen.closePath()
+        pen.moveTo((120, 100))
+        pen.curveTo((120, 300 + i % 37), (380, 300 - i % 29), (380, 100))
+        pen.closePath()
+        char_strings[name] = pen.getCharString()
+        metrics[name] = (width, 50 + i % 13)
+
+    if cff2:
+        fb.setupCFF2(char_strings)
+    else:
+        fb.setupCFF("CFFTest-Regular", {"FullName": "CFF Test"}, char_strings, {})
+    fb.setupHorizontalMetrics(metrics)
+    fb.setupHorizontalHeader(ascent=800, descent=-200)
+    fb.setupNameTable({"familyName": "CFF Test", "styleName": "Regular"})
+    fb.setupHead(unitsPerEm=1000, created=0, modified=0)
+    fb.setupOS2(
+        sTypoAscender=800, sTypoDescender=-200, usWinAscent=800, usWinDescent=200
+    )
+    fb.setupPost()
+    fb.save(filepath)
+
+
+def create_variable_ttf(filepath, num_glyphs=16):
+    """
+    Creates a TrueType variable font with a weight axis, named Light,
+    Regular and Bold instances, and a gvar table that widens the stem
+    and raises the top of every glyph towards heavier weights.
+    """
+    from fontTools.ttLib.tables.TupleVariation import TupleVariation
+
+    glyph_names = [".notdef"] + [f"g{i:04d}" for i in range(1, num_glyphs)]
+    fb = FontBuilder(1024, isTTF=True)
+    fb.setupGlyphOrder(glyph_names)
+    fb.setupCharacterMap({0x41 + i: name for i, name in enumerate(glyph_names[1:])})
+
+    glyphs = {}
+    metrics = {}
+    variations = {}
+    for i, name in enumerate(glyph_names):
+        pen = TTGlyphPen(None)
+        top = 500 + (i * 7) % 200
+        pen.moveTo((50, 0))
+        pen.lineTo((50, top))
+        pen.lineTo((150 + i % 13, top))
+        pen.lineTo((150 + i % 13, 0))
+        pen.closePath()
+        glyphs[name] = pen.glyph()
+        metrics[name] = (300, 50)
+        # Four outline points, then the four phantom points.
+        deltas = [(0, 0), (0, 37), (83, 37), (83, 0), (0, 0), (100, 0), (0, 0), (0, 0)]
+        variations[name] = [TupleVariation({"wght": (0, 1, 1)}, deltas)]
+
+    fb.setupGlyf(glyphs)
+    fb.setupHorizontalMetrics(metrics)
+    fb.setupHorizontalHeader(ascent=800, descent=-200)
+    fb.setupNameTable({"familyName": "Variable Test", "styleName": "Regular"})
+    fb.setupFvar(
+        axes=[("wght", 300, 400, 700, "Weight")],
+        instances=[
+            {"location": {"wght": 300}, "stylename": "Light"},
+            {"location": {"wght": 400}, "stylename": "Regular"},
+            {"location": {"wght": 700}, "stylename": "Bold"},
+        ],
+    )
+    fb.setupGvar(variations)
+    fb.setupHead(unitsPerEm=1024, created=0, modified=0)
+    fb.setupOS2(
+        sTypoAscender=800, sTypoDescender=-200, usWinAscent=800, usWinDescent=200
+    )
+    fb.setupPost()
+    fb.setupMaxp()
+
+    prep = newTable("prep")
+    prep.program = ttProgram.Program()
+    prep.program.fromBytecode(b"\xb0\x00\x21")  # PUSHB[0] 0, POP[]
+    fb.font["prep"] = prep
+    fb.save(filepath)
+
+
+# Glyph program of the benchmark fonts: touch the first point in both
+# directions, then interpolate the others (IUP), as autohinted fonts do.
+BENCHMARK_GLYPH_ASSEMBLY = [
+    "SVTCA[0]", "PUSHB[ ]", "0", "MDAP[1]",
+    "SVTCA[1]", "PUSHB[ ]", "0", "MDAP[1]",
+    "IUP[0]", "IUP[1]",
+]
+BENCHMARK_FLAVORS = ("ttf", "otf", "ttc", "variable")
+
+
+def _benchmark_contours(i):
+    """
+    Returns the contours of glyph `i` as lists of (x, y, on_curve): an
+    outer bowl and a counter of quadratic segments, and a rectangular
+    stem. Segment counts vary with `i`, giving 32 to 52 points per glyph.
+    """
+    import math
+
+    contours = []
+    for cx, cy, radius, segments in (
+        (300, 350, 250 + i % 50, 8 + i % 7),
+        (300, 350, 120 + i % 30, 6 + i % 5),
+    ):
+        contour = []
+        for k in range(segments):
+            on = 2 * math.pi * k / segments
+            off = 2 * math.pi * (k + 0.5) / segments
+            x, y = cx + radius * math.cos(on), cy + radius * math.sin(on)
+            contour.append((round(x), round(y), True))
+            reach = radius / math.cos(math.pi / segments)
+            x, y = cx + reach * math.cos(off), cy + reach * math.sin(off)
+            contour.append((round(x), round(y), False))
+        if contours:
+            # Counters run opposite to the outer contour, from an on-curve point.
+            contour = contour[::-1]
+            contour = contour[1:] + contour[:1]
+        contours.append(contour)
+    left = 520 + i % 17
+    right = left + 60
+    contours.append(
+        [(left, 0, True), (left, 700, True), (right, 700, True), (right, 0, True)]
+    )
+    return contours
+
+
+def _draw_benchmark_glyph(pen, i, cubic=False):
+    """
+    Draws glyph `i` of the benchmark fonts to a segment pen, elevating the
+    quadratic segments to cubic ones with `cubic=True`.
+    """
+    for contour in _benchmark_contours(i):
+        current = contour[0][:2]
+        pen.moveTo(current)
+        k = 1
+        while k < len(contour):
+            x, y, on = contour[k]
+            if on:
+                pen.lineTo((x, y))
+                current = (x, y)
+                k += 1
+                continue
+            end = contour[(k + 1) % len(contour)][:2]
+            if cubic:
+                pen.curveTo(
+                    (
+                        current[0] + 2 * (x - current[0]) / 3,
+                        current[1] + 2 * (y - current[1]) / 3,
+                    ),
+                    (end[0] + 2 * (x - end[0]) / 3, end[1] + 2 * (y - end[1]) / 3),
+                    end,
+                )
+            else:
+                pen.qCurveTo((x, y), end)
+            current = end
+            k += 2
+        pen.closePath()
+
+
+def _build_benchmark_font(num_glyphs, flavor, style="Regular"):
+    from fontTools.ttLib.tables.TupleVariation import TupleVariation
+
+    glyph_names = [".notdef"] + [f"g{i:05d}" for i in range(1, num_glyphs)]
+    is_ttf = flavor != "otf"
+    fb = FontBuilder(1000, isTTF=is_ttf)
+    fb.setupGlyphOrder(glyph_names)
+    # Supplementary private use plane: room for all 65535 glyph IDs.
+    fb.setupCharacterMap({0xF0000 + i: name for i, name in enumerate(glyph_names[1:])})
+    metrics = {name: (700 + i % 11, 50) for i, name in enumerate(glyph_names)}
+
+    if is_ttf:
+        program = ttProgram.Program()
+        program.fromAssembly(BENCHMARK_GLYPH_ASSEMBLY)
+        glyphs = {}
+        for i, name in enumerate(glyph_names):
+            pen = TTGlyphPen(None)
+            _draw_benchmark_glyph(pen, i)
+            glyphs[name] = pen.glyph()
+            glyphs[name].program = program
+        fb.setupGlyf(glyphs)
+    else:
+        char_strings = {}
+        for i, name in enumerate(glyph_names):
+            pen = T2CharStringPen(metrics[name][0], None)
+            _draw_benchmark_glyph(pen, i, cubic=True)
+            char_strings[name] = pen.getCharString()
+        fb.setupCFF(
+            "Benchmark-" + style,
+            {"FullName": "Benchmark " + style},
+            char_strings,
+            {"BlueValues": [-10, 0, 700, 710], "StdHW": 60, "StdVW": 60},
+        )
+    fb.setupHorizontalMetrics(metrics)
+    fb.setupHorizontalHeader(ascent=800, descent=-200)
+    fb.setupNameTable({"familyName": "Benchmark", "styleName": style})
+    fb.setupHead(unitsPerEm=1000, created=0, modified=0)
+    fb.setupOS2(
+        sTypoAscender=800, sTypoDescender=-200, usWinAscent=800, usWinDescent=200
+    )
+    fb.setupPost()
+
+    if flavor == "variable":
+        fb.setupFvar(
+            axes=[("wght", 300, 400, 700, "Weight")],
+            instances=[
+                {"location": {"wght": 300}, "stylename": "Light"},
+                {"location": {"wght": 700}, "stylename": "Bold"},
+            ],
+        )
+        variations = {}
+        for name in glyph_names:
+            # Thicken every outline point, leaving the phantom points.
+            num_points = len(glyphs[name].coordinates)
+            deltas = [(k % 5 * 8, k % 3 * 6) for k in range(num_points)] + [(0, 0)] * 4
+            variations[name] = [TupleVariation({"wght": (0, 1, 1)}, deltas)]
+        fb.setupGvar(variations)
+
+    if is_ttf:
+        fb.setupMaxp()
+        maxp = fb.font["maxp"]
+        maxp.maxFunctionDefs = 1
+        maxp.maxStackElements = 16
+        maxp.maxSizeOfInstructions = len(program.getBytecode())
+        fpgm = newTable("fpgm")
+        fpgm.program = ttProgram.Program()
+        fpgm.program.fromAssembly(["PUSHB[ ]", "0", "FDEF[ ]", "ENDF[ ]"])
+        fb.font["fpgm"] = fpgm
+        prep = newTable("prep")
+        prep.program = ttProgram.Program()
+        prep.program.fromBytecode(b"\xb0\x00\x21")  # PUSHB[0] 0, POP[]
+        fb.font["prep"] = prep
+        cvt = newTable("cvt ")
+        cvt.values = array("h", [0, 60, 700, -10, 710])
+        fb.font["cvt "] = cvt
+    return fb.font
+
+
+def create_benchmark_font(filepath, num_glyphs=1000, flavor="ttf"):
+    """
+    Creates a hinted font for benchmarks with `num_glyphs` glyphs of 32 to
+    52 points each. `flavor` is "ttf" (TrueType with fpgm, prep, cvt and
+    glyph programs), "otf" (CFF), "ttc" (a collection of two TrueType
+    fonts sharing their glyf table) or "variable" (TrueType with a weight
+    axis and deltas for every point).
+    """
+    if flavor not in BENCHMARK_FLAVORS:
+        raise ValueError(f"Unknown benchmark flavor {flavor!r}")
+    if flavor != "ttc":
+        _build_benchmark_font(num_glyphs, flavor).save(filepath)
+        return
+
+    from fontTools.ttLib import TTCollection
+
+    regular = _build_benchmark_font(num_glyphs, "ttf")
+    bold = _build_benchmark_font(num_glyphs, "ttf", style="Bold")
+    bold["glyf"] = regular["glyf"]
+    bold["loca"] = regular["loca"]
+    collection = TTCollection()
+    collection.fonts = [regular, bold]
+    collection.save(filepath, shareTables=True)
+
+
+
 if __name__ == "__main__":
     import os
     if not os.path.exists("tests/data"):
@@ -0,0 +1,149 @@
+# this_file: tests/test_batch.py
+"""
+Tests for the directory/manifest batch runner.
+"""
+
+import json
+import shutil
+
+from conftest import font_tables
+
+from opentype_hinting_freezer.batch import (
+    JOURNAL_NAME,
+    freezebatch,
+    load_jobs,
+    read_journal,
+)
+from opentype_hinting_freezer.hintingfreezer import FontHintFreezer, freezehinting
+
+
+def test_load_jobs_from_directory(sample_ttf_path, temp_dir):
+    """Test that a directory expands to one job per font, PPM and mode."""
+    fonts_dir = temp_dir / "fonts"
+    fonts_dir.mkdir()
+    shutil.copy(sample_ttf_path, fonts_dir / "a.ttf")
+    shutil.copy(sample_ttf_path, fonts_dir / "b.ttf")
+    (fonts_dir / "notes.txt").write_text("not a font")
+
+    jobs = load_jobs(fonts_dir, out_dir=temp_dir / "out", ppm=[10, 12], mode="mono")
+
+    assert len(jobs) == 4
+    assert {j.ppm for j in jobs} == {10, 12}
+    assert jobs[0].out == str(temp_dir / "out" / "a.fhf-10-mono.ttf")
+
+
+def test_load_jobs_from_csv_manifest(sample_ttf_path, temp_dir):
+    """Test that CSV manifest rows override the defaults."""
+    shutil.copy(sample_ttf_path, temp_dir / "a.ttf")
+    manifest = temp_dir / "jobs.csv"
+    manifest.write_text(
+        'font,ppm,mode,subfont,var\na.ttf,11,lcd,0,\na.ttf,,light,,"{""wght"": 700}"\n'
+    )
+
+    jobs = load_jobs(manifest, out_dir=temp_dir, ppm=9)
+
+    assert [(j.ppm, j.mode) for j in jobs] == [(11, "lcd"), (9, "light")]
+    assert jobs[1].var == {"wght": 700}
+    assert jobs[0].fontpath == str(temp_dir / "a.ttf")
+
+
+def test_load_jobs_out_with_lists(sample_ttf_path, temp_dir):
+    """Test that an entry with an out path and several PPMs names each output."""
+    shutil.copy(sample_ttf_path, temp_dir / "a.ttf")
+    manifest = temp_dir / "jobs.json"
+    manifest.write_text(
+        json.dumps([{"font": "a.ttf", "out": "sizes", "ppm": [10, 12]}])
+    )
+
+    jobs = load_jobs(manifest, mode="mono")
+
+    assert [j.out for j in jobs] == [
+        str(temp_dir / "sizes" / "a.fhf-10-mono.ttf"),
+        str(temp_dir / "sizes" / "a.fhf-12-mono.ttf"),
+    ]
+
+
+def test_freezebatch_resumes_from_journal(sample_ttf_path, temp_dir):
+    """Test that a second run skips jobs recorded as done."""
+    manifest = temp_dir / "jobs.json"
+    manifest.write_text(
+        json.dumps(
+            [
+                {"fontpath": str(sample_ttf_path), "ppm": 12, "mode": "mono"},
+                {"fontpath": str(sample_ttf_path), "ppm": 14, "mode": "mono"},
+            ]
+        )
+    )
+    out_dir = temp_dir / "out"
+
+    summary = freezebatch(manifest, out_dir=out_dir, workers=1)
+    assert summary == {"done": 2, "skipped": 0, "failed": 0}
+    assert len(read_journal(out_dir / JOURNAL_NAME)) == 2
+
+    (out_dir / f"{sample_ttf_path.stem}.fhf-14-mono.ttf").unlink()
+    summary = freezebatch(manifest, out_dir=out_dir, workers=1)
+    assert summary == {"done": 1, "skipped": 1, "failed": 0}
+
+
+def test_freezebatch_parses_each_font_once(multi_glyph_ttf_path, temp_dir, monkeypatch):
+    """Test that the jobs of one font share a freezer and match single freezes."""
+    opened = []
+    init = FontHintFreezer.__init__
+
+    def counting_init(self, *args, **kwargs):
+        opened.append(args)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(FontHintFreezer, "__init__", counting_init)
+    fonts_dir = temp_dir / "fonts"
+    fonts_dir.mkdir()
+    shutil.copy(multi_glyph_ttf_path, fonts_dir / "a.ttf")
+    jobs = [(ppm, mode) for ppm in (10, 12) for mode in ("mono", "lcd")]
+    summary = freezebatch(
+        fonts_dir,
+        out_dir=temp_dir / "out",
+        ppm=[10, 12],
+        mode=["mono", "lcd"],
+        workers=1,
+    )
+
+    assert summary == {"done": len(jobs), "skipped": 0, "failed": 0}
+    assert len(opened) == 1
+    monkeypatch.undo()
+    for ppm, mode in jobs:
+        name = f"a.fhf-{ppm}-{mode}.ttf"
+        freezehinting(fonts_dir / "a.ttf", out=temp_dir / name, ppm=ppm, mode=mode)
+        assert font_tables(temp_dir / "out" / name) == font_tables(temp_dir / name)
+
+
+def test_freezebatch_records_failures(sample_ttf_path, temp_dir):
+    """Test that a failing job is journaled without stopping the run."""
+    summary = freezebatch(
+        str(sample_ttf_path.parent / "*.ttf"),
+        out_dir=temp_dir,
+        ppm=[-1, 12],
+        mode="mono",
+        workers=2,
+    )
+
+    assert summary == {"done": 1, "skipped": 0, "failed": 1}
+    records = [
+        json.loads(line) for line in (temp_dir / JOURNAL_NAME).read_text().splitlines()
+    ]
+    assert sorted(r["status"] for r in records) == ["done", "error"]
+
+
+def test_cli_batch_subcommand(cli_runner, sample_ttf_path, temp_dir):
+    """Test the `pyfthintfreeze batch` subcommand."""
+    result = cli_runner(
+        [
+            "batch",
+            str(sample_ttf_path.parent),
+            "--ppm=12",
+            "--mode=mono",
+            f"--out_dir={temp_dir}",
+        ]
+    )
+
+    assert result.returncode == 0, f"CLI failed: {result.stderr}"
+    assert (temp_dir / f"{sample_ttf_path.stem}.fhf-12-mono.ttf").exists()
@@ -0,0 +1,157 @@
+# this_file: tests/test_benchmark.py
+"""
+Throughput benchmarks on large generated fonts.
+
+Skipped unless pytest runs with --benchmark. Each case freezes a generated
+TrueType, CFF, TTC or variable font in a fresh process with --profile and
+reports glyphs/sec, points/sec and per-stage time and peak RSS. Results
+are compared to a baseline recorded on the same machine with
+--benchmark-save (tests/.benchmark-baseline.json, or --benchmark-baseline):
+a case fails when its throughput drops, or its peak RSS grows, by more
+than --benchmark-threshold. Cases without a baseline are skipped; no
+baseline is committed, since absolute throughput depends on the machine.
+
+    pytest -m benchmark --benchmark --benchmark-save  # on the base commit
+    pytest -m benchmark --benchmark                   # on the change
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Higher is better for throughput, lower is better for memory.
+THROUGHPUT_METRICS = ("glyphs_per_sec", "points_per_sec", "freeze_glyphs_per_sec")
+MEMORY_METRICS = ("peak_rss_bytes",)
+
+# Instancing is part of the measured work for the variable font.
+FLAVOR_ARGS = {
+    "ttf": [],
+    "otf": [],
+    "ttc": ["--subfont=1"],
+    "variable": ['--var={"wght":600}'],
+}
+
+
+@pytest.fixture(scope="session")
+def benchmark_fonts(tmp_path_factory):
+    """Returns a function that generates (once) the font of a flavor and size."""
+    from generate_minimal_ttf import create_benchmark_font
+
+    directory = tmp_path_factory.mktemp("benchmark-fonts")
+    paths = {}
+
+    def font(flavor, size):
+        if (flavor, size) not in paths:
+            path = directory / f"benchmark-{size}.{flavor}"
+            create_benchmark_font(str(path), size, flavor)
+            paths[flavor, size] = path
+        return paths[flavor, size]
+
+    return font
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(request):
+    """Collects the results of the session and, with --benchmark-save, writes them."""
+    results = {}
+    yield results
+    if results and request.config.getoption("--benchmark-save"):
+        path = request.config.getoption("--benchmark-baseline")
+        try:
+            with open(path, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            baseline = {}
+        baseline.update(results)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(baseline.items())), f, indent=2)
+            f.write("\n")
+
+
+def _run_benchmark(font_path, mode, extra_args, temp_dir):
+    report_path = temp_dir / "profile.json"
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "opentype_hinting_freezer",
+            str(font_path),
+            "--ppm=16",
+            f"--mode={mode}",
+            f"--out={temp_dir / 'frozen'}",
+            f"--profile={report_path}",
+            *extra_args,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    report = json.loads(report_path.read_text())
+    (output,) = report["outputs"]
+    phases = output["phases"]
+    glyphs = output["glyphs"]["count"]
+    points = output["glyphs"]["points"]
+    total = sum(phase["seconds"] for phase in phases.values())
+    freeze = phases["freeze"]["seconds"]
+    return {
+        "glyphs": glyphs,
+        "points": points,
+        "glyphs_per_sec": round(glyphs / total, 1),
+        "points_per_sec": round(points / total, 1),
+        "freeze_glyphs_per_sec": round(glyphs / freeze, 1),
+        "peak_rss_bytes": report["peak_rss_bytes"],
+        "stages": {
+            name: {
+                "seconds": round(phase["seconds"], 4),
+                "peak_rss_growth_bytes": phase["peak_rss_growth_bytes"],
+            }
+            for name, phase in phases.items()
+        },
+    }
+
+
+def _regressions(result, baseline, threshold):
+    regressions = []
+    for metric in THROUGHPUT_METRICS:
+        if result[metric] < baseline[metric] * (1 - threshold):
+            regressions.append(
+                f"{metric}: {result[metric]} < baseline {baseline[metric]}"
+            )
+    for metric in MEMORY_METRICS:
+        if result[metric] > baseline[metric] * (1 + threshold):
+            regressions.append(
+                f"{metric}: {result[metric]} > baseline {baseline[metric]}"
+            )
+    return regressions
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+@pytest.mark.parametrize("mode", ["mono", "lcd"])
+@pytest.mark.parametrize("flavor", list(FLAVOR_ARGS))
+def test_benchmark(
+    flavor, benchmark_size, mode, benchmark_fonts, benchmark_results, temp_dir, request
+):
+    """Benchmarks one font flavor, size and mode against the baseline."""
+    font_path = benchmark_fonts(flavor, benchmark_size)
+    result = _run_benchmark(font_path, mode, FLAVOR_ARGS[flavor], temp_dir)
+    case = f"{flavor}-{benchmark_size}-{mode}"
+    benchmark_results[case] = result
+    print(f"{case}: {json.dumps(result)}")
+    assert result["glyphs"] == benchmark_size
+
+    config = request.config
+    if config.getoption("--benchmark-save"):
+        return
+    try:
+        with open(config.getoption("--benchmark-baseline"), encoding="utf-8") as f:
+            baseline = json.load(f).get(case)
+    except FileNotFoundError:
+        baseline = None
+    if baseline is None:
+        pytest.skip(f"No baseline for {case}; record one with --benchmark-save")
+    regressions = _regressions(
+        result, baseline, config.getoption("--benchmark-threshold")
+    )
+    assert not regressions, f"{case} regressed: " + "; ".join(regressions)
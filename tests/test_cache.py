@@ -0,0 +1,158 @@
+# this_file: tests/test_cache.py
+"""
+Tests for the content-addressed cache of frozen outputs.
+"""
+
+import os
+import shutil
+
+import pytest
+from conftest import font_tables
+from fontTools.ttLib import TTFont
+
+from opentype_hinting_freezer import hintingfreezer
+from opentype_hinting_freezer.cache import FreezeCache, file_digest
+from opentype_hinting_freezer.hintingfreezer import freezehinting
+
+
+def test_cache_hit_copies_output_without_opening_font(
+    sample_ttf_path, temp_dir, monkeypatch
+):
+    """Test that a second run is served from the cache byte for byte."""
+    cache_dir = temp_dir / "cache"
+    first = temp_dir / "first.ttf"
+    freezehinting(sample_ttf_path, out=first, ppm=12, mode="mono", cache=cache_dir)
+    assert len(list(cache_dir.glob("*.font"))) == 1
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("font opened on a cache hit")
+
+    monkeypatch.setattr(hintingfreezer.FontHintFreezer, "from_path", fail)
+    second = temp_dir / "second.ttf"
+    freezehinting(sample_ttf_path, out=second, ppm=12, mode="mono", cache=cache_dir)
+
+    assert second.read_bytes() == first.read_bytes()
+
+
+def test_cache_misses_on_other_options(sample_ttf_path, temp_dir):
+    """Test that PPM, mode and font contents are part of the key."""
+    cache_dir = temp_dir / "cache"
+    freezehinting(
+        sample_ttf_path,
+        out=temp_dir,
+        ppm=[11, 12],
+        mode=["mono", "lcd"],
+        cache=cache_dir,
+    )
+    assert len(list(cache_dir.glob("*.font"))) == 4
+
+    cache = FreezeCache(cache_dir)
+    digest = file_digest(sample_ttf_path)
+    assert cache.key(digest, ppm=12, mode="mono") != cache.key(
+        digest, ppm=12, mode="lcd"
+    )
+    assert cache.key(digest, ppm=12, mode="mono") != cache.key(
+        "0" * 64, ppm=12, mode="mono"
+    )
+
+
+def test_cache_key_normalizes_locations(temp_dir):
+    """Test that integer and float axis values give the same key."""
+    cache = FreezeCache(temp_dir / "cache")
+    digest = "0" * 64
+    assert hintingfreezer._cache_key(
+        cache, digest, 12, "mono", var={"wght": 700}
+    ) == hintingfreezer._cache_key(cache, digest, 12, "mono", var={"wght": 700.0})
+
+
+def test_cache_key_includes_fast_path(sample_ttf_path, temp_dir):
+    """Test that a freeze without the fast path is not served a fast-path entry."""
+    cache_dir = temp_dir / "cache"
+    freezehinting(sample_ttf_path, out=temp_dir / "fast.ttf", ppm=12, cache=cache_dir)
+    freezehinting(
+        sample_ttf_path,
+        out=temp_dir / "slow.ttf",
+        ppm=12,
+        cache=cache_dir,
+        fast_path=False,
+    )
+    freezehinting(
+        sample_ttf_path,
+        out=temp_dir / "verified.ttf",
+        ppm=12,
+        cache=cache_dir,
+        verify_fast_path=True,
+    )
+    assert len(list(cache_dir.glob("*.font"))) == 3
+
+
+def test_cache_keys_instance_names(variable_ttf_path, temp_dir):
+    """Test that named-instance outputs are not served for a plain location."""
+    from fontTools.otlLib.builder import buildStatTable
+
+    font = TTFont(variable_ttf_path)
+    values = [
+        {"value": 300, "name": "Light"},
+        {"value": 400, "name": "Regular", "flags": 0x2},
+        {"value": 700, "name": "Bold"},
+    ]
+    buildStatTable(font, [{"tag": "wght", "name": "Weight", "values": values}])
+    font_path = temp_dir / "stat.ttf"
+    font.save(font_path)
+    cache_dir = temp_dir / "cache"
+
+    freezehinting(
+        font_path, out=temp_dir / "instances", ppm=12, instances=True, cache=cache_dir
+    )
+    cached = temp_dir / "cached.ttf"
+    freezehinting(font_path, out=cached, ppm=12, var={"wght": 700}, cache=cache_dir)
+    fresh = temp_dir / "fresh.ttf"
+    freezehinting(font_path, out=fresh, ppm=12, var={"wght": 700})
+    assert font_tables(cached) == font_tables(fresh)
+
+
+def test_cache_evicts_least_recently_used(sample_ttf_path, temp_dir):
+    """Test that eviction keeps the cache under its cap, oldest first."""
+    entry_size = sample_ttf_path.stat().st_size
+    cache = FreezeCache(temp_dir / "cache", max_bytes=entry_size * 2)
+    for key in ("a", "b"):
+        cache.store(key, sample_ttf_path)
+    os.utime(cache.directory / "a.font", (1, 1))
+    os.utime(cache.directory / "b.font", (2, 2))
+    assert cache.fetch("a", temp_dir / "hit.ttf")  # refreshes "a"
+
+    cache.store("c", sample_ttf_path)
+
+    assert sorted(p.stem for p in cache.directory.glob("*.font")) == ["a", "c"]
+    assert cache.size() <= cache.max_bytes
+    assert not list(cache.directory.glob("*.tmp"))
+    assert not cache.fetch("b", temp_dir / "miss.ttf")
+
+
+def test_cache_rejects_non_positive_size(temp_dir):
+    """Test that a zero cache size is an error rather than a no-op cache."""
+    with pytest.raises(ValueError):
+        FreezeCache(temp_dir / "cache", max_bytes=0)
+
+
+def test_batch_jobs_share_cache(sample_ttf_path, temp_dir):
+    """Test that batch jobs store and reuse cache entries."""
+    from opentype_hinting_freezer.batch import freezebatch
+
+    fonts_dir = temp_dir / "fonts"
+    fonts_dir.mkdir()
+    shutil.copy(sample_ttf_path, fonts_dir / "a.ttf")
+    shutil.copy(sample_ttf_path, fonts_dir / "b.ttf")
+
+    summary = freezebatch(
+        fonts_dir,
+        out_dir=temp_dir / "out",
+        ppm=12,
+        mode="mono",
+        workers=1,
+        cache=str(temp_dir / "cache"),
+    )
+
+    assert summary["done"] == 2
+    # Both fonts have the same contents, so they share one entry.
+    assert len(list((temp_dir / "cache").glob("*.font"))) == 1
@@ -1,7 +1,8 @@
-import pytest
-from pathlib import Path
 import subprocess
 import sys
+from pathlib import Path
+
+import pytest
 
 # Helper to get the path to the pyfthintfreeze executable script
 # This might need adjustment depending on how the CLI is installed/run in test env
@@ -97,6 +98,20 @@ def test_cli_help_message():
         f"Flag '--mode' not found in help (stderr).\nstderr: {result_help.stderr}"
 
 
+
+def test_cli_imports_subcommands_on_use():
+    """Test that a plain freeze does not import the subcommand modules."""
+    code = (
+        "import sys; import opentype_hinting_freezer.__main__; "
+        "print(sorted(m for m in sys.modules if m.rsplit('.', 1)[-1] "
+        "in ('batch', 'server', 'shard')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
 # More integration tests can be added here:
 # - Different modes
 # - Different PPM values
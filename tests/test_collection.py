@@ -0,0 +1,98 @@
+# this_file: tests/test_collection.py
+"""
+Tests for freezing every subfont of a collection in one run.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+
+import pytest
+from conftest import font_tables
+from fontTools.ttLib import TTCollection, TTFont
+
+from opentype_hinting_freezer import hintingfreezer
+from opentype_hinting_freezer.collection import subfont_groups
+from opentype_hinting_freezer.hintingfreezer import freezehinting, read_from_path
+
+
+@pytest.fixture(scope="module")
+def collection_path(tmp_path_factory, multi_glyph_ttf_path):
+    """A TTC of two subfonts sharing glyf and loca, then an unrelated subfont."""
+    from generate_minimal_ttf import create_benchmark_font
+
+    directory = tmp_path_factory.mktemp("collection")
+    shared = directory / "shared.ttc"
+    create_benchmark_font(str(shared), 40, "ttc")
+    collection = TTCollection(shared)
+    collection.fonts.append(TTFont(multi_glyph_ttf_path))
+    path = directory / "fonts.ttc"
+    collection.save(path, shareTables=True)
+    return path
+
+
+def test_subfont_groups(collection_path):
+    """Test that subfonts sharing their glyph data are grouped."""
+    assert subfont_groups(read_from_path(collection_path)) == [[0, 1], [2]]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_freeze_collection(collection_path, temp_dir, stream):
+    """Test that every subfont matches its own freeze and shared tables stay shared."""
+    out = temp_dir / "frozen.ttc"
+    freezehinting(
+        collection_path, out=out, ppm=12, mode="mono", collection=True, stream=stream
+    )
+
+    frozen = TTCollection(out, lazy=True)
+    assert len(frozen.fonts) == 3
+    for number, font in enumerate(frozen.fonts):
+        single = temp_dir / f"single-{number}.ttf"
+        freezehinting(collection_path, out=single, ppm=12, mode="mono", subfont=number)
+        expected = TTFont(single, lazy=True)
+        assert font_tables(font) == font_tables(expected)
+        for field in ("xMin", "yMin", "xMax", "yMax", "indexToLocFormat", "flags"):
+            assert getattr(font["head"], field) == getattr(expected["head"], field)
+
+    first, second, other = (font.reader.tables for font in frozen.fonts)
+    for tag in ("glyf", "loca", "hmtx", "cmap"):
+        assert first[tag].offset == second[tag].offset
+    assert first["glyf"].offset != other["glyf"].offset
+    assert first["name"].offset != second["name"].offset
+
+
+def test_freeze_collection_spawned_jobs(collection_path, temp_dir, monkeypatch):
+    """Test that spawned workers, whose arguments are pickled, get the font."""
+    expected = temp_dir / "expected.ttc"
+    freezehinting(collection_path, out=expected, ppm=12, collection=True)
+
+    spawn_pool = partial(ProcessPoolExecutor, mp_context=get_context("spawn"))
+    monkeypatch.setattr(hintingfreezer, "ProcessPoolExecutor", spawn_pool)
+    out = temp_dir / "frozen.ttc"
+    freezehinting(
+        collection_path, out=out, ppm=12, collection=True, jobs=2, fast_path=False
+    )
+    frozen = TTCollection(out, lazy=True).fonts
+    for font, reference in zip(frozen, TTCollection(expected, lazy=True).fonts):
+        assert font_tables(font) == font_tables(reference)
+
+
+def test_freeze_collection_batch(collection_path, temp_dir):
+    """Test that several sizes write one automatically named collection each."""
+    freezehinting(
+        collection_path, out=temp_dir, ppm=[12, 16], mode="mono", collection=True
+    )
+
+    for size in (12, 16):
+        frozen = TTCollection(temp_dir / f"fonts.fhf-{size}-mono.ttc", lazy=True)
+        assert len(frozen.fonts) == 3
+
+
+def test_freeze_collection_rejects(collection_path, multi_glyph_ttf_path, temp_dir):
+    """Test that single fonts and per-font options are refused."""
+    with pytest.raises(ValueError, match="Not a font collection"):
+        freezehinting(multi_glyph_ttf_path, out=temp_dir / "x.ttc", collection=True)
+    with pytest.raises(ValueError, match="unicodes"):
+        freezehinting(
+            collection_path, out=temp_dir / "x.ttc", collection=True, unicodes="A"
+        )
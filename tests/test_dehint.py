@@ -0,0 +1,112 @@
+# this_file: tests/test_dehint.py
+"""
+Tests for stripping the hinting of frozen fonts and writing their device metrics.
+"""
+
+import pytest
+from fontTools.ttLib import TTCollection, TTFont
+
+from opentype_hinting_freezer.dehint import UNHINTED_PREP
+from opentype_hinting_freezer.hintingfreezer import (
+    FontHintFreezer,
+    freeze_bytes,
+    freezehinting,
+)
+from opentype_hinting_freezer.pool import FreezerPool
+from opentype_hinting_freezer.unhinted import autohinted_by_freetype
+
+
+@pytest.fixture(scope="module")
+def hinted_ttf_path(tmp_path_factory):
+    """A font with fpgm, prep, cvt and glyph instructions."""
+    from generate_minimal_ttf import create_benchmark_font
+
+    path = tmp_path_factory.mktemp("dehint") / "hinted.ttf"
+    create_benchmark_font(str(path), 40, "ttf")
+    return path
+
+
+def test_dehint_strips_hinting(hinted_ttf_path, temp_dir):
+    """Test that only a dropout-control prep and a single gasp range remain."""
+    plain = temp_dir / "plain.ttf"
+    dehinted = temp_dir / "dehinted.ttf"
+    freezehinting(hinted_ttf_path, out=plain, ppm=12, mode="mono")
+    freezehinting(hinted_ttf_path, out=dehinted, ppm=12, mode="mono", dehint=True)
+
+    font = TTFont(dehinted)
+    assert "fpgm" not in font and "cvt " not in font
+    assert font["prep"].program.getBytecode() == UNHINTED_PREP
+    assert list(font["gasp"].gaspRange) == [0xFFFF]
+    assert font["maxp"].maxFunctionDefs == 0
+    assert font["maxp"].maxSizeOfInstructions == 0
+    assert not any(
+        font["glyf"][name].program.getBytecode() for name in font.getGlyphOrder()
+    )
+    # FreeType would autohint a font without any program.
+    assert not autohinted_by_freetype(font)
+
+    reference = TTFont(plain)
+    for tag in ("glyf", "hmtx", "cmap", "name", "OS/2"):
+        assert font.reader[tag] == reference.reader[tag]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.parametrize("mode", ["mono", "lcd", "light"])
+@pytest.mark.parametrize("ppm", [9, 16, 37])
+def test_device_metrics_match_freetype(hinted_ttf_path, temp_dir, ppm, mode, stream):
+    """Test that hdmx and VDMX hold the hinted advances and the frozen extremes."""
+    out = temp_dir / "dehinted.ttf"
+    freezehinting(
+        hinted_ttf_path, out=out, ppm=ppm, mode=mode, dehint=True, stream=stream
+    )
+    font = TTFont(out)
+    widths = font["hdmx"].hdmx[ppm]
+    assert set(font["LTSH"].yPels.values()) == {1}
+
+    source = FontHintFreezer.from_path(hinted_ttf_path, ppm=ppm, render_mode=mode)
+    frozen = FontHintFreezer.from_path(out, ppm=ppm, render_mode=mode)
+    y_max, y_min = 0, 0
+    for glyph_name in font.getGlyphOrder():
+        for fhf in (source, frozen):
+            fhf.glyphName = glyph_name
+            fhf.prep_glyph()
+            assert fhf.ftGlyph.metrics.horiAdvance == widths[glyph_name] * 64
+        metrics = frozen.ftGlyph.metrics
+        if metrics.height:
+            y_max = max(y_max, metrics.horiBearingY // 64)
+            y_min = min(y_min, (metrics.horiBearingY - metrics.height) // 64)
+    assert font["VDMX"].groups == [{ppm: (y_max, y_min)}]
+
+
+def test_dehint_large_ppm_and_cff(hinted_ttf_path, cff_otf_path, temp_dir):
+    """Test that PPMs over 255 get no hdmx or VDMX and CFF fonts are unchanged."""
+    out = temp_dir / "large.ttf"
+    freezehinting(hinted_ttf_path, out=out, ppm=300, dehint=True)
+    font = TTFont(out)
+    assert "LTSH" in font and "hdmx" not in font and "VDMX" not in font
+
+    font_data = cff_otf_path.read_bytes()
+    assert freeze_bytes(font_data, ppm=12, dehint=True) == freeze_bytes(
+        font_data, ppm=12
+    )
+
+
+def test_warm_freezer_restores_hinting(hinted_ttf_path):
+    """Test that a dehinted freeze does not leak into the next one."""
+    font_data = hinted_ttf_path.read_bytes()
+    pool = FreezerPool()
+    pool.freeze(font_data, ppm=12, dehint=True)
+    assert pool.freeze(font_data, ppm=12) == freeze_bytes(font_data, ppm=12)
+
+
+def test_dehint_collection(temp_dir):
+    """Test that every subfont of a collection is dehinted."""
+    from generate_minimal_ttf import create_benchmark_font
+
+    path = temp_dir / "fonts.ttc"
+    create_benchmark_font(str(path), 20, "ttc")
+    out = temp_dir / "frozen.ttc"
+    freezehinting(path, out=out, ppm=12, collection=True, dehint=True)
+    for font in TTCollection(out).fonts:
+        assert "fpgm" not in font and "hdmx" in font
+        assert font["prep"].program.getBytecode() == UNHINTED_PREP
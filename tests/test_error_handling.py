@@ -3,9 +3,11 @@
 Tests for error handling in OpenType Hinting Freezer.
 """
 
-import pytest
-from pathlib import Path
 import tempfile
+from pathlib import Path
+
+import pytest
+
 from opentype_hinting_freezer.hintingfreezer import freezehinting, read_from_path
 
 
@@ -122,13 +124,19 @@ def test_cli_nonexistent_font_file(cli_runner):
     assert "not found" in result.stderr.lower() or "no such file" in result.stderr.lower()
 
 
-def test_cli_invalid_ppm_value(cli_runner, sample_ttf_path):
+def test_cli_invalid_ppm_value(cli_runner, sample_ttf_path, temp_dir):
     """Test CLI with invalid PPM value."""
-    result = cli_runner([str(sample_ttf_path), "--ppm=-1"])
+    output_file = temp_dir / "output.ttf"
+    result = cli_runner([str(sample_ttf_path), "--ppm=-1", f"--out={output_file}"])
     assert result.returncode != 0
+    assert not output_file.exists()
 
 
-def test_cli_invalid_mode_value(cli_runner, sample_ttf_path):
+def test_cli_invalid_mode_value(cli_runner, sample_ttf_path, temp_dir):
     """Test CLI with invalid mode value."""
-    result = cli_runner([str(sample_ttf_path), "--mode=invalid"])
-    assert result.returncode != 0
\ No newline at end of file
+    output_file = temp_dir / "output.ttf"
+    result = cli_runner(
+        [str(sample_ttf_path), "--mode=invalid", f"--out={output_file}"]
+    )
+    assert result.returncode != 0
+    assert not output_file.exists()
\ No newline at end of file
@@ -3,11 +3,14 @@
 Tests for core functionality of OpenType Hinting Freezer.
 """
 
-import pytest
 from pathlib import Path
-from opentype_hinting_freezer.hintingfreezer import freezehinting
+
+import pytest
+from conftest import font_tables
 from fontTools.ttLib import TTFont
 
+from opentype_hinting_freezer.hintingfreezer import freezehinting
+
 
 def test_freezehinting_basic_functionality(sample_ttf_path, temp_dir):
     """Test basic freezehinting functionality."""
@@ -196,4 +199,153 @@ def test_freezehinting_different_outputs_for_different_params(sample_ttf_path, t
     freezehinting(sample_ttf_path, out=output_file_2, ppm=24, mode="mono")
     
     # Files should be different
-    assert output_file_1.read_bytes() != output_file_2.read_bytes()
\ No newline at end of file
+    assert output_file_1.read_bytes() != output_file_2.read_bytes()
+
+
+def test_freezehinting_multiple_ppms_and_modes(multi_glyph_ttf_path, temp_dir):
+    """Test that a PPM/mode sweep from one parse matches individual runs."""
+    batch_dir = temp_dir / "batch"
+    stem = multi_glyph_ttf_path.stem
+    freezehinting(
+        multi_glyph_ttf_path, out=batch_dir, ppm=[10, 24], mode=["mono", "lcd"]
+    )
+
+    for ppm in (10, 24):
+        for mode in ("mono", "lcd"):
+            batch_file = batch_dir / f"{stem}.fhf-{ppm}-{mode}.ttf"
+            single_file = temp_dir / f"single-{ppm}-{mode}.ttf"
+            freezehinting(multi_glyph_ttf_path, out=single_file, ppm=ppm, mode=mode)
+
+            assert batch_file.exists()
+            assert font_tables(batch_file) == font_tables(single_file)
+
+    # Each size overwrites the outlines the previous one froze.
+    for mode in ("mono", "lcd"):
+        small = font_tables(batch_dir / f"{stem}.fhf-10-{mode}.ttf")
+        large = font_tables(batch_dir / f"{stem}.fhf-24-{mode}.ttf")
+        assert small["glyf"] != large["glyf"]
+
+
+def test_cli_multiple_ppms(cli_runner, sample_ttf_path, temp_dir):
+    """Test CLI with a list of PPM values."""
+    result = cli_runner([
+        str(sample_ttf_path),
+        "--ppm=[10,12]",
+        "--mode=mono",
+        f"--out={temp_dir}"
+    ])
+
+    assert result.returncode == 0, f"CLI failed: {result.stderr}"
+    for ppm in (10, 12):
+        assert (temp_dir / f"{sample_ttf_path.stem}.fhf-{ppm}-mono.ttf").exists()
+
+
+def test_freezehinting_parallel_jobs_match_serial(multi_glyph_ttf_path, temp_dir):
+    """Test that sharding glyphs over worker processes matches a serial run."""
+    serial_file = temp_dir / "serial.ttf"
+    parallel_file = temp_dir / "parallel.ttf"
+
+    # Most test glyphs have no instructions; load them all through FreeType.
+    options = dict(ppm=13, mode="lcd", fast_path=False)
+    freezehinting(multi_glyph_ttf_path, out=serial_file, **options)
+    freezehinting(multi_glyph_ttf_path, out=parallel_file, jobs=3, **options)
+
+    assert font_tables(parallel_file) == font_tables(serial_file)
+
+
+def test_freezehinting_keep_composites(multi_glyph_ttf_path, temp_dir):
+    """Test that composites survive when hinting only moved whole components."""
+    flat_file = temp_dir / "flat.ttf"
+    kept_file = temp_dir / "kept.ttf"
+
+    freezehinting(multi_glyph_ttf_path, out=flat_file, ppm=16, mode="mono")
+    freezehinting(
+        multi_glyph_ttf_path, out=kept_file, ppm=16, mode="mono", keep_composites=True
+    )
+
+    flat_font = TTFont(flat_file)
+    kept_font = TTFont(kept_file)
+    flat_glyf = flat_font["glyf"]
+    kept_glyf = kept_font["glyf"]
+    assert not flat_glyf["composite"].isComposite()
+    assert kept_glyf["composite"].isComposite()
+    assert len(kept_font.reader["glyf"]) < len(flat_font.reader["glyf"])
+
+    flat_coords, flat_ends, flat_flags = flat_glyf["composite"].getCoordinates(
+        flat_glyf
+    )
+    kept_coords, kept_ends, kept_flags = kept_glyf["composite"].getCoordinates(
+        kept_glyf
+    )
+    assert kept_ends == flat_ends
+    assert list(kept_flags) == list(flat_flags)
+    for (x1, y1), (x2, y2) in zip(kept_coords, flat_coords):
+        assert abs(x1 - x2) <= 1 and abs(y1 - y2) <= 1
+
+
+def test_freezehinting_keep_composites_flattens_changed(multi_glyph_ttf_path, temp_dir):
+    """Test that composites hinted as a whole (autohinter) are still flattened."""
+    output_file = temp_dir / "light.ttf"
+
+    freezehinting(
+        multi_glyph_ttf_path,
+        out=output_file,
+        ppm=16,
+        mode="light",
+        keep_composites=True,
+    )
+
+    assert not TTFont(output_file)["glyf"]["composite"].isComposite()
+
+
+def test_freezehinting_cff_replaces_charstrings_in_place(cff_otf_path, temp_dir):
+    """Test that frozen CFF/CFF2 charstrings replace the originals."""
+    output_file = temp_dir / "output.otf"
+
+    freezehinting(cff_otf_path, out=output_file, ppm=12, mode="mono")
+
+    source_font = TTFont(cff_otf_path)
+    output_font = TTFont(output_file)
+    tag = "CFF2" if "CFF2" in source_font else "CFF "
+    assert tag in output_font
+    char_strings = output_font[tag].cff.topDictIndex[0].CharStrings
+    assert len(char_strings.charStringsIndex) == len(source_font.getGlyphOrder())
+    assert len(output_font.reader[tag]) <= len(source_font.reader[tag]) * 1.1
+    for glyph_name in source_font.getGlyphOrder():
+        char_strings[glyph_name].decompile()
+
+
+def test_freezehinting_cff_multiple_ppms(cff_otf_path, temp_dir):
+    """Test that a CFF size sweep from one parse matches individual runs."""
+    batch_dir = temp_dir / "batch"
+    freezehinting(cff_otf_path, out=batch_dir, ppm=[10, 30], mode="mono")
+
+    for ppm in (10, 30):
+        single_file = temp_dir / f"single-{ppm}.otf"
+        freezehinting(cff_otf_path, out=single_file, ppm=ppm, mode="mono")
+        batch_file = batch_dir / f"{cff_otf_path.stem}.fhf-{ppm}-mono.otf"
+        assert font_tables(batch_file) == font_tables(single_file)
+
+
+def test_freezehinting_subroutinize_cff(cff_otf_path, temp_dir):
+    """Test that re-subroutinized CFF output keeps the frozen outlines."""
+    pytest.importorskip("cffsubr")
+    from fontTools.pens.recordingPen import DecomposingRecordingPen
+
+    plain_file = temp_dir / "plain.otf"
+    subr_file = temp_dir / "subr.otf"
+    freezehinting(cff_otf_path, out=plain_file, ppm=12, mode="mono")
+    freezehinting(cff_otf_path, out=subr_file, ppm=12, mode="mono", subroutinize=True)
+
+    plain_font = TTFont(plain_file)
+    subr_font = TTFont(subr_file)
+    tag = "CFF2" if "CFF2" in plain_font else "CFF "
+    assert len(subr_font.reader[tag]) < len(plain_font.reader[tag])
+    plain_glyphs = plain_font.getGlyphSet()
+    subr_glyphs = subr_font.getGlyphSet()
+    for glyph_name in plain_font.getGlyphOrder():
+        plain_pen = DecomposingRecordingPen(plain_glyphs)
+        subr_pen = DecomposingRecordingPen(subr_glyphs)
+        plain_glyphs[glyph_name].draw(plain_pen)
+        subr_glyphs[glyph_name].draw(subr_pen)
+        assert subr_pen.value == plain_pen.value
@@ -1,6 +1,12 @@
-import pytest
 from pathlib import Path
-from opentype_hinting_freezer.hintingfreezer import read_from_path
+
+import pytest
+
+from opentype_hinting_freezer.hintingfreezer import (
+    RENDER_MODE_FLAGS,
+    FontHintFreezer,
+    read_from_path,
+)
 
 # Get the directory of the current test file
 TEST_DIR = Path(__file__).parent
@@ -25,6 +31,36 @@ def test_read_from_path_file_not_found():
     with pytest.raises(FileNotFoundError):
         read_from_path(non_existent_file)
 
+def _as_lists(frozen_glyphs):
+    """Converts FrozenGlyph arrays to plain lists for comparison."""
+    return [
+        (
+            name,
+            [tuple(p) for p in getattr(g.points, "tolist", g.points.copy)()],
+            list(g.tags),
+            list(g.contours),
+            g.width,
+            g.lsb,
+        )
+        for name, g in frozen_glyphs
+    ]
+
+
+@pytest.mark.parametrize("mode", sorted(RENDER_MODE_FLAGS))
+@pytest.mark.parametrize("ppm", [9, 16, 100])
+def test_outline_only_loading_matches_rendered(multi_glyph_ttf_path, mode, ppm):
+    """Test that skipping rasterization yields the same hinted outlines."""
+    font_data = read_from_path(multi_glyph_ttf_path)
+    # Most test glyphs have no instructions; load them all through FreeType.
+    options = dict(ppm=ppm, render_mode=mode, fast_path=False)
+    rendered = FontHintFreezer(font_data, render=True, **options)
+    outline_only = FontHintFreezer(font_data, **options)
+
+    assert _as_lists(outline_only.iter_frozen_glyphs()) == _as_lists(
+        rendered.iter_frozen_glyphs()
+    )
+
+
 # More unit tests will be added here for other functions/methods
 # in hintingfreezer.py, such as parts of FontHintFreezer.
 # For now, this is a starting point.
@@ -39,3 +75,91 @@ def test_read_from_path_file_not_found():
 #     # assert freezer.ppm == 12
 #     # assert freezer.upm > 0 # Basic check
 #     pass
+
+
+def test_segment_types_numpy_matches_python():
+    """Test that vectorized segment classification matches the point loop."""
+    np = pytest.importorskip("numpy")
+    from opentype_hinting_freezer.outline import segment_types
+
+    # Two contours: a quadratic bowl that starts off-curve, and a box.
+    tags = [0, 1, 0, 0, 1, 1, 1, 1, 1]
+    contours = [4, 8]
+    expected = [None, "qcurve", None, None, "qcurve", "line", "line", "line", "line"]
+
+    assert segment_types(tags, contours) == expected
+    assert segment_types(np.array(tags, dtype=np.uint8), np.array(contours)) == expected
+    cubic_tags = np.array([1, 2, 2, 1], dtype=np.uint8)
+    assert segment_types(cubic_tags, np.array([3])) == ["line", None, None, "curve"]
+
+
+@pytest.mark.parametrize("as_lists", [False, True])
+def test_build_tt_glyph_matches_point_pen(multi_glyph_ttf_path, as_lists):
+    """Test that the direct glyf builder compiles to the same bytes as the pen."""
+    from fontTools.pens.ttGlyphPen import TTGlyphPointPen
+
+    from opentype_hinting_freezer.hintingfreezer import (
+        FrozenGlyph,
+        build_tt_glyph,
+        draw_outline_to_point_pen,
+    )
+
+    fhf = FontHintFreezer(read_from_path(multi_glyph_ttf_path), ppm=13, fast_path=False)
+    glyf = fhf.ttFont["glyf"]
+    for name, frozen in fhf.iter_frozen_glyphs():
+        if as_lists:
+            frozen = FrozenGlyph(*_as_lists([(name, frozen)])[0][1:])
+        pen = TTGlyphPointPen(glyphSet=fhf.glyphSet)
+        draw_outline_to_point_pen(frozen.points, frozen.tags, frozen.contours, pen)
+        built = build_tt_glyph(frozen)
+
+        assert built is not None
+        assert built.compile(glyf) == pen.glyph().compile(glyf)
+
+
+def test_from_path_maps_file_and_loads_tables_lazily(multi_glyph_ttf_path):
+    """Test that a memory-mapped freezer only decompiles the tables it needs."""
+    import mmap
+
+    fhf = FontHintFreezer.from_path(multi_glyph_ttf_path, ppm=12)
+    fhf.freeze_hints()
+
+    assert isinstance(fhf.font_data, mmap.mmap)
+    assert fhf.ttFont.isLoaded("glyf")
+    assert not fhf.ttFont.isLoaded("name")
+    assert not fhf.ttFont.isLoaded("OS/2")
+
+
+def test_freezehinting_overwrites_input(multi_glyph_ttf_path, temp_dir):
+    """Test that the input font can be frozen in place."""
+    import shutil
+
+    from fontTools.ttLib import TTFont
+
+    from opentype_hinting_freezer.hintingfreezer import freezehinting
+
+    font_file = temp_dir / "inplace.ttf"
+    shutil.copy(multi_glyph_ttf_path, font_file)
+    freezehinting(font_file, out=font_file, ppm=10, mode="mono")
+
+    assert len(TTFont(font_file).getGlyphOrder()) == len(
+        TTFont(multi_glyph_ttf_path).getGlyphOrder()
+    )
+
+
+def test_save_passes_untouched_tables_through(multi_glyph_ttf_path, temp_dir):
+    """Test that only the frozen tables are recompiled on save."""
+    from fontTools.ttLib import TTFont
+
+    output_file = temp_dir / "output.ttf"
+    fhf = FontHintFreezer.from_path(multi_glyph_ttf_path, ppm=12)
+    fhf.freeze_hints()
+    assert fhf.ttFont.isLoaded("post")
+    fhf.save(output_file)
+
+    source = TTFont(multi_glyph_ttf_path)
+    output = TTFont(output_file, checkChecksums=2)
+    assert set(output.reader.keys()) == set(source.reader.keys())
+    for tag in source.reader.tables:
+        if tag not in fhf.changed_tables:
+            assert output.reader[tag] == source.reader[tag], tag
@@ -0,0 +1,62 @@
+# this_file: tests/test_in_memory.py
+"""
+Tests for the in-memory API and the warm freezer pool.
+"""
+
+import io
+
+import pytest
+from conftest import font_tables
+
+from opentype_hinting_freezer import FreezerPool, freeze_bytes
+from opentype_hinting_freezer.hintingfreezer import FontHintFreezer, freezehinting
+
+
+def test_freeze_bytes_matches_freezehinting(multi_glyph_ttf_path, temp_dir):
+    """Test that the in-memory API returns the same font as the file API."""
+    output = temp_dir / "out.ttf"
+    freezehinting(multi_glyph_ttf_path, out=output, ppm=14, mode="mono")
+
+    data = multi_glyph_ttf_path.read_bytes()
+    expected = font_tables(output.read_bytes())
+    assert font_tables(freeze_bytes(data, ppm=14, mode="mono")) == expected
+    assert font_tables(freeze_bytes(io.BytesIO(data), ppm=14, mode="mono")) == expected
+
+
+def test_reset_restores_source_font(variable_ttf_path):
+    """Test that a reset freezer gives the same output as a new one."""
+    data = variable_ttf_path.read_bytes()
+    fhf = FontHintFreezer(data)
+    fhf.freeze(12, "mono", var={"wght": 700}, glyphs="g0001")
+    assert "fvar" not in fhf.ttFont
+
+    fhf.reset()
+    assert "fvar" in fhf.ttFont
+    fhf.freeze(16, "lcd")
+    assert font_tables(fhf.to_bytes()) == font_tables(
+        freeze_bytes(data, ppm=16, mode="lcd")
+    )
+
+
+def test_pool_reuses_warm_freezers(multi_glyph_ttf_path, sample_ttf_path):
+    """Test that the pool keeps recent fonts warm and evicts the oldest."""
+    multi = multi_glyph_ttf_path.read_bytes()
+    sample = sample_ttf_path.read_bytes()
+    pool = FreezerPool(max_fonts=1)
+
+    first = pool.freeze(multi, ppm=12, mode="mono")
+    pool.freeze(multi, ppm=13, mode="lcd", text="丂")
+    again = pool.freeze(multi, ppm=12, mode="mono")
+    assert font_tables(again) == font_tables(first)
+    assert font_tables(first) == font_tables(freeze_bytes(multi, ppm=12, mode="mono"))
+    assert pool.stats() == {"fonts": 1, "hits": 2, "misses": 1}
+
+    pool.freeze(sample, ppm=12)
+    pool.freeze(multi, ppm=12)
+    assert pool.stats()["misses"] == 3
+
+
+def test_pool_rejects_empty_capacity():
+    """Test that a pool must hold at least one font."""
+    with pytest.raises(ValueError):
+        FreezerPool(max_fonts=0)
@@ -0,0 +1,170 @@
+# this_file: tests/test_incremental.py
+"""
+Tests for incremental per-glyph re-freezing.
+"""
+
+import json
+import shutil
+
+import pytest
+from fontTools.ttLib import OPTIMIZE_FONT_SPEED, TTFont, newTable
+from fontTools.ttLib.tables import ttProgram
+
+from opentype_hinting_freezer.hintingfreezer import FontHintFreezer, freezehinting
+from opentype_hinting_freezer.incremental import manifest_path_for
+
+
+@pytest.fixture
+def loaded_glyphs(monkeypatch):
+    """Records the names of the glyphs loaded through FreeType."""
+    names = []
+    prep_glyph = FontHintFreezer.prep_glyph
+
+    def recording_prep_glyph(self):
+        names.append(self.glyphName)
+        prep_glyph(self)
+
+    monkeypatch.setattr(FontHintFreezer, "prep_glyph", recording_prep_glyph)
+    # The test glyphs have no instructions; load them all through FreeType.
+    monkeypatch.setattr(FontHintFreezer, "unhinted_glyphs", lambda _self: set())
+    return names
+
+
+def _revise_glyph(src, dest, glyph_name):
+    # Moving points keeps the point counts, and with them maxp, unchanged.
+    font = TTFont(src)
+    glyph = font["glyf"][glyph_name]
+    glyph.coordinates.translate((7, 11))
+    font.save(dest)
+
+
+def _glyf_data(path):
+    font = TTFont(path)
+    return font.reader["glyf"], font.reader["hmtx"]
+
+
+def test_incremental_refreezes_only_changed_glyphs(
+    multi_glyph_ttf_path, temp_dir, loaded_glyphs
+):
+    """Test that only revised glyphs are loaded and the output matches a full run."""
+    output = temp_dir / "out.ttf"
+    freezehinting(
+        multi_glyph_ttf_path, out=output, ppm=16, mode="mono", incremental=True
+    )
+    manifest = json.loads(manifest_path_for(output).read_text())
+    assert len(manifest["glyphs"]) == len(TTFont(multi_glyph_ttf_path).getGlyphOrder())
+
+    revised = temp_dir / "revised.ttf"
+    _revise_glyph(multi_glyph_ttf_path, revised, "g0005")
+    loaded_glyphs.clear()
+    freezehinting(revised, out=output, ppm=16, mode="mono", incremental=True)
+    assert loaded_glyphs == ["g0005"]
+
+    full = temp_dir / "full.ttf"
+    freezehinting(revised, out=full, ppm=16, mode="mono")
+    assert _glyf_data(output) == _glyf_data(full)
+
+
+def test_incremental_refreezes_composites_of_changed_components(
+    multi_glyph_ttf_path, temp_dir, loaded_glyphs
+):
+    """Test that revising a component also re-freezes the composites using it."""
+    output = temp_dir / "out.ttf"
+    options = dict(
+        out=output, ppm=16, mode="mono", keep_composites=True, incremental=True
+    )
+    freezehinting(multi_glyph_ttf_path, **options)
+
+    revised = temp_dir / "revised.ttf"
+    _revise_glyph(multi_glyph_ttf_path, revised, "g0001")
+    loaded_glyphs.clear()
+    freezehinting(revised, **options)
+
+    assert sorted(loaded_glyphs) == ["composite", "g0001", "g0002"]
+
+
+def test_incremental_invalidated_by_font_level_changes(
+    multi_glyph_ttf_path, temp_dir, loaded_glyphs
+):
+    """Test that a changed prep, gasp, head flags or PPM re-freezes every glyph."""
+    output = temp_dir / "out.ttf"
+    freezehinting(
+        multi_glyph_ttf_path, out=output, ppm=16, mode="mono", incremental=True
+    )
+    num_glyphs = len(TTFont(multi_glyph_ttf_path).getGlyphOrder())
+
+    loaded_glyphs.clear()
+    freezehinting(
+        multi_glyph_ttf_path, out=output, ppm=17, mode="mono", incremental=True
+    )
+    assert len(loaded_glyphs) == num_glyphs
+
+    font = TTFont(multi_glyph_ttf_path)
+    font["prep"].program = ttProgram.Program()
+    font["prep"].program.fromBytecode(b"\xb0\x01\x21")
+    revised = temp_dir / "revised.ttf"
+    font.save(revised)
+    loaded_glyphs.clear()
+    freezehinting(revised, out=output, ppm=17, mode="mono", incremental=True)
+    assert len(loaded_glyphs) == num_glyphs
+
+    font["gasp"] = newTable("gasp")
+    font["gasp"].version = 1
+    font["gasp"].gaspRange = {0xFFFF: 0x000F}
+    font.save(revised)
+    loaded_glyphs.clear()
+    freezehinting(revised, out=output, ppm=17, mode="mono", incremental=True)
+    assert len(loaded_glyphs) == num_glyphs
+
+    font["head"].flags ^= 0x8
+    font.save(revised)
+    loaded_glyphs.clear()
+    freezehinting(revised, out=output, ppm=17, mode="mono", incremental=True)
+    assert len(loaded_glyphs) == num_glyphs
+
+
+def test_incremental_ignores_glyph_packing(
+    multi_glyph_ttf_path, temp_dir, loaded_glyphs
+):
+    """Test that repacked glyphs and unrelated head flags do not re-freeze glyphs."""
+    output = temp_dir / "out.ttf"
+    freezehinting(
+        multi_glyph_ttf_path, out=output, ppm=16, mode="mono", incremental=True
+    )
+
+    font = TTFont(multi_glyph_ttf_path)
+    # Without flag repeats, every simple glyph is packed differently.
+    font.cfg[OPTIMIZE_FONT_SPEED] = True
+    for glyph_name in font.getGlyphOrder():
+        font["glyf"][glyph_name].expand(font["glyf"])
+    font["head"].flags ^= 0x1
+    revised = temp_dir / "revised.ttf"
+    font.save(revised)
+    assert TTFont(revised).reader["glyf"] != TTFont(multi_glyph_ttf_path).reader["glyf"]
+
+    loaded_glyphs.clear()
+    freezehinting(revised, out=output, ppm=16, mode="mono", incremental=True)
+    assert loaded_glyphs == []
+
+    freezehinting(
+        revised, out=output, ppm=16, mode="mono", incremental=True, dehint=True
+    )
+    assert len(loaded_glyphs) == len(font.getGlyphOrder())
+
+
+def test_incremental_ignores_replaced_output(
+    multi_glyph_ttf_path, sample_ttf_path, temp_dir, loaded_glyphs
+):
+    """Test that an output replaced since the manifest was written is not reused."""
+    output = temp_dir / "out.ttf"
+    freezehinting(
+        multi_glyph_ttf_path, out=output, ppm=16, mode="mono", incremental=True
+    )
+    shutil.copy(sample_ttf_path, output)
+
+    loaded_glyphs.clear()
+    freezehinting(
+        multi_glyph_ttf_path, out=output, ppm=16, mode="mono", incremental=True
+    )
+
+    assert len(loaded_glyphs) == len(TTFont(multi_glyph_ttf_path).getGlyphOrder())
@@ -0,0 +1,77 @@
+# this_file: tests/test_instances.py
+"""
+Tests for freezing variable font instances.
+"""
+
+import pytest
+from fontTools.ttLib import TTFont
+
+from opentype_hinting_freezer import hintingfreezer
+from opentype_hinting_freezer.hintingfreezer import freezehinting, named_instances
+
+VARIATION_TABLES = {"fvar", "gvar", "HVAR", "avar", "cvar", "STAT"}
+
+
+def _glyf_data(path):
+    font = TTFont(path)
+    return font.reader["glyf"], font.reader["hmtx"]
+
+
+def test_named_instances(variable_ttf_path, sample_ttf_path):
+    """Test that fvar instances are listed with their subfamily names."""
+    assert named_instances(variable_ttf_path) == [
+        ("Light", {"wght": 300}),
+        ("Regular", {"wght": 400}),
+        ("Bold", {"wght": 700}),
+    ]
+    assert named_instances(sample_ttf_path) == []
+
+
+def test_freeze_all_named_instances(variable_ttf_path, temp_dir, monkeypatch):
+    """Test that every instance becomes a static frozen font from one freezer."""
+    freezers = []
+    init = hintingfreezer.FontHintFreezer.__init__
+
+    def recording_init(self, *args, **kwargs):
+        freezers.append(self)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(hintingfreezer.FontHintFreezer, "__init__", recording_init)
+    freezehinting(variable_ttf_path, out=temp_dir, ppm=12, mode="mono", instances=True)
+    monkeypatch.undo()
+    assert len(freezers) == 1
+
+    outputs = {
+        style: temp_dir / f"variable.fhf-12-mono-{style}.ttf"
+        for style in ("Light", "Regular", "Bold")
+    }
+    for style, output in outputs.items():
+        assert not VARIATION_TABLES & set(TTFont(output).keys())
+        single = temp_dir / f"single-{style}.ttf"
+        location = dict(named_instances(variable_ttf_path))[style]
+        freezehinting(variable_ttf_path, out=single, ppm=12, mode="mono", var=location)
+        assert _glyf_data(output) == _glyf_data(single)
+    assert _glyf_data(outputs["Bold"]) != _glyf_data(outputs["Regular"])
+
+
+def test_freeze_listed_locations(variable_ttf_path, temp_dir):
+    """Test that explicit locations are frozen and named after their coordinates."""
+    freezehinting(
+        variable_ttf_path,
+        out=temp_dir,
+        ppm=12,
+        mode="mono",
+        instances=[{"wght": 550}, {"wght": 700}],
+        jobs=2,
+    )
+
+    medium = TTFont(temp_dir / "variable.fhf-12-mono-wght550.ttf")
+    bold = TTFont(temp_dir / "variable.fhf-12-mono-wght700.ttf")
+    assert "gvar" not in medium
+    assert medium["hmtx"]["g0001"][0] < bold["hmtx"]["g0001"][0]
+
+
+def test_instances_require_variable_font(sample_ttf_path, temp_dir):
+    """Test that asking for the named instances of a static font is an error."""
+    with pytest.raises(ValueError):
+        freezehinting(sample_ttf_path, out=temp_dir, instances=True)
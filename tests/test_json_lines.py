@@ -0,0 +1,110 @@
+# this_file: tests/test_json_lines.py
+"""
+Tests for the JSON-lines batch mode and stdin/stdout fonts.
+"""
+
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+from conftest import font_tables
+
+from opentype_hinting_freezer.batch import freeze_json_lines
+from opentype_hinting_freezer.hintingfreezer import freezehinting
+
+
+def _run_cli(args, stdin):
+    return subprocess.run(
+        [sys.executable, "-m", "opentype_hinting_freezer", *args],
+        input=stdin,
+        capture_output=True,
+        check=False,
+    )
+
+
+def test_freeze_json_lines(multi_glyph_ttf_path, temp_dir):
+    """Test that every job gets one result line, in order, despite failures."""
+    jobs = [
+        {
+            "id": "a",
+            "fontpath": str(multi_glyph_ttf_path),
+            "out": str(temp_dir / "a.ttf"),
+            "ppm": 12,
+        },
+        {"fontpath": str(temp_dir / "missing.ttf"), "out": str(temp_dir / "b.ttf")},
+        {
+            "id": 3,
+            "fontpath": str(multi_glyph_ttf_path),
+            "out": str(temp_dir),
+            "ppm": [12, 13],
+            "mode": "mono",
+        },
+        {"fontpath": "-"},
+    ]
+    lines = (
+        [json.dumps(job) for job in jobs[:2]]
+        + [""]
+        + [json.dumps(job) for job in jobs[2:]]
+    )
+    output = io.StringIO()
+
+    failed = freeze_json_lines(lines, output)
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert failed == 2
+    assert [(r["line"], r.get("id"), r["ok"]) for r in results] == [
+        (1, "a", True),
+        (2, None, False),
+        (4, 3, True),
+        (5, None, False),
+    ]
+    assert "FileNotFoundError" in results[1]["error"]
+    assert all(r["seconds"] >= 0 for r in results)
+    assert (temp_dir / "a.ttf").exists()
+    assert (temp_dir / "multi.fhf-13-mono.ttf").exists()
+
+
+def test_cli_batch(multi_glyph_ttf_path, temp_dir):
+    """Test that --batch reads jobs from stdin and streams results to stdout."""
+    job = {
+        "fontpath": str(multi_glyph_ttf_path),
+        "out": str(temp_dir / "out.ttf"),
+        "ppm": 12,
+    }
+    result = _run_cli(["--batch"], (json.dumps(job) + "\n").encode())
+
+    assert result.returncode == 0, result.stderr
+    (line,) = result.stdout.decode().splitlines()
+    assert json.loads(line)["ok"] is True
+    assert (temp_dir / "out.ttf").exists()
+
+
+def test_cli_stdin_stdout(multi_glyph_ttf_path, temp_dir):
+    """Test that "-" reads the font from stdin and writes the frozen font to stdout."""
+    expected = temp_dir / "expected.ttf"
+    freezehinting(multi_glyph_ttf_path, out=expected, ppm=12, mode="mono")
+
+    result = _run_cli(
+        ["-", "--ppm=12", "--mode=mono"], multi_glyph_ttf_path.read_bytes()
+    )
+    assert result.returncode == 0, result.stderr
+    piped = temp_dir / "piped.ttf"
+    piped.write_bytes(result.stdout)
+    assert font_tables(piped) == font_tables(expected)
+
+    result = _run_cli(
+        [str(multi_glyph_ttf_path), "--ppm=12", "--mode=mono", "--out", "-"], b""
+    )
+    assert result.returncode == 0, result.stderr
+    piped.write_bytes(result.stdout)
+    assert font_tables(piped) == font_tables(expected)
+
+
+def test_stdio_rejects_several_outputs(multi_glyph_ttf_path):
+    """Test that options producing several outputs or files are refused for "-"."""
+    with pytest.raises(ValueError, match="ppm list"):
+        freezehinting(multi_glyph_ttf_path, out="-", ppm=[12, 13])
+    with pytest.raises(ValueError, match="cache"):
+        freezehinting(multi_glyph_ttf_path, out="-", cache="cache")
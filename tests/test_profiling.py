@@ -0,0 +1,79 @@
+# this_file: tests/test_profiling.py
+"""
+Tests for the per-phase and per-glyph profile report.
+"""
+
+import json
+
+import pytest
+from fontTools.ttLib import TTFont
+
+from opentype_hinting_freezer.hintingfreezer import PROFILE_FILENAME, freezehinting
+
+
+def test_profile_report(multi_glyph_ttf_path, temp_dir):
+    """Test that the report has every phase and the slowest glyphs of the output."""
+    report_path = temp_dir / "profile.json"
+    out = temp_dir / "frozen.ttf"
+    freezehinting(
+        multi_glyph_ttf_path,
+        out=out,
+        ppm=16,
+        mode="mono",
+        profile=report_path,
+        profile_top=3,
+    )
+
+    report = json.loads(report_path.read_text())
+    (output,) = report["outputs"]
+    assert output["output"] == str(out)
+    assert (output["ppm"], output["mode"]) == (16, "mono")
+    assert {"open", "freeze", "save"} <= set(output["phases"])
+    for entry in output["phases"].values():
+        assert entry["seconds"] >= 0 and entry["calls"] == 1
+    assert output["glyphs"]["count"] == len(TTFont(out).getGlyphOrder())
+
+    slowest = output["slowest_glyphs"]
+    assert len(slowest) == 3
+    totals = [g["load_ms"] + g["read_ms"] + g["convert_ms"] for g in slowest]
+    assert totals == sorted(totals, reverse=True)
+    assert all(g["points"] is not None and g["contours"] is not None for g in slowest)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_profile_batch_default_path(multi_glyph_ttf_path, temp_dir, jobs):
+    """Test that a batch profile lists every output and glyphs loaded by workers."""
+    freezehinting(
+        multi_glyph_ttf_path,
+        out=temp_dir,
+        ppm=[12, 16],
+        mode="mono",
+        jobs=jobs,
+        profile=True,
+    )
+
+    report = json.loads((temp_dir / PROFILE_FILENAME).read_text())
+    assert [o["ppm"] for o in report["outputs"]] == [12, 16]
+    # The font is opened for the first output only.
+    assert "open" in report["outputs"][0]["phases"]
+    assert "open" not in report["outputs"][1]["phases"]
+    for output in report["outputs"]:
+        assert output["glyphs"]["count"] > 0
+        assert all(g["load_ms"] >= 0 for g in output["slowest_glyphs"])
+
+
+def test_profile_dehint_phase(multi_glyph_ttf_path, temp_dir):
+    """Test that dehinting is timed as its own phase and the RSS note is reported."""
+    report_path = temp_dir / "profile.json"
+    freezehinting(
+        multi_glyph_ttf_path,
+        out=temp_dir / "frozen.ttf",
+        ppm=16,
+        dehint=True,
+        profile=report_path,
+    )
+
+    report = json.loads(report_path.read_text())
+    (output,) = report["outputs"]
+    assert output["phases"]["dehint"]["calls"] == 1
+    assert "ru_maxrss" in report["peak_rss_note"]
@@ -0,0 +1,141 @@
+# this_file: tests/test_server.py
+"""
+Tests for the local freeze service.
+"""
+
+import asyncio
+import json
+import multiprocessing
+
+from conftest import font_tables
+
+from opentype_hinting_freezer import freeze_bytes
+from opentype_hinting_freezer.server import FreezeServer, parse_options
+
+
+async def _request(port, method, target, body=b"", content_length=None):
+    if content_length is None:
+        content_length = len(body)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {content_length}\r\n\r\n".encode("ascii")
+        + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), payload
+
+
+def _run_with_server(scenario, **server_options):
+    server = FreezeServer(workers=1, **server_options)
+
+    async def main():
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            return await scenario(port)
+
+    try:
+        return server, asyncio.run(main())
+    finally:
+        server.close()
+
+
+def test_parse_options():
+    """Test that query strings become typed freeze options."""
+    assert parse_options("ppm=12&mode=mono&render&var=%7B%22wght%22%3A700%7D") == {
+        "ppm": 12,
+        "mode": "mono",
+        "render": True,
+        "var": {"wght": 700},
+    }
+
+
+def test_server_freezes_and_counts_requests(multi_glyph_ttf_path):
+    """Test that the service returns frozen fonts and reports its counters."""
+    font_data = multi_glyph_ttf_path.read_bytes()
+
+    async def scenario(port):
+        results = await asyncio.gather(
+            *(
+                _request(port, "POST", "/freeze?ppm=12&mode=mono", font_data)
+                for _ in range(3)
+            )
+        )
+        bad_mode = await _request(port, "POST", "/freeze?mode=bogus", font_data)
+        missing = await _request(port, "GET", "/nowhere")
+        stats = await _request(port, "GET", "/stats")
+        return results, bad_mode, missing, stats
+
+    _, (results, bad_mode, missing, stats) = _run_with_server(scenario)
+
+    expected = font_tables(freeze_bytes(font_data, ppm=12, mode="mono"))
+    for status, payload in results:
+        assert status == 200
+        assert font_tables(payload) == expected
+    assert bad_mode[0] == 400
+    assert missing[0] == 404
+    counters = json.loads(stats[1])
+    assert counters["completed"] == 3
+    assert counters["failed"] == 1
+    assert counters["queued"] == 0
+    assert counters["latency_ms"]["p50"] > 0
+
+
+def test_server_rejects_invalid_content_length():
+    """Test that a malformed or negative Content-Length is answered with 400."""
+
+    async def scenario(port):
+        return [
+            await _request(port, "POST", "/freeze", b"x", content_length=value)
+            for value in ("abc", "-5", "")
+        ]
+
+    _, responses = _run_with_server(scenario)
+    assert [status for status, _ in responses] == [400, 400, 400]
+
+
+def test_server_rejects_requests_beyond_queue(multi_glyph_ttf_path):
+    """Test that requests beyond the queue bound get 503 instead of waiting."""
+    font_data = multi_glyph_ttf_path.read_bytes()
+
+    async def scenario(port):
+        return await asyncio.gather(
+            *(_request(port, "POST", "/freeze?ppm=12", font_data) for _ in range(4))
+        )
+
+    server, results = _run_with_server(scenario, max_queue=0)
+
+    statuses = sorted(status for status, _ in results)
+    assert statuses[0] == 200
+    assert 503 in statuses
+    assert server.rejected == statuses.count(503)
+
+
+def test_server_restarts_dead_workers(multi_glyph_ttf_path):
+    """Test that a killed worker is reported by /health and replaced."""
+    font_data = multi_glyph_ttf_path.read_bytes()
+
+    async def scenario(port):
+        first = await _request(port, "POST", "/freeze?ppm=12", font_data)
+        for worker in multiprocessing.active_children():
+            worker.kill()
+        for _ in range(100):
+            health = await _request(port, "GET", "/health")
+            if health[0] != 200:
+                break
+            await asyncio.sleep(0.05)
+        second = await _request(port, "POST", "/freeze?ppm=12", font_data)
+        recovered = await _request(port, "GET", "/health")
+        return first, health, second, recovered
+
+    server, (first, health, second, recovered) = _run_with_server(scenario)
+
+    assert first[0] == second[0] == 200
+    assert font_tables(second[1]) == font_tables(first[1])
+    assert health == (503, b"Worker processes died")
+    assert recovered == (200, b"ok")
+    assert server.restarts == 1
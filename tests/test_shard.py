@@ -0,0 +1,142 @@
+# this_file: tests/test_shard.py
+"""
+Tests for freezing glyph-ID shards and merging them into the font.
+"""
+
+import subprocess
+import sys
+
+import pytest
+from conftest import font_tables
+
+from opentype_hinting_freezer.hintingfreezer import freezehinting
+from opentype_hinting_freezer.shard import (
+    freezemerge,
+    freezeshard,
+    read_shard,
+    shard_range,
+)
+
+
+def _shards(fontpath, directory, parts, **options):
+    return [
+        freezeshard(fontpath, out=directory, part=part, parts=parts, **options)
+        for part in range(parts)
+    ]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_merge_matches_freeze(multi_glyph_ttf_path, temp_dir, stream):
+    """Test that merged shards give the same font as a direct freeze."""
+    expected = temp_dir / "expected.ttf"
+    freezehinting(multi_glyph_ttf_path, out=expected, ppm=13, mode="mono")
+
+    shards = _shards(multi_glyph_ttf_path, temp_dir, 3, ppm=13, mode="mono")
+    merged = freezemerge(
+        multi_glyph_ttf_path,
+        *reversed(shards),
+        out=temp_dir / "merged.ttf",
+        stream=stream,
+    )
+    assert font_tables(merged) == font_tables(expected)
+
+
+def test_merge_cff(cff_otf_path, temp_dir):
+    """Test that CFF and CFF2 fonts merge to the same charstrings."""
+    expected = temp_dir / "expected.otf"
+    freezehinting(cff_otf_path, out=expected, ppm=12)
+
+    shards = _shards(cff_otf_path, temp_dir, 2, ppm=12)
+    merged = freezemerge(cff_otf_path, *shards, out=temp_dir / "merged.otf")
+    assert font_tables(merged) == font_tables(expected)
+
+
+def test_merge_variable(variable_ttf_path, temp_dir):
+    """Test that a shard location is instantiated on merge."""
+    expected = temp_dir / "expected.ttf"
+    freezehinting(variable_ttf_path, out=expected, ppm=14, var={"wght": 700})
+
+    shards = _shards(variable_ttf_path, temp_dir, 2, ppm=14, var={"wght": 700}, jobs=2)
+    merged = freezemerge(variable_ttf_path, *shards, out=temp_dir / "merged.ttf")
+    assert font_tables(merged) == font_tables(expected)
+
+
+def test_shard_file(multi_glyph_ttf_path, temp_dir):
+    """Test the shard header, glyph count and automatic name."""
+    path = freezeshard(
+        multi_glyph_ttf_path, out=temp_dir, start=1, stop=3, ppm=12, mode="mono"
+    )
+    assert path.endswith("multi.fhf-12-mono.1-3.fhfshard")
+    header, glyphs = read_shard(path)
+    assert (header["start"], header["stop"], header["ppm"], header["mode"]) == (
+        1,
+        3,
+        12,
+        "mono",
+    )
+    assert len(glyphs) == 2
+    assert all(len(glyph.points) == len(glyph.tags) for glyph in glyphs)
+
+
+def test_shard_range():
+    """Test explicit and part-of-parts ranges."""
+    assert shard_range(10, part=0, parts=3) == (0, 3)
+    assert shard_range(10, part=2, parts=3) == (6, 10)
+    assert shard_range(10, start=4) == (4, 10)
+    with pytest.raises(ValueError):
+        shard_range(10, start=5, stop=11)
+    with pytest.raises(ValueError):
+        shard_range(10, part=3, parts=3)
+
+
+def test_merge_rejects_bad_shards(multi_glyph_ttf_path, sample_ttf_path, temp_dir):
+    """Test that gaps, overlaps, mixed settings and other fonts are refused."""
+    first, second = _shards(multi_glyph_ttf_path, temp_dir, 2, ppm=12)
+    with pytest.raises(ValueError, match="do not cover"):
+        freezemerge(multi_glyph_ttf_path, first, out=temp_dir / "x.ttf")
+    with pytest.raises(ValueError, match="overlaps"):
+        freezemerge(multi_glyph_ttf_path, first, first, second, out=temp_dir / "x.ttf")
+    other = freezeshard(
+        multi_glyph_ttf_path, out=temp_dir / "other.fhfshard", part=1, parts=2, ppm=13
+    )
+    with pytest.raises(ValueError, match="different ppm"):
+        freezemerge(multi_glyph_ttf_path, first, other, out=temp_dir / "x.ttf")
+    with pytest.raises(ValueError, match="was not frozen from"):
+        freezemerge(sample_ttf_path, first, second, out=temp_dir / "x.ttf")
+
+
+def test_cli_shard_merge(multi_glyph_ttf_path, temp_dir):
+    """Test the shard and merge subcommands."""
+    for part in range(2):
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "opentype_hinting_freezer",
+                "shard",
+                str(multi_glyph_ttf_path),
+                f"--part={part}",
+                "--parts=2",
+                "--ppm=12",
+                f"--out={temp_dir}",
+            ],
+            check=True,
+            capture_output=True,
+        )
+    shards = sorted(str(path) for path in temp_dir.glob("*.fhfshard"))
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "opentype_hinting_freezer",
+            "merge",
+            str(multi_glyph_ttf_path),
+            *shards,
+            f"--out={temp_dir / 'merged.ttf'}",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    expected = temp_dir / "expected.ttf"
+    freezehinting(multi_glyph_ttf_path, out=expected, ppm=12)
+    assert font_tables(temp_dir / "merged.ttf") == font_tables(expected)
@@ -0,0 +1,81 @@
+# this_file: tests/test_streaming.py
+"""
+Tests for the bounded-memory streaming glyf writer.
+"""
+
+import tracemalloc
+
+import pytest
+from conftest import font_tables
+
+from opentype_hinting_freezer.hintingfreezer import FontHintFreezer, freezehinting
+
+
+@pytest.fixture(scope="module")
+def large_ttf_path(tmp_path_factory):
+    """A font whose glyf table needs long loca offsets."""
+    from generate_minimal_ttf import create_benchmark_font
+
+    path = tmp_path_factory.mktemp("fonts") / "large.ttf"
+    create_benchmark_font(str(path), 2000, "ttf")
+    return path
+
+
+@pytest.mark.parametrize(
+    "font, options",
+    [
+        ("multi_glyph_ttf_path", {}),
+        ("multi_glyph_ttf_path", {"text": "丂丅"}),
+        ("multi_glyph_ttf_path", {"jobs": 2}),
+        ("variable_ttf_path", {"var": {"wght": 600}}),
+        ("large_ttf_path", {}),
+    ],
+)
+def test_stream_output_is_identical(font, options, temp_dir, request):
+    """Test that streaming writes the same glyf, loca, head, hhea and maxp."""
+    font_path = request.getfixturevalue(font)
+    freezehinting(
+        font_path, out=temp_dir / "objects.ttf", ppm=13, mode="mono", **options
+    )
+    freezehinting(
+        font_path,
+        out=temp_dir / "stream.ttf",
+        ppm=13,
+        mode="mono",
+        stream=True,
+        **options,
+    )
+    assert font_tables(temp_dir / "stream.ttf", head=True) == font_tables(
+        temp_dir / "objects.ttf", head=True
+    )
+
+
+def test_stream_incremental_reuse(multi_glyph_ttf_path, temp_dir):
+    """Test that glyphs reused from a previous output are streamed in glyph order."""
+    out = temp_dir / "out.ttf"
+    freezehinting(multi_glyph_ttf_path, out=out, ppm=16, incremental=True, stream=True)
+    expected = font_tables(out, head=True)
+    freezehinting(multi_glyph_ttf_path, out=out, ppm=16, incremental=True, stream=True)
+    assert font_tables(out, head=True) == expected
+
+
+def test_stream_keeps_no_glyph_objects(large_ttf_path):
+    """Test that streaming allocates far less than keeping every frozen glyph."""
+    peaks = {}
+    for stream in (False, True):
+        fhf = FontHintFreezer.from_path(
+            large_ttf_path, ppm=16, render_mode="mono", stream=stream
+        )
+        tracemalloc.start()
+        fhf.freeze_hints()
+        peaks[stream] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    assert peaks[True] < peaks[False] / 2
+
+
+def test_stream_rejects_keep_composites(multi_glyph_ttf_path):
+    """Test that composites, which need their components' glyphs, cannot be streamed."""
+    with pytest.raises(ValueError, match="keep_composites"):
+        FontHintFreezer.from_path(
+            multi_glyph_ttf_path, stream=True, keep_composites=True
+        )
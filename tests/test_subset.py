@@ -0,0 +1,61 @@
+# this_file: tests/test_subset.py
+"""
+Tests for freezing a glyph subset.
+"""
+
+from fontTools import subset
+from fontTools.ttLib import TTFont
+
+from opentype_hinting_freezer.hintingfreezer import FontHintFreezer, freezehinting
+
+
+def _glyph_outlines(path):
+    font = TTFont(path)
+    glyf = font["glyf"]
+    return {
+        name: (glyf[name].getCoordinates(glyf)[0].array.tolist(), font["hmtx"][name])
+        for name in font.getGlyphOrder()
+    }
+
+
+def test_subset_freeze_matches_freeze_then_subset(multi_glyph_ttf_path, temp_dir):
+    """Test that freezing a subset gives the same glyphs as subsetting a frozen font."""
+    full = temp_dir / "full.ttf"
+    freezehinting(multi_glyph_ttf_path, out=full, ppm=16, mode="mono")
+    font = TTFont(full)
+    subsetter = subset.Subsetter(subset.Options(notdef_outline=True))
+    subsetter.populate(text="丂丅")
+    subsetter.subset(font)
+    subsetted = temp_dir / "subsetted.ttf"
+    font.save(subsetted)
+
+    frozen = temp_dir / "frozen.ttf"
+    freezehinting(multi_glyph_ttf_path, out=frozen, ppm=16, mode="mono", text="丂丅")
+
+    # pyftsubset drops glyph names by default, so compare by glyph ID.
+    assert len(TTFont(frozen).getGlyphOrder()) == 3
+    assert _glyph_outlines(frozen) == _glyph_outlines(subsetted)
+
+
+def test_subset_loads_only_surviving_glyphs(multi_glyph_ttf_path, monkeypatch):
+    """Test that FreeType loads the closure only, by source glyph ID."""
+    loaded = []
+    prep_glyph = FontHintFreezer.prep_glyph
+
+    def recording_prep_glyph(self):
+        loaded.append((self.glyphName, self.source_glyph_ids[self.glyphName]))
+        prep_glyph(self)
+
+    monkeypatch.setattr(FontHintFreezer, "prep_glyph", recording_prep_glyph)
+    fhf = FontHintFreezer.from_path(
+        multi_glyph_ttf_path, ppm=16, keep_composites=True, fast_path=False
+    )
+    source_order = fhf.ttFont.getGlyphOrder()
+    fhf.subset(glyphs="composite", unicodes="U+4E09")
+    fhf.freeze_hints()
+
+    names = [name for name, _ in loaded]
+    assert sorted(names) == [".notdef", "composite", "g0001", "g0002", "g0010"]
+    assert all(source_order[glyph_id] == name for name, glyph_id in loaded)
+    # The composite still references its (renumbered) components.
+    assert fhf.ttFont["glyf"]["composite"].isComposite()
@@ -0,0 +1,105 @@
+# this_file: tests/test_unhinted.py
+"""
+Tests for computing glyphs without instructions without FreeType.
+"""
+
+import pytest
+from conftest import font_tables
+from fontTools.ttLib import TTFont
+from fontTools.ttLib.tables import ttProgram
+
+from opentype_hinting_freezer import hintingfreezer
+from opentype_hinting_freezer.hintingfreezer import FontHintFreezer, freezehinting
+
+
+@pytest.fixture(scope="module")
+def mixed_ttf_path(tmp_path_factory):
+    """A hinted font where every other glyph is unhinted and some LSBs are not xMin."""
+    from generate_minimal_ttf import create_benchmark_font
+
+    path = tmp_path_factory.mktemp("unhinted") / "mixed.ttf"
+    create_benchmark_font(str(path), 60, "ttf")
+    font = TTFont(path)
+    glyf = font["glyf"]
+    hmtx = font["hmtx"]
+    for i, name in enumerate(font.getGlyphOrder()):
+        if i % 2:
+            glyf[name].program = ttProgram.Program()
+            glyf[name].program.fromBytecode(b"")
+        advance, _ = hmtx[name]
+        hmtx[name] = (advance, glyf[name].xMin + (23 if i % 5 == 0 else 0))
+    font.save(path)
+    return path
+
+
+@pytest.mark.parametrize("mode", ["mono", "lcd", "lcdv", "light"])
+@pytest.mark.parametrize("ppm", [9, 13, 16, 37])
+def test_fast_path_matches_freetype(mixed_ttf_path, temp_dir, ppm, mode):
+    """Test that the fast path gives FreeType's output and verifies cleanly."""
+    fast = temp_dir / "fast.ttf"
+    slow = temp_dir / "slow.ttf"
+    freezehinting(mixed_ttf_path, out=fast, ppm=ppm, mode=mode)
+    freezehinting(mixed_ttf_path, out=slow, ppm=ppm, mode=mode, fast_path=False)
+    assert font_tables(fast) == font_tables(slow)
+
+    fhf = FontHintFreezer.from_path(
+        mixed_ttf_path, ppm=ppm, render_mode=mode, verify_fast_path=True
+    )
+    fhf.freeze_hints()
+    assert fhf.fast_path_mismatches == []
+    # Light mode is autohinted, so nothing is computed.
+    assert bool(fhf.unhinted_glyphs()) == (mode != "light")
+
+
+def test_unhinted_glyphs(mixed_ttf_path, multi_glyph_ttf_path):
+    """Test which glyphs and settings the fast path covers."""
+    fhf = FontHintFreezer.from_path(mixed_ttf_path, ppm=12, render_mode="mono")
+    glyph_order = fhf.ttFont.getGlyphOrder()
+    # Odd glyphs have no instructions; every fifth has an LSB off xMin.
+    assert fhf.unhinted_glyphs() == {
+        name for i, name in enumerate(glyph_order) if i % 2 and i % 5
+    }
+    assert not FontHintFreezer.from_path(
+        mixed_ttf_path, fast_path=False
+    ).unhinted_glyphs()
+
+    fhf = FontHintFreezer.from_path(multi_glyph_ttf_path, ppm=12)
+    assert "g0001" in fhf.unhinted_glyphs()
+    assert "composite" not in fhf.unhinted_glyphs()
+
+
+def test_fast_path_skips_autohinted_fonts(mixed_ttf_path, temp_dir):
+    """Test that fonts without hinting programs, autohinted by FreeType, are loaded."""
+    font = TTFont(mixed_ttf_path)
+    for tag in ("fpgm", "prep"):
+        if tag in font:
+            del font[tag]
+    for name in font.getGlyphOrder():
+        font["glyf"][name].program = ttProgram.Program()
+        font["glyf"][name].program.fromBytecode(b"")
+    font["maxp"].maxSizeOfInstructions = 0
+    path = temp_dir / "unhinted.ttf"
+    font.save(path)
+    assert not FontHintFreezer.from_path(path, ppm=12).unhinted_glyphs()
+
+
+def test_verify_replaces_mismatches(mixed_ttf_path, temp_dir, monkeypatch):
+    """Test that verification keeps FreeType's outline where the fast path differs."""
+    expected = temp_dir / "expected.ttf"
+    freezehinting(mixed_ttf_path, out=expected, ppm=12, mode="mono", fast_path=False)
+
+    scale_glyph = hintingfreezer.scale_glyph
+
+    def off_by_one(*args):
+        points, tags, contours, width, lsb = scale_glyph(*args)
+        return points, tags, contours, width + 1, lsb
+
+    monkeypatch.setattr(hintingfreezer, "scale_glyph", off_by_one)
+    fhf = FontHintFreezer.from_path(
+        mixed_ttf_path, ppm=12, render_mode="mono", verify_fast_path=True
+    )
+    fhf.freeze_hints(jobs=2)
+    assert sorted(fhf.fast_path_mismatches) == sorted(fhf.unhinted_glyphs())
+    verified = temp_dir / "verified.ttf"
+    fhf.save(verified)
+    assert font_tables(verified) == font_tables(expected)